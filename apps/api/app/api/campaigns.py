@@ -1,32 +1,49 @@
+import base64
 import json
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 
 from app.db.models import Campaign
-from app.db.session import get_session
+from app.db.session import get_read_session, get_session
 from app.schemas.campaigns import (
     CampaignCreate,
+    CampaignPatch,
+    CampaignPayload,
     CampaignResponse,
     CampaignSummary,
     CampaignUpdate,
+    PartyProfile,
 )
+from app.services import json_codec
+from app.services.campaign_store import (
+    RawGraph,
+    apply_patch,
+    delete_graph,
+    dump_meta,
+    load_payload,
+    load_raw_graph,
+    parse_meta,
+    replace_graph,
+)
+from app.services.graph_index import graph_index_cache
+from app.services.metrics import current_db_route
+from app.services.summaries import delete_summaries
 
-router = APIRouter()
 
+async def _track_queries(request: Request) -> None:
+    current_db_route.set((request.method, request.scope['route'].path))
 
-def _parse_payload(campaign: Campaign) -> dict:
-    try:
-        return json.loads(campaign.data)
-    except json.JSONDecodeError:
-        return {}
+
+router = APIRouter(dependencies=[Depends(_track_queries)])
 
 
-def _to_response(campaign: Campaign) -> CampaignResponse:
-    payload = _parse_payload(campaign)
+def _to_response(db: Session, campaign: Campaign) -> CampaignResponse:
+    payload = load_payload(db, campaign)
     return CampaignResponse(
         id=campaign.id,
         title=campaign.title,
@@ -38,80 +55,172 @@ def _to_response(campaign: Campaign) -> CampaignResponse:
     )
 
 
+def _to_raw_response(
+    campaign: Campaign,
+    graph: RawGraph,
+    party_profile: Optional[dict],
+    status_code: int = status.HTTP_200_OK,
+) -> Response:
+    profile = PartyProfile.model_validate(party_profile).model_dump() if party_profile else None
+    body = ''.join(
+        [
+            '{"title":',
+            json_codec.dumps(campaign.title),
+            ',"nodes":[',
+            ','.join(graph.nodes),
+            '],"edges":[',
+            ','.join(graph.edges),
+            '],"party_profile":',
+            json_codec.dumps(profile),
+            ',"id":',
+            json_codec.dumps(campaign.id),
+            ',"created_at":',
+            json_codec.dumps(campaign.created_at.isoformat()),
+            ',"updated_at":',
+            json_codec.dumps(campaign.updated_at.isoformat()),
+            '}',
+        ]
+    )
+    return Response(content=body, media_type='application/json', status_code=status_code)
+
+
+def _payload_dict(payload: CampaignPayload) -> dict:
+    return {
+        'nodes': payload.nodes,
+        'edges': payload.edges,
+        'party_profile': payload.party_profile.model_dump() if payload.party_profile else None,
+    }
+
+
+def _get_or_404(db: Session, campaign_id: str) -> Campaign:
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if not campaign:
+        raise HTTPException(status_code=404, detail='Campanha nao encontrada')
+    return campaign
+
+
+def _encode_cursor(updated_at: datetime, campaign_id: str) -> str:
+    raw = json.dumps([updated_at.isoformat(), campaign_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        updated_at, campaign_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(updated_at), str(campaign_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail='Cursor invalido')
+
+
 @router.get('/', response_model=List[CampaignSummary])
-def list_campaigns(db: Session = Depends(get_session)):
-    campaigns = db.query(Campaign).order_by(Campaign.updated_at.desc()).all()
+def list_campaigns(
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    title_prefix: Optional[str] = None,
+    db: Session = Depends(get_read_session),
+):
+    query = db.query(Campaign.id, Campaign.title, Campaign.updated_at)
+    if cursor:
+        updated_at, campaign_id = _decode_cursor(cursor)
+        query = query.filter(tuple_(Campaign.updated_at, Campaign.id) < (updated_at, campaign_id))
+    if title_prefix:
+        query = query.filter(Campaign.title.startswith(title_prefix, autoescape=True))
+    query = query.order_by(Campaign.updated_at.desc(), Campaign.id.desc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    rows = query.all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers['X-Next-Cursor'] = _encode_cursor(rows[-1].updated_at, rows[-1].id)
+
     return [
-        CampaignSummary(
-            id=campaign.id,
-            title=campaign.title,
-            updated_at=campaign.updated_at,
-        )
-        for campaign in campaigns
+        CampaignSummary(id=row.id, title=row.title, updated_at=row.updated_at) for row in rows
     ]
 
 
 @router.post('/', response_model=CampaignResponse, status_code=status.HTTP_201_CREATED)
 def create_campaign(payload: CampaignCreate, db: Session = Depends(get_session)):
     campaign_id = payload.id or uuid4().hex
-    data = json.dumps(
-        {
-            'nodes': payload.nodes,
-            'edges': payload.edges,
-            'party_profile': payload.party_profile.model_dump() if payload.party_profile else None,
-        }
-    )
     now = datetime.utcnow()
 
     campaign = Campaign(
         id=campaign_id,
         title=payload.title,
-        data=data,
+        data=dump_meta(_payload_dict(payload)['party_profile']),
         created_at=now,
         updated_at=now,
     )
     db.add(campaign)
+    graph = replace_graph(db, campaign_id, payload.nodes, payload.edges)
     db.commit()
     db.refresh(campaign)
-    return _to_response(campaign)
+    return _to_raw_response(
+        campaign, graph, _payload_dict(payload)['party_profile'], status.HTTP_201_CREATED
+    )
 
 
 @router.get('/{campaign_id}', response_model=CampaignResponse)
-def get_campaign(campaign_id: str, db: Session = Depends(get_session)):
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-    if not campaign:
-        raise HTTPException(status_code=404, detail='Campanha nao encontrada')
-    return _to_response(campaign)
+def get_campaign(campaign_id: str, db: Session = Depends(get_read_session)):
+    campaign = _get_or_404(db, campaign_id)
+    meta = parse_meta(campaign)
+    graph = load_raw_graph(db, campaign, meta)
+    if graph is None:
+        return _to_response(db, campaign)
+    return _to_raw_response(campaign, graph, meta.get('party_profile'))
 
 
 @router.put('/{campaign_id}', response_model=CampaignResponse)
 def update_campaign(
     campaign_id: str, payload: CampaignUpdate, db: Session = Depends(get_session)
 ):
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-    if not campaign:
-        raise HTTPException(status_code=404, detail='Campanha nao encontrada')
+    campaign = _get_or_404(db, campaign_id)
 
     campaign.title = payload.title
-    campaign.data = json.dumps(
-        {
-            'nodes': payload.nodes,
-            'edges': payload.edges,
-            'party_profile': payload.party_profile.model_dump() if payload.party_profile else None,
-        }
-    )
+    campaign.data = dump_meta(_payload_dict(payload)['party_profile'])
+    graph = replace_graph(db, campaign_id, payload.nodes, payload.edges)
     campaign.updated_at = datetime.utcnow()
 
     db.commit()
+    graph_index_cache.invalidate(campaign_id)
     db.refresh(campaign)
-    return _to_response(campaign)
+    return _to_raw_response(campaign, graph, _payload_dict(payload)['party_profile'])
+
+
+@router.patch('/{campaign_id}', response_model=CampaignSummary)
+def patch_campaign(
+    campaign_id: str, payload: CampaignPatch, db: Session = Depends(get_session)
+):
+    campaign = _get_or_404(db, campaign_id)
+
+    apply_patch(
+        db,
+        campaign,
+        upsert_nodes=payload.upsert_nodes,
+        delete_node_ids=payload.delete_node_ids,
+        upsert_edges=payload.upsert_edges,
+        delete_edge_ids=payload.delete_edge_ids,
+    )
+    if payload.title is not None:
+        campaign.title = payload.title
+    if 'party_profile' in payload.model_fields_set:
+        campaign.data = dump_meta(
+            payload.party_profile.model_dump() if payload.party_profile else None
+        )
+    campaign.updated_at = datetime.utcnow()
+
+    db.commit()
+    graph_index_cache.invalidate(campaign_id)
+    return CampaignSummary(id=campaign.id, title=campaign.title, updated_at=campaign.updated_at)
 
 
 @router.delete('/{campaign_id}', status_code=status.HTTP_204_NO_CONTENT)
 def delete_campaign(campaign_id: str, db: Session = Depends(get_session)):
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-    if not campaign:
-        raise HTTPException(status_code=404, detail='Campanha nao encontrada')
+    campaign = _get_or_404(db, campaign_id)
 
     db.delete(campaign)
+    delete_graph(db, campaign_id)
+    delete_summaries(db, campaign_id)
     db.commit()
+    graph_index_cache.invalidate(campaign_id)
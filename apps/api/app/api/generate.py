@@ -1,31 +1,240 @@
-from fastapi import APIRouter
+import json
+from typing import AsyncIterator, List, Optional
 
-from app.schemas.generation import GenerationRequest, GenerationResponse, GeneratedBlock
-from app.services.generation import generate_story_blocks
-from app.services.prompt_builder import PromptConfig
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import get_read_session_factory
+from app.schemas.generation import (
+    AffectedRequest,
+    AffectedResponse,
+    GenerationRequest,
+    GenerationResponse,
+    GenerationSummary,
+    GeneratedBlock,
+    GeneratedDelta,
+    GeneratedReset,
+)
+from app.services.ai_adapter import AIAdapter, GeneratedItem, get_adapter
+from app.services.generation import SingleFlight, generate_story_blocks, stream_story_blocks
+from app.services.generation_cache import GenerationCache
+from app.services.generation_source import (
+    CampaignNotFoundError,
+    load_campaign,
+    load_summaries,
+    party_profile,
+    prompt_config,
+    resolve_source,
+)
+from app.services.graph_index import graph_index_cache
+from app.services.http_pool import pool_metrics
+from app.services.prompt_builder import compile_graph
+from app.services.subgraph import find_affected
+from app.services.summaries import SummaryStore
 
 router = APIRouter()
 
 
-@router.post('/', response_model=GenerationResponse)
-async def generate_blocks(payload: GenerationRequest):
-    config = PromptConfig(
-        max_depth=payload.max_depth,
-        max_context_items=payload.max_context_items,
-        max_prompt_chars=payload.max_prompt_chars,
-    )
-    party_profile = payload.party_profile.model_dump(exclude_none=True) if payload.party_profile else None
-    mode, items = await generate_story_blocks(
-        target_ids=payload.target_ids,
-        raw_nodes=payload.nodes,
-        raw_edges=payload.edges,
-        campaign_title=payload.campaign_title,
-        party_profile=party_profile,
-        config=config,
-    )
+def get_ai_adapter(request: Request) -> AIAdapter:
+    adapter = getattr(request.app.state, 'ai_adapter', None)
+    return adapter or get_adapter()
+
+
+def get_generation_cache(request: Request) -> Optional[GenerationCache]:
+    return getattr(request.app.state, 'generation_cache', None)
+
+
+def get_single_flight(request: Request) -> Optional[SingleFlight]:
+    return getattr(request.app.state, 'single_flight', None)
+
+
+def get_summary_store(request: Request) -> Optional[SummaryStore]:
+    return getattr(request.app.state, 'summary_store', None)
+
+
+@router.get('/pool')
+def get_pool_stats():
+    return pool_metrics.snapshot()
+
+
+@router.get('/limits')
+def get_limiter_stats(adapter: AIAdapter = Depends(get_ai_adapter)):
+    limiter = getattr(adapter, 'limiter', None)
+    if limiter is None:
+        return {'enabled': False}
+    return {'enabled': True, **limiter.snapshot()}
+
+
+@router.get('/breaker')
+def get_breaker_state(adapter: AIAdapter = Depends(get_ai_adapter)):
+    breaker = getattr(adapter, 'breaker', None)
+    if breaker is None:
+        return {'enabled': False}
+    return {'enabled': True, **breaker.snapshot()}
+
+
+@router.get('/routing')
+def get_routing_stats(adapter: AIAdapter = Depends(get_ai_adapter)):
+    snapshot = getattr(adapter, 'snapshot', None)
+    if snapshot is None:
+        return {'enabled': False}
+    return {'enabled': True, **snapshot()}
+
+
+@router.get('/index')
+def get_index_stats():
+    return graph_index_cache.snapshot()
+
+
+@router.get('/cache')
+def get_cache_stats(cache: Optional[GenerationCache] = Depends(get_generation_cache)):
+    if cache is None:
+        return {'enabled': False}
+    return {'enabled': cache.enabled, **cache.stats.snapshot()}
+
+
+@router.get('/summaries')
+def get_summary_stats(summaries: Optional[SummaryStore] = Depends(get_summary_store)):
+    if summaries is None:
+        return {'enabled': False}
+    return {'enabled': summaries.enabled, **summaries.stats.snapshot()}
+
+
+@router.get('/flights')
+def get_flight_stats(flights: Optional[SingleFlight] = Depends(get_single_flight)):
+    if flights is None:
+        return {'enabled': False}
+    return {'enabled': True, **flights.snapshot()}
+
+
+async def _resolve_source(
+    payload: GenerationRequest, read_factory: sessionmaker, summaries: Optional[SummaryStore]
+) -> dict:
+    try:
+        return await resolve_source(payload, read_factory, summaries)
+    except CampaignNotFoundError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+
+
+def _to_response(mode: str, items: List[GeneratedItem]) -> GenerationResponse:
     return GenerationResponse(
         mode=mode,
         items=[
-            GeneratedBlock(id=item.id, title=item.title, content=item.content) for item in items
+            GeneratedBlock(id=item.id, title=item.title, content=item.content, mode=item.mode)
+            for item in items
         ],
     )
+
+
+@router.post('/', response_model=GenerationResponse)
+async def generate_blocks(
+    payload: GenerationRequest,
+    adapter: AIAdapter = Depends(get_ai_adapter),
+    cache: Optional[GenerationCache] = Depends(get_generation_cache),
+    flights: Optional[SingleFlight] = Depends(get_single_flight),
+    summaries: Optional[SummaryStore] = Depends(get_summary_store),
+    read_factory: sessionmaker = Depends(get_read_session_factory),
+):
+    source = await _resolve_source(payload, read_factory, summaries)
+    mode, items = await generate_story_blocks(
+        target_ids=payload.target_ids,
+        config=prompt_config(payload),
+        adapter=adapter,
+        cache=cache,
+        use_cache=payload.use_cache,
+        flights=flights,
+        waves=payload.waves,
+        **source,
+    )
+    return _to_response(mode, items)
+
+
+@router.post('/stream')
+async def stream_blocks(
+    payload: GenerationRequest,
+    adapter: AIAdapter = Depends(get_ai_adapter),
+    cache: Optional[GenerationCache] = Depends(get_generation_cache),
+    flights: Optional[SingleFlight] = Depends(get_single_flight),
+    summaries: Optional[SummaryStore] = Depends(get_summary_store),
+    read_factory: sessionmaker = Depends(get_read_session_factory),
+):
+    source = await _resolve_source(payload, read_factory, summaries)
+    events = stream_story_blocks(
+        target_ids=payload.target_ids,
+        config=prompt_config(payload),
+        adapter=adapter,
+        cache=cache,
+        use_cache=payload.use_cache,
+        flights=flights,
+        waves=payload.waves,
+        **source,
+    )
+
+    async def lines() -> AsyncIterator[str]:
+        async for event in events:
+            if event.kind == 'block' and event.item:
+                block = GeneratedBlock(
+                    id=event.item.id,
+                    title=event.item.title,
+                    content=event.item.content,
+                    mode=event.item.mode,
+                )
+                body = {'type': 'block', **block.model_dump()}
+            elif event.kind == 'delta' and event.delta and event.delta.reset:
+                body = {'type': 'reset', **GeneratedReset(id=event.delta.id).model_dump()}
+            elif event.kind == 'delta' and event.delta:
+                delta = GeneratedDelta(id=event.delta.id, field=event.delta.field, text=event.delta.text)
+                body = {'type': 'delta', **delta.model_dump()}
+            else:
+                summary = GenerationSummary(mode=event.mode or 'none', count=event.count)
+                body = {'type': 'done', **summary.model_dump()}
+            yield json.dumps(body) + '\n'
+
+    return StreamingResponse(lines(), media_type='application/x-ndjson')
+
+
+@router.post('/affected', response_model=AffectedResponse)
+async def affected_blocks(
+    payload: AffectedRequest,
+    adapter: AIAdapter = Depends(get_ai_adapter),
+    cache: Optional[GenerationCache] = Depends(get_generation_cache),
+    flights: Optional[SingleFlight] = Depends(get_single_flight),
+    summaries: Optional[SummaryStore] = Depends(get_summary_store),
+    read_factory: sessionmaker = Depends(get_read_session_factory),
+):
+    current = compile_graph(payload.nodes, payload.edges)
+    stored = None
+    if payload.previous_nodes is not None:
+        previous = compile_graph(payload.previous_nodes, payload.previous_edges or [])
+    elif payload.campaign_id:
+        try:
+            stored = await load_campaign(read_factory, payload.campaign_id)
+        except CampaignNotFoundError as error:
+            raise HTTPException(status_code=404, detail=str(error))
+        previous = stored.graph
+    else:
+        raise HTTPException(status_code=400, detail='Informe campaign_id ou previous_nodes')
+
+    affected = find_affected(previous, current, payload.max_depth, payload.include_changed)
+    response = AffectedResponse(changed_ids=affected.changed_ids, target_ids=affected.target_ids)
+    if not payload.generate or not affected.target_ids:
+        return response
+
+    mode, items = await generate_story_blocks(
+        target_ids=affected.target_ids,
+        raw_nodes=[],
+        raw_edges=[],
+        campaign_title=payload.campaign_title or (stored.title if stored else None),
+        party_profile=party_profile(payload) or (stored.party_profile if stored else None),
+        config=prompt_config(payload),
+        adapter=adapter,
+        cache=cache,
+        use_cache=payload.use_cache,
+        flights=flights,
+        waves=payload.waves,
+        graph=current,
+        summaries=await load_summaries(payload, current, summaries),
+    )
+    response.generation = _to_response(mode, items)
+    return response
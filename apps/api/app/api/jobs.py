@@ -0,0 +1,121 @@
+from typing import AsyncIterator, Callable, Set
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.schemas.generation import GeneratedBlock, GenerationRequest
+from app.schemas.jobs import JobResult, JobStatus
+from app.services.generation import GenerationEvent, stream_story_blocks
+from app.services.generation_source import CampaignNotFoundError, prompt_config, resolve_source
+from app.services.jobs import JobManager, JobQueueFull, JobRunner, JobSnapshot
+
+router = APIRouter()
+
+
+def build_job_runner(state, session_factory: Callable[[], Session]) -> JobRunner:
+    async def run(payload: dict, done_ids: Set[str]) -> AsyncIterator[GenerationEvent]:
+        request = GenerationRequest.model_validate(payload)
+        try:
+            source = await resolve_source(request, session_factory, getattr(state, 'summary_store', None))
+        except CampaignNotFoundError as error:
+            raise RuntimeError(str(error)) from error
+
+        events = stream_story_blocks(
+            target_ids=[target_id for target_id in request.target_ids if target_id not in done_ids],
+            config=prompt_config(request),
+            adapter=state.ai_adapter,
+            cache=getattr(state, 'generation_cache', None),
+            use_cache=request.use_cache,
+            flights=getattr(state, 'single_flight', None),
+            waves=request.waves,
+            **source,
+        )
+        async for event in events:
+            yield event
+
+    return run
+
+
+def get_job_manager(request: Request) -> JobManager:
+    manager = getattr(request.app.state, 'job_manager', None)
+    if manager is None:
+        raise HTTPException(status_code=503, detail='Fila de geracao indisponivel')
+    return manager
+
+
+def _to_status(snapshot: JobSnapshot) -> JobStatus:
+    progress = snapshot.completed / snapshot.total if snapshot.total else 0.0
+    return JobStatus(
+        id=snapshot.id,
+        status=snapshot.status,
+        total=snapshot.total,
+        completed=snapshot.completed,
+        progress=round(min(1.0, progress), 4),
+        mode=snapshot.mode,
+        error=snapshot.error,
+        created_at=snapshot.created_at,
+        updated_at=snapshot.updated_at,
+        started_at=snapshot.started_at,
+        finished_at=snapshot.finished_at,
+    )
+
+
+async def _get_or_404(manager: JobManager, job_id: str) -> JobSnapshot:
+    snapshot = await manager.get(job_id)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail='Job nao encontrado')
+    return snapshot
+
+
+@router.get('/stats')
+def get_job_stats(manager: JobManager = Depends(get_job_manager)):
+    return manager.stats()
+
+
+@router.post('/', response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(payload: GenerationRequest, manager: JobManager = Depends(get_job_manager)):
+    if not payload.target_ids:
+        raise HTTPException(status_code=400, detail='Informe target_ids')
+    try:
+        snapshot = await manager.submit(
+            payload.model_dump(mode='json'), total=len(dict.fromkeys(payload.target_ids))
+        )
+    except JobQueueFull as error:
+        raise HTTPException(status_code=429, detail=str(error), headers={'Retry-After': '5'})
+    return _to_status(snapshot)
+
+
+@router.get('/{job_id}', response_model=JobStatus)
+async def get_job(job_id: str, manager: JobManager = Depends(get_job_manager)):
+    return _to_status(await _get_or_404(manager, job_id))
+
+
+@router.get('/{job_id}/result', response_model=JobResult)
+async def get_job_result(job_id: str, manager: JobManager = Depends(get_job_manager)):
+    snapshot = await _get_or_404(manager, job_id)
+    items = await manager.items(job_id)
+    return JobResult(
+        **_to_status(snapshot).model_dump(),
+        items=[
+            GeneratedBlock(id=item.id, title=item.title, content=item.content, mode=item.mode)
+            for item in items
+        ],
+    )
+
+
+@router.get('/{job_id}/events')
+async def stream_job(job_id: str, manager: JobManager = Depends(get_job_manager)):
+    await _get_or_404(manager, job_id)
+
+    async def lines() -> AsyncIterator[str]:
+        async for snapshot in manager.watch(job_id):
+            yield _to_status(snapshot).model_dump_json() + '\n'
+
+    return StreamingResponse(lines(), media_type='application/x-ndjson')
+
+
+@router.post('/{job_id}/cancel', response_model=JobStatus)
+async def cancel_job(job_id: str, manager: JobManager = Depends(get_job_manager)):
+    await _get_or_404(manager, job_id)
+    return _to_status(await manager.cancel(job_id))
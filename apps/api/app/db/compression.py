@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import lzma
+import os
+import zlib
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+
+MARKER_ZLIB = b'\x01'
+MARKER_LZMA = b'\x02'
+
+
+@dataclass(frozen=True)
+class CompressionConfig:
+    codec: str = 'zlib'
+    level: int = 6
+    min_bytes: int = 512
+
+
+def read_compression_config() -> CompressionConfig:
+    codec = os.getenv('DB_COMPRESSION', 'zlib').lower()
+    if codec not in {'none', 'zlib', 'lzma'}:
+        codec = 'zlib'
+    try:
+        level = int(os.getenv('DB_COMPRESSION_LEVEL', '6'))
+    except ValueError:
+        level = 6
+    try:
+        min_bytes = max(0, int(os.getenv('DB_COMPRESSION_MIN_BYTES', '512')))
+    except ValueError:
+        min_bytes = 512
+    return CompressionConfig(codec=codec, level=min(9, max(0, level)), min_bytes=min_bytes)
+
+
+_config: Optional[CompressionConfig] = None
+
+
+def get_compression_config() -> CompressionConfig:
+    global _config
+    if _config is None:
+        _config = read_compression_config()
+    return _config
+
+
+def configure_compression(config: Optional[CompressionConfig]) -> None:
+    global _config
+    _config = config
+
+
+def pack(text: str, config: Optional[CompressionConfig] = None) -> Union[str, bytes]:
+    config = config or get_compression_config()
+    if config.codec == 'none' or len(text) < config.min_bytes:
+        return text
+    raw = text.encode('utf-8')
+    if config.codec == 'lzma':
+        packed = MARKER_LZMA + lzma.compress(raw, preset=config.level)
+    else:
+        packed = MARKER_ZLIB + zlib.compress(raw, config.level)
+    return packed if len(packed) < len(raw) else text
+
+
+def unpack(value: Union[str, bytes, None]) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    marker, body = value[:1], value[1:]
+    if marker == MARKER_ZLIB:
+        return zlib.decompress(body).decode('utf-8')
+    if marker == MARKER_LZMA:
+        return lzma.decompress(body).decode('utf-8')
+    return bytes(value).decode('utf-8')
+
+
+class CompressedText(TypeDecorator):
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else pack(value)
+
+    def process_result_value(self, value, dialect):
+        return unpack(value)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.db.compression import get_compression_config, pack
+
+logger = logging.getLogger(__name__)
+
+COMPRESSED_COLUMNS = (('campaigns', 'data'), ('campaign_nodes', 'data'))
+
+
+def _table_exists(engine: Engine, table: str) -> bool:
+    with engine.connect() as connection:
+        return (
+            connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': table},
+            ).first()
+            is not None
+        )
+
+
+def migrate_column(
+    engine: Engine, table: str, column: str, batch_size: int = 500, pause_seconds: float = 0.0
+) -> dict:
+    stats = {'rows': 0, 'packed': 0, 'bytes_before': 0, 'bytes_after': 0}
+    if not _table_exists(engine, table):
+        return stats
+    last_rowid = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                text(
+                    f'SELECT rowid, {column} FROM {table} '
+                    f"WHERE rowid > :last AND typeof({column}) = 'text' ORDER BY rowid LIMIT :limit"
+                ),
+                {'last': last_rowid, 'limit': batch_size},
+            ).all()
+            if not rows:
+                break
+            updates = []
+            for rowid, value in rows:
+                packed = pack(value)
+                size = len(value.encode('utf-8'))
+                stats['rows'] += 1
+                stats['bytes_before'] += size
+                if isinstance(packed, bytes):
+                    updates.append({'rowid': rowid, 'value': packed})
+                    stats['packed'] += 1
+                    stats['bytes_after'] += len(packed)
+                else:
+                    stats['bytes_after'] += size
+            if updates:
+                connection.execute(
+                    text(f'UPDATE {table} SET {column} = :value WHERE rowid = :rowid'), updates
+                )
+            last_rowid = rows[-1][0]
+        if pause_seconds:
+            time.sleep(pause_seconds)
+    return stats
+
+
+def migrate(engine: Engine, batch_size: int = 500, pause_seconds: float = 0.0) -> dict:
+    return {
+        table: migrate_column(engine, table, column, batch_size, pause_seconds)
+        for table, column in COMPRESSED_COLUMNS
+    }
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Comprime linhas JSON antigas do campaigns.db')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--pause', type=float, default=0.05, help='pausa entre lotes (segundos)')
+    args = parser.parse_args()
+
+    from app.db.session import engine
+
+    config = get_compression_config()
+    if config.codec == 'none':
+        logger.warning('DB_COMPRESSION=none; nada a migrar.')
+        return
+    for table, stats in migrate(engine, max(1, args.batch_size), max(0.0, args.pause)).items():
+        ratio = stats['bytes_before'] / stats['bytes_after'] if stats['bytes_after'] else 1.0
+        print(
+            f"{table}: {stats['packed']}/{stats['rows']} linhas comprimidas | "
+            f"{stats['bytes_before']} -> {stats['bytes_after']} bytes | razao={ratio:.2f}x"
+        )
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
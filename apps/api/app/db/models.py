@@ -1,15 +1,86 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, String, Text
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
 
+from app.db.compression import CompressedText
 from app.db.session import Base
 
 
 class Campaign(Base):
     __tablename__ = 'campaigns'
+    __table_args__ = (Index('ix_campaigns_updated_at_id_title', 'updated_at', 'id', 'title'),)
 
     id = Column(String, primary_key=True, index=True)
     title = Column(String, nullable=False)
+    data = Column(CompressedText, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CampaignNode(Base):
+    __tablename__ = 'campaign_nodes'
+    __table_args__ = (Index('ix_campaign_nodes_order', 'campaign_id', 'sort_order'),)
+
+    campaign_id = Column(String, primary_key=True)
+    node_id = Column(String, primary_key=True)
+    sort_order = Column(Integer, nullable=False)
+    data = Column(CompressedText, nullable=False)
+
+
+class CampaignEdge(Base):
+    __tablename__ = 'campaign_edges'
+    __table_args__ = (Index('ix_campaign_edges_order', 'campaign_id', 'sort_order'),)
+
+    campaign_id = Column(String, primary_key=True)
+    edge_id = Column(String, primary_key=True)
+    source = Column(String, nullable=True)
+    target = Column(String, nullable=True)
+    sort_order = Column(Integer, nullable=False)
     data = Column(Text, nullable=False)
+
+
+class GenerationCacheEntry(Base):
+    __tablename__ = 'generation_cache'
+
+    key = Column(String, primary_key=True)
+    title = Column(String, nullable=True)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class GenerationJob(Base):
+    __tablename__ = 'generation_jobs'
+    __table_args__ = (Index('ix_generation_jobs_status_created', 'status', 'created_at'),)
+
+    id = Column(String, primary_key=True)
+    status = Column(String, nullable=False)
+    request = Column(Text, nullable=False)
+    total = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    mode = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class GenerationJobItem(Base):
+    __tablename__ = 'generation_job_items'
+
+    job_id = Column(String, primary_key=True)
+    node_id = Column(String, primary_key=True)
+    position = Column(Integer, nullable=False)
+    title = Column(String, nullable=True)
+    content = Column(Text, nullable=False)
+    mode = Column(String, nullable=True)
+
+
+class NodeSummary(Base):
+    __tablename__ = 'node_summaries'
+
+    campaign_id = Column(String, primary_key=True)
+    node_id = Column(String, primary_key=True)
+    content_hash = Column(String, nullable=False)
+    summary = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
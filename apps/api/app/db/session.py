@@ -1,7 +1,15 @@
+import logging
+import os
+from dataclasses import dataclass
 from pathlib import Path
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 DATA_DIR = ROOT_DIR / 'data'
@@ -12,19 +20,109 @@ def ensure_data_dir() -> None:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 
-engine = create_engine(
-    f'sqlite:///{DB_PATH}',
-    connect_args={'check_same_thread': False},
-)
+@dataclass(frozen=True)
+class StorageProfile:
+    name: str
+    journal_mode: str = 'WAL'
+    synchronous: str = 'NORMAL'
+    mmap_size: int = 0
+    cache_size: int = -2000
+    busy_timeout_ms: int = 5000
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+
+
+STORAGE_PROFILES = {
+    'legacy': StorageProfile(name='legacy', journal_mode='DELETE', synchronous='FULL'),
+    'wal': StorageProfile(name='wal'),
+    'fast': StorageProfile(
+        name='fast',
+        synchronous='NORMAL',
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64000,
+        pool_size=10,
+        max_overflow=20,
+    ),
+}
+
+
+def read_storage_profile() -> StorageProfile:
+    name = os.getenv('DB_PROFILE', 'wal').lower()
+    if name not in STORAGE_PROFILES:
+        logger.warning(
+            "DB_PROFILE=%s desconhecido; usando wal (opcoes: %s).", name, ', '.join(STORAGE_PROFILES)
+        )
+        return STORAGE_PROFILES['wal']
+    return STORAGE_PROFILES[name]
+
+
+def create_db_engine(path: Path, profile: StorageProfile, read_only: bool = False) -> Engine:
+    db_engine = create_engine(
+        f'sqlite:///{path}',
+        connect_args={'check_same_thread': False},
+        poolclass=QueuePool,
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        pool_timeout=profile.pool_timeout,
+    )
+
+    @event.listens_for(db_engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA journal_mode={profile.journal_mode}')
+        cursor.execute(f'PRAGMA synchronous={profile.synchronous}')
+        cursor.execute(f'PRAGMA mmap_size={profile.mmap_size}')
+        cursor.execute(f'PRAGMA cache_size={profile.cache_size}')
+        cursor.execute(f'PRAGMA busy_timeout={profile.busy_timeout_ms}')
+        if read_only:
+            cursor.execute('PRAGMA query_only=ON')
+        cursor.close()
+
+    return db_engine
+
+
+storage_profile = read_storage_profile()
+
+engine = create_db_engine(DB_PATH, storage_profile)
+read_engine = create_db_engine(DB_PATH, storage_profile, read_only=True)
+
+
+def create_session_factory(bind: Engine) -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=bind)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+SessionLocal = create_session_factory(engine)
+ReadSessionLocal = create_session_factory(read_engine)
 
 Base = declarative_base()
 
 
-def get_session():
-    db = SessionLocal()
+def get_session_factory(request: Request) -> sessionmaker:
+    return getattr(request.app.state, 'session_factory', None) or SessionLocal
+
+
+def get_read_session_factory(request: Request) -> sessionmaker:
+    return getattr(request.app.state, 'read_session_factory', None) or ReadSessionLocal
+
+
+def get_session(request: Request):
+    db = get_session_factory(request)()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_session(request: Request):
+    db = get_read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def ensure_indexes(bind: Engine) -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
@@ -1,21 +1,66 @@
 import logging
+from contextlib import asynccontextmanager
+from typing import Optional
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
+from sqlalchemy.engine import Engine
 
 from app.api.campaigns import router as campaigns_router
 from app.api.generate import router as generate_router
-from app.db.session import Base, engine, ensure_data_dir
+from app.api.jobs import build_job_runner
+from app.api.jobs import router as jobs_router
+from app.api.metrics import router as metrics_router
+from app.db.session import (
+    Base,
+    create_session_factory,
+    engine,
+    ensure_data_dir,
+    ensure_indexes,
+    read_engine,
+)
+from app.services.ai_adapter import get_adapter
+from app.services.generation import SingleFlight, single_flight_enabled
+from app.services.generation_cache import GenerationCache, read_cache_config
+from app.services.http_pool import read_pool_config
+from app.services.jobs import JobManager, read_job_config
+from app.services.metrics import MetricsMiddleware, instrument_engine, metrics_enabled
+from app.services.summaries import SummaryStore, read_summary_config
+from app.services.title_catalog import get_title_catalog
 
 
-def create_app() -> FastAPI:
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if app.state.engine is engine:
+        ensure_data_dir()
+    Base.metadata.create_all(bind=app.state.engine)
+    ensure_indexes(app.state.engine)
+    session_factory = app.state.session_factory
+    get_title_catalog()
+    app.state.ai_adapter = get_adapter(pool=read_pool_config())
+    app.state.generation_cache = GenerationCache(read_cache_config(), session_factory)
+    app.state.single_flight = SingleFlight() if single_flight_enabled() else None
+    app.state.summary_store = SummaryStore(read_summary_config(), session_factory)
+    app.state.job_manager = JobManager(
+        read_job_config(), session_factory, build_job_runner(app.state, app.state.read_session_factory)
+    )
+    await app.state.job_manager.start()
+    try:
+        yield
+    finally:
+        await app.state.job_manager.stop()
+        await app.state.ai_adapter.aclose()
+        app.state.ai_adapter = None
+
+
+def create_app(db_engine: Optional[Engine] = None, db_read_engine: Optional[Engine] = None) -> FastAPI:
     logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(name)s: %(message)s')
-    load_dotenv()
-    ensure_data_dir()
-    Base.metadata.create_all(bind=engine)
 
-    app = FastAPI(title='AI Campaign Builder API', version='0.1.0')
+    app = FastAPI(title='AI Campaign Builder API', version='0.1.0', lifespan=lifespan)
+    app.state.engine = db_engine or engine
+    app.state.read_engine = db_read_engine or (read_engine if db_engine is None else app.state.engine)
+    app.state.session_factory = create_session_factory(app.state.engine)
+    app.state.read_session_factory = create_session_factory(app.state.read_engine)
 
     app.add_middleware(
         CORSMiddleware,
@@ -28,10 +73,17 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=['*'],
         allow_headers=['*'],
+        expose_headers=['X-Next-Cursor'],
     )
+    if metrics_enabled():
+        app.add_middleware(MetricsMiddleware)
+        instrument_engine(app.state.engine)
+        instrument_engine(app.state.read_engine)
 
     app.include_router(campaigns_router, prefix='/campaigns', tags=['campaigns'])
     app.include_router(generate_router, prefix='/generate', tags=['generation'])
+    app.include_router(jobs_router, prefix='/jobs', tags=['jobs'])
+    app.include_router(metrics_router, prefix='/metrics', tags=['metrics'])
     return app
 
 
@@ -28,6 +28,15 @@ class CampaignUpdate(CampaignPayload):
     pass
 
 
+class CampaignPatch(BaseModel):
+    title: Optional[str] = Field(default=None, min_length=1)
+    party_profile: Optional[PartyProfile] = None
+    upsert_nodes: List[dict] = Field(default_factory=list)
+    delete_node_ids: List[str] = Field(default_factory=list)
+    upsert_edges: List[dict] = Field(default_factory=list)
+    delete_edge_ids: List[str] = Field(default_factory=list)
+
+
 class CampaignSummary(BaseModel):
     id: str
     title: str
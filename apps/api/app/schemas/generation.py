@@ -5,23 +5,61 @@ from pydantic import BaseModel, Field
 from app.schemas.campaigns import PartyProfile
 
 
-class GenerationRequest(BaseModel):
+class GenerationSettings(BaseModel):
+    campaign_id: Optional[str] = None
     campaign_title: Optional[str] = None
     party_profile: Optional[PartyProfile] = None
     nodes: List[dict] = Field(default_factory=list)
     edges: List[dict] = Field(default_factory=list)
-    target_ids: List[str] = Field(default_factory=list)
     max_depth: int = 2
     max_context_items: int = 8
     max_prompt_chars: int = 2000
+    max_prompt_tokens: Optional[int] = None
+    token_estimator: str = 'approx'
+    use_cache: bool = True
+    use_summaries: bool = True
+    waves: bool = False
+
+
+class GenerationRequest(GenerationSettings):
+    target_ids: List[str] = Field(default_factory=list)
+
+
+class AffectedRequest(GenerationSettings):
+    previous_nodes: Optional[List[dict]] = None
+    previous_edges: Optional[List[dict]] = None
+    include_changed: bool = False
+    generate: bool = False
 
 
 class GeneratedBlock(BaseModel):
     id: str
     title: Optional[str] = None
     content: str
+    mode: Optional[str] = None
 
 
 class GenerationResponse(BaseModel):
     mode: str
     items: List[GeneratedBlock]
+
+
+class GeneratedDelta(BaseModel):
+    id: str
+    field: str
+    text: str
+
+
+class GeneratedReset(BaseModel):
+    id: str
+
+
+class GenerationSummary(BaseModel):
+    mode: str
+    count: int
+
+
+class AffectedResponse(BaseModel):
+    changed_ids: List[str]
+    target_ids: List[str]
+    generation: Optional[GenerationResponse] = None
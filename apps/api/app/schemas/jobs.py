@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.generation import GeneratedBlock
+
+
+class JobStatus(BaseModel):
+    id: str
+    status: str
+    total: int
+    completed: int
+    progress: float
+    mode: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobResult(JobStatus):
+    items: List[GeneratedBlock]
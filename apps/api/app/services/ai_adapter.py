@@ -1,27 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
 import os
-from dataclasses import dataclass
-from typing import List, Optional, Protocol, Tuple
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Protocol, Tuple
 
 import httpx
 
-from app.services.prompt_builder import PromptItem
-
-_DND_TITLES = {
-    'theme': ['Sombras de Netheril', 'Culto do Dragao', 'Segredos de Waterdeep', 'Ecos de Vecna'],
-    'location': ['Neverwinter', 'Waterdeep', "Baldur's Gate", 'Silverymoon', 'Candlekeep'],
-    'npc': ['Volo Geddarm', 'Laeral Silverhand', 'Mirt, o Sr. Moeda', 'Elminster Aumar'],
-    'event': ['Festival de Midwinter', 'Ataque dos drows', 'Ritual da Lua Nova', 'Cerco de Luskan'],
-    'twist': [
-        'O aliado e um doppelganger',
-        'A reliquia e de Netheril',
-        'A ordem guarda um segredo',
-        'O vilao serve Asmodeus',
-    ],
-}
-
+from app.services.http_pool import HttpPoolConfig, create_pooled_client
+from app.services.metrics import (
+    provider_first_token_seconds,
+    provider_hedges,
+    provider_request_seconds,
+    provider_tokens,
+)
+from app.services.partial_json import PartialFieldParser
+from app.services.prompt_builder import PromptItem, approx_token_count, build_batch_prompt
+from app.services.circuit_breaker import OPEN, BreakerConfig, CircuitBreaker, read_breaker_config
+from app.services.rate_limiter import ProviderLimiter, RateLimitConfig, read_rate_limit_config
+from app.services.routing import RouteStats, RoutingConfig, rank_routes, read_routing_config
+from app.services.title_catalog import TitleAssigner, get_title_catalog
+
+logger = logging.getLogger(__name__)
 
 def _hash_text(value: str) -> int:
     hash_value = 0
@@ -31,36 +36,8 @@ def _hash_text(value: str) -> int:
     return abs(hash_value)
 
 
-def _pick_title(options: List[str], seed: int, blocked: set[str]) -> Optional[str]:
-    if not options:
-        return None
-    for offset in range(len(options)):
-        candidate = options[(seed + offset) % len(options)]
-        if candidate.lower() not in blocked:
-            return candidate
-    return options[seed % len(options)]
-
-
 def _normalize_title(candidate: Optional[str], item: PromptItem, seed: int) -> str:
-    blocked = {title.lower() for title in item.context_titles}
-    if item.target_title:
-        blocked.add(item.target_title.lower())
-
-    other_titles = {
-        title.lower()
-        for block_type, titles in _DND_TITLES.items()
-        if block_type != item.target_type
-        for title in titles
-    }
-
-    if candidate and candidate.strip():
-        normalized = candidate.strip()
-        if normalized.lower() not in blocked and normalized.lower() not in other_titles:
-            return normalized
-
-    options = _DND_TITLES.get(item.target_type, [])
-    fallback = _pick_title(options, seed, blocked)
-    return fallback or (candidate.strip() if candidate else item.target_title)
+    return get_title_catalog().normalize(candidate, item, seed)
 
 
 @dataclass(frozen=True)
@@ -68,15 +45,43 @@ class GeneratedItem:
     id: str
     content: str
     title: Optional[str] = None
+    mode: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class BlockDelta:
+    id: str
+    field: str
+    text: str
+    reset: bool = False
+
+
+DeltaSink = Callable[[BlockDelta], None]
+
+delta_sink: ContextVar[Optional[DeltaSink]] = ContextVar('delta_sink', default=None)
+
+
+class PartialGenerationError(RuntimeError):
+    def __init__(self, results: List[GeneratedItem], failed: List[PromptItem], cause: BaseException) -> None:
+        super().__init__(f'{len(failed)} blocos falharam: {cause!r}')
+        self.results = results
+        self.failed = failed
+        self.cause = cause
+
+
+def _title_and_content(data: object) -> Optional[Tuple[Optional[str], str]]:
+    title = data.get('title') if isinstance(data, dict) else None
+    content = data.get('content') if isinstance(data, dict) else None
+    if isinstance(content, str) and content.strip():
+        return (title.strip() if isinstance(title, str) else None, content.strip())
+    return None
 
 
 def _parse_json_payload(value: str) -> Tuple[Optional[str], str]:
     try:
-        data = json.loads(value)
-        title = data.get('title') if isinstance(data, dict) else None
-        content = data.get('content') if isinstance(data, dict) else None
-        if isinstance(content, str) and content.strip():
-            return (title.strip() if isinstance(title, str) else None, content.strip())
+        parsed = _title_and_content(json.loads(value))
+        if parsed:
+            return parsed
     except json.JSONDecodeError:
         pass
 
@@ -85,21 +90,55 @@ def _parse_json_payload(value: str) -> Tuple[Optional[str], str]:
     if start != -1 and end != -1 and end > start:
         snippet = value[start : end + 1]
         try:
-            data = json.loads(snippet)
-            title = data.get('title') if isinstance(data, dict) else None
-            content = data.get('content') if isinstance(data, dict) else None
-            if isinstance(content, str) and content.strip():
-                return (title.strip() if isinstance(title, str) else None, content.strip())
+            parsed = _title_and_content(json.loads(snippet))
+            if parsed:
+                return parsed
         except json.JSONDecodeError:
             pass
 
     return (None, value.strip())
 
 
+def _parse_json_items(value: str) -> List[dict]:
+    try:
+        data = json.loads(value)
+    except json.JSONDecodeError:
+        data = None
+    if isinstance(data, dict):
+        data = next((data[key] for key in ('items', 'blocks') if isinstance(data.get(key), list)), [data])
+    if isinstance(data, list):
+        return [entry for entry in data if isinstance(entry, dict)]
+
+    decoder = json.JSONDecoder()
+    items: List[dict] = []
+    index = value.find('{')
+    while index != -1:
+        try:
+            entry, end = decoder.raw_decode(value, index)
+        except json.JSONDecodeError:
+            index = value.find('{', index + 1)
+            continue
+        if isinstance(entry, dict):
+            if isinstance(entry.get('items'), list):
+                items.extend(item for item in entry['items'] if isinstance(item, dict))
+            else:
+                items.append(entry)
+        index = value.find('{', end)
+    return items
+
+
 class AIAdapter(Protocol):
+    cache_scope: str
+
     async def generate(self, prompts: List[PromptItem]) -> List[GeneratedItem]:
         ...
 
+    def stream(self, prompts: List[PromptItem]) -> AsyncIterator[GeneratedItem]:
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
 
 @dataclass(frozen=True)
 class AIProviderConfig:
@@ -109,9 +148,16 @@ class AIProviderConfig:
     base_url: str
     deployment: Optional[str] = None
     api_version: Optional[str] = None
+    max_concurrency: int = 4
+    batch_size: int = 1
+    stream: bool = True
+    rate_limit: RateLimitConfig = field(default_factory=RateLimitConfig)
+    breaker: BreakerConfig = field(default_factory=BreakerConfig)
 
 
 class MockAdapter:
+    cache_scope = 'mock'
+
     _adjectives = ['sombrio', 'antigo', 'inquieto', 'velado', 'misterioso']
     _motifs = ['juramento', 'ruina', 'rumor', 'rito', 'sombra']
     _verbs = ['puxa', 'guia', 'fratura', 'ecoa', 'muda']
@@ -120,77 +166,496 @@ class MockAdapter:
     def _pick(cls, items: List[str], seed: int, offset: int) -> str:
         return items[(seed + offset) % len(items)]
 
-    async def generate(self, prompts: List[PromptItem]) -> List[GeneratedItem]:
-        results: List[GeneratedItem] = []
+    async def aclose(self) -> None:
+        return None
+
+    def _generate_one(self, item: PromptItem, titles: TitleAssigner) -> GeneratedItem:
+        seed = _hash_text(item.prompt)
+        adjective = self._pick(self._adjectives, seed, 1)
+        motif = self._pick(self._motifs, seed, 3)
+        verb = self._pick(self._verbs, seed, 5)
+        title = titles.assign(None, item, seed)
+        context_line = (
+            f"Influenciado por {', '.join(item.context_titles)}."
+            if item.context_titles
+            else 'Sem contexto conectado ainda.'
+        )
+        return GeneratedItem(
+            id=item.id,
+            title=title,
+            content=(
+                f"{title} vira um {motif} {adjective} que {verb} a historia. "
+                f"{context_line}"
+            ),
+        )
+
+    async def generate(
+        self, prompts: List[PromptItem], titles: Optional[TitleAssigner] = None
+    ) -> List[GeneratedItem]:
+        titles = titles or get_title_catalog().assigner()
+        return [self._generate_one(item, titles) for item in prompts]
+
+    async def stream(
+        self, prompts: List[PromptItem], titles: Optional[TitleAssigner] = None
+    ) -> AsyncIterator[GeneratedItem]:
+        titles = titles or get_title_catalog().assigner()
         for item in prompts:
-            seed = _hash_text(item.prompt)
-            adjective = self._pick(self._adjectives, seed, 1)
-            motif = self._pick(self._motifs, seed, 3)
-            verb = self._pick(self._verbs, seed, 5)
-            title = _normalize_title(None, item, seed)
-            context_line = (
-                f"Influenciado por {', '.join(item.context_titles)}."
-                if item.context_titles
-                else 'Sem contexto conectado ainda.'
+            yield self._generate_one(item, titles)
+
+
+Chunk = List[PromptItem]
+ChunkWorker = Callable[[Chunk], Awaitable[List[GeneratedItem]]]
+
+
+ChunkOutcome = Tuple[List[GeneratedItem], List[PromptItem], Optional[Exception]]
+
+
+def _limited(limit: int, worker: ChunkWorker) -> Callable[[Chunk], Awaitable[ChunkOutcome]]:
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(chunk: Chunk) -> ChunkOutcome:
+        async with semaphore:
+            try:
+                return await worker(chunk), [], None
+            except PartialGenerationError as error:
+                return error.results, error.failed, error.cause
+            except Exception as error:
+                logger.warning("Falha ao gerar %s blocos: %r", len(chunk), error)
+                return [], chunk, error
+
+    return run
+
+
+async def _gather_limited(chunks: List[Chunk], limit: int, worker: ChunkWorker) -> List[GeneratedItem]:
+    run = _limited(limit, worker)
+    generated: List[GeneratedItem] = []
+    failed: List[PromptItem] = []
+    cause: Optional[Exception] = None
+    for results, chunk_failed, error in await asyncio.gather(*(run(chunk) for chunk in chunks)):
+        generated.extend(results)
+        failed.extend(chunk_failed)
+        cause = cause or error
+    if cause is not None:
+        raise PartialGenerationError(generated, failed, cause)
+    return generated
+
+
+async def _iter_limited(
+    chunks: List[Chunk], limit: int, worker: ChunkWorker
+) -> AsyncIterator[GeneratedItem]:
+    run = _limited(limit, worker)
+    failed: List[PromptItem] = []
+    cause: Optional[Exception] = None
+    tasks = [asyncio.ensure_future(run(chunk)) for chunk in chunks]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            results, chunk_failed, error = await next_done
+            for generated in results:
+                yield generated
+            failed.extend(chunk_failed)
+            cause = cause or error
+    finally:
+        for task in tasks:
+            task.cancel()
+    if cause is not None:
+        raise PartialGenerationError([], failed, cause)
+
+
+def _chunk_prompts(prompts: List[PromptItem], batch_size: int) -> List[Chunk]:
+    if batch_size <= 1:
+        return [[item] for item in prompts]
+    chunks: List[Chunk] = []
+    open_chunks: Dict[str, Chunk] = {}
+    for item in prompts:
+        if not item.section:
+            chunks.append([item])
+            continue
+        chunk = open_chunks.get(item.header)
+        if chunk is None or len(chunk) >= batch_size or any(entry.id == item.id for entry in chunk):
+            chunk = []
+            open_chunks[item.header] = chunk
+            chunks.append(chunk)
+        chunk.append(item)
+    return chunks
+
+
+def _build_messages(prompt: str) -> List[dict]:
+    return [
+        {
+            'role': 'system',
+            'content': 'Voce e um designer de narrativa para campanhas de RPG.',
+        },
+        {
+            'role': 'user',
+            'content': prompt,
+        },
+    ]
+
+
+def _to_generated_item(item: PromptItem, data: dict, titles: TitleAssigner) -> GeneratedItem:
+    raw = data['choices'][0]['message']['content'].strip()
+    title, content = _parse_json_payload(raw)
+    seed = _hash_text(item.prompt)
+    normalized_title = titles.assign(title, item, seed)
+    return GeneratedItem(id=item.id, content=content, title=normalized_title)
+
+
+def claim_title(generated: GeneratedItem, item: PromptItem, titles: TitleAssigner) -> GeneratedItem:
+    return replace(generated, title=titles.assign(generated.title, item, _hash_text(item.prompt)))
+
+
+def _to_generated_batch(chunk: Chunk, data: dict, titles: TitleAssigner) -> Dict[str, GeneratedItem]:
+    raw = data['choices'][0]['message']['content'].strip()
+    by_id = {item.id: item for item in chunk}
+    generated: Dict[str, GeneratedItem] = {}
+    for position, entry in enumerate(_parse_json_items(raw)):
+        entry_id = entry.get('id')
+        if entry_id is None and position < len(chunk):
+            entry_id = chunk[position].id
+        item = by_id.get(str(entry_id))
+        parsed = _title_and_content(entry)
+        if item is None or parsed is None or item.id in generated:
+            continue
+        title, content = parsed
+        normalized_title = titles.assign(title, item, _hash_text(item.prompt))
+        generated[item.id] = GeneratedItem(id=item.id, content=content, title=normalized_title)
+    return generated
+
+
+def _is_event_stream(response: httpx.Response) -> bool:
+    return response.headers.get('content-type', '').startswith('text/event-stream')
+
+
+def _rejects_streaming(response: httpx.Response) -> bool:
+    try:
+        error = response.json().get('error')
+    except (ValueError, AttributeError):
+        return 'stream' in response.text.lower()
+    if isinstance(error, dict):
+        if error.get('param') in {'stream', 'stream_options'}:
+            return True
+        error = error.get('message')
+    return 'stream' in str(error or '').lower()
+
+
+class _ChatCompletionsAdapter:
+    temperature = 0.7
+    max_tokens = 160
+    timeout = 30.0
+
+    def __init__(
+        self,
+        config: AIProviderConfig,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        pool: Optional[HttpPoolConfig] = None,
+    ) -> None:
+        self._config = config
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._streaming = config.stream
+        self.breaker = CircuitBreaker(config.provider, config.breaker)
+        self.limiter = ProviderLimiter(config.rate_limit, config.max_concurrency, breaker=self.breaker)
+        if pool is not None:
+            self._client = create_pooled_client(
+                base_url=self._base_url(),
+                headers=self._headers(),
+                timeout=self.timeout,
+                config=pool,
+                transport=transport,
             )
-            results.append(
-                GeneratedItem(
-                    id=item.id,
-                    title=title,
-                    content=(
-                        f"{title} vira um {motif} {adjective} que {verb} a historia. "
-                        f"{context_line}"
-                    ),
-                )
+
+    @property
+    def cache_scope(self) -> str:
+        raise NotImplementedError
+
+    @property
+    def name(self) -> str:
+        return f'{self._config.provider}:{self._model_label}'
+
+    def _base_url(self) -> str:
+        return self._config.base_url
+
+    def _headers(self) -> dict:
+        raise NotImplementedError
+
+    def _check_config(self) -> None:
+        raise NotImplementedError
+
+    def _path(self) -> str:
+        raise NotImplementedError
+
+    def _params(self) -> Optional[dict]:
+        return None
+
+    async def _post(self, client: httpx.AsyncClient, payload: dict) -> httpx.Response:
+        return await client.post(self._path(), params=self._params(), json=payload)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self._base_url(),
+            headers=self._headers(),
+            timeout=self.timeout,
+            transport=self._transport,
+        )
+
+    def _payload(self, prompt: str, max_tokens: Optional[int] = None) -> dict:
+        return {
+            'messages': _build_messages(prompt),
+            'temperature': self.temperature,
+            'max_tokens': max_tokens or self.max_tokens,
+        }
+
+    @property
+    def _model_label(self) -> str:
+        return self._config.deployment or self._config.model
+
+    async def _timed_post(self, client: httpx.AsyncClient, payload: dict) -> httpx.Response:
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            response = await self._post(client, payload)
+            status = str(response.status_code)
+            return response
+        finally:
+            provider_request_seconds.observe(
+                time.perf_counter() - started, self._config.provider, self._model_label, status
             )
-        return results
 
+    def _record_usage(self, data: dict) -> None:
+        usage = data.get('usage') if isinstance(data, dict) else None
+        if not isinstance(usage, dict):
+            return
+        for kind in ('prompt', 'completion'):
+            tokens = usage.get(f'{kind}_tokens')
+            if isinstance(tokens, int):
+                provider_tokens.inc(self._config.provider, self._model_label, kind, amount=tokens)
+
+    async def _timed_stream(
+        self, client: httpx.AsyncClient, payload: dict, on_text: Callable[[str], None]
+    ) -> httpx.Response:
+        started = time.perf_counter()
+        status = 'error'
+        response: Optional[httpx.Response] = None
+        try:
+            request = client.build_request('POST', self._path(), params=self._params(), json=payload)
+            response = await client.send(request, stream=True)
+            status = str(response.status_code)
+            if response.status_code != 200 or not _is_event_stream(response):
+                await response.aread()
+                return response
+            first_token = True
+            async for line in response.aiter_lines():
+                if not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    break
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                self._record_usage(chunk)
+                for choice in chunk.get('choices') or []:
+                    text = (choice.get('delta') or {}).get('content')
+                    if not text:
+                        continue
+                    if first_token:
+                        first_token = False
+                        provider_first_token_seconds.observe(
+                            time.perf_counter() - started, self._config.provider, self._model_label
+                        )
+                    on_text(text)
+            return response
+        finally:
+            if response is not None:
+                await response.aclose()
+            provider_request_seconds.observe(
+                time.perf_counter() - started, self._config.provider, self._model_label, status
+            )
 
-class OpenAIAdapter:
-    def __init__(self, config: AIProviderConfig) -> None:
-        self._config = config
+    def _estimate_tokens(self, payload: dict) -> int:
+        return payload['max_tokens'] + sum(
+            approx_token_count(message['content']) for message in payload['messages']
+        )
 
-    async def generate(self, prompts: List[PromptItem]) -> List[GeneratedItem]:
+    async def _request(self, client: httpx.AsyncClient, payload: dict) -> dict:
+        response = await self.limiter.send(
+            self._estimate_tokens(payload), lambda: self._timed_post(client, payload)
+        )
+        response.raise_for_status()
+        data = response.json()
+        self._record_usage(data)
+        return data
+
+    async def _complete_streaming(
+        self, client: httpx.AsyncClient, item: PromptItem, sink: DeltaSink, titles: TitleAssigner
+    ) -> GeneratedItem:
+        payload = {**self._payload(item.prompt), 'stream': True, 'stream_options': {'include_usage': True}}
+        parsers: List[PartialFieldParser] = []
+        emitted = False
+
+        def on_text(text: str) -> None:
+            nonlocal emitted
+            for field, delta in parsers[-1].feed(text):
+                emitted = True
+                sink(BlockDelta(id=item.id, field=field, text=delta))
+
+        def reset() -> None:
+            nonlocal emitted
+            if emitted:
+                emitted = False
+                sink(BlockDelta(id=item.id, field='', text='', reset=True))
+
+        async def attempt() -> httpx.Response:
+            reset()
+            parsers.append(PartialFieldParser())
+            return await self._timed_stream(client, payload, on_text)
+
+        try:
+            response = await self.limiter.send(self._estimate_tokens(payload), attempt)
+        except Exception:
+            reset()
+            raise
+        if response.status_code == 400 and _rejects_streaming(response):
+            logger.warning("Provedor recusou stream (400); desativando stream de tokens.")
+            self._streaming = False
+            return _to_generated_item(item, await self._request(client, self._payload(item.prompt)), titles)
+        response.raise_for_status()
+        if not _is_event_stream(response):
+            data = response.json()
+            self._record_usage(data)
+            return _to_generated_item(item, data, titles)
+        return _to_generated_item(item, {'choices': [{'message': {'content': parsers[-1].text}}]}, titles)
+
+    async def _complete(
+        self, client: httpx.AsyncClient, item: PromptItem, titles: TitleAssigner
+    ) -> GeneratedItem:
+        sink = delta_sink.get()
+        if sink is not None and self._streaming:
+            return await self._complete_streaming(client, item, sink, titles)
+        return _to_generated_item(item, await self._request(client, self._payload(item.prompt)), titles)
+
+    async def _complete_chunk(
+        self, client: httpx.AsyncClient, chunk: Chunk, titles: TitleAssigner
+    ) -> List[GeneratedItem]:
+        if len(chunk) == 1:
+            return [await self._complete(client, chunk[0], titles)]
+
+        data = await self._request(
+            client, self._payload(build_batch_prompt(chunk), self.max_tokens * len(chunk))
+        )
+        generated = _to_generated_batch(chunk, data, titles)
+        missing = [item for item in chunk if item.id not in generated]
+        if missing:
+            logger.warning(
+                "Lote incompleto: %s de %s blocos sem resposta, gerando individualmente.",
+                len(missing),
+                len(chunk),
+            )
+        failed: List[PromptItem] = []
+        cause: Optional[Exception] = None
+        for item in missing:
+            try:
+                generated[item.id] = await self._complete(client, item, titles)
+            except Exception as error:
+                failed.append(item)
+                cause = cause or error
+        if cause is not None:
+            raise PartialGenerationError(
+                [generated[item.id] for item in chunk if item.id in generated], failed, cause
+            )
+        return [generated[item.id] for item in chunk]
+
+    async def generate(
+        self, prompts: List[PromptItem], titles: Optional[TitleAssigner] = None
+    ) -> List[GeneratedItem]:
+        self._check_config()
+        titles = titles or get_title_catalog().assigner()
+        chunks = _chunk_prompts(prompts, self._config.batch_size)
+        if self._client is not None:
+            client = self._client
+            results = await _gather_limited(
+                chunks,
+                self._config.max_concurrency,
+                lambda chunk: self._complete_chunk(client, chunk, titles),
+            )
+        else:
+            async with self._new_client() as client:
+                results = await _gather_limited(
+                    chunks,
+                    self._config.max_concurrency,
+                    lambda chunk: self._complete_chunk(client, chunk, titles),
+                )
+        by_id = {generated.id: generated for generated in results}
+        return [by_id[item.id] for item in prompts]
+
+    async def stream(
+        self, prompts: List[PromptItem], titles: Optional[TitleAssigner] = None
+    ) -> AsyncIterator[GeneratedItem]:
+        self._check_config()
+        titles = titles or get_title_catalog().assigner()
+        chunks = _chunk_prompts(prompts, self._config.batch_size)
+        if self._client is not None:
+            client = self._client
+            async for generated in _iter_limited(
+                chunks,
+                self._config.max_concurrency,
+                lambda chunk: self._complete_chunk(client, chunk, titles),
+            ):
+                yield generated
+            return
+
+        async with self._new_client() as client:
+            async for generated in _iter_limited(
+                chunks,
+                self._config.max_concurrency,
+                lambda chunk: self._complete_chunk(client, chunk, titles),
+            ):
+                yield generated
+
+
+class OpenAIAdapter(_ChatCompletionsAdapter):
+    max_tokens = 160
+    timeout = 30.0
+
+    @property
+    def cache_scope(self) -> str:
+        return f"openai|{self._config.model}|{self.temperature}|{self.max_tokens}"
+
+    def _headers(self) -> dict:
+        return {'Authorization': f"Bearer {self._config.api_key}"}
+
+    def _check_config(self) -> None:
         if not self._config.api_key:
             raise RuntimeError('OPENAI_API_KEY nao definido')
 
-        headers = {'Authorization': f"Bearer {self._config.api_key}"}
-        async with httpx.AsyncClient(base_url=self._config.base_url, headers=headers, timeout=30) as client:
-            results: List[GeneratedItem] = []
-            for item in prompts:
-                payload = {
-                    'model': self._config.model,
-                    'messages': [
-                        {
-                            'role': 'system',
-                            'content': 'Voce e um designer de narrativa para campanhas de RPG.',
-                        },
-                        {
-                            'role': 'user',
-                            'content': item.prompt,
-                        },
-                    ],
-                    'temperature': 0.7,
-                    'max_tokens': 160,
-                }
-
-                response = await client.post('/v1/chat/completions', json=payload)
-                response.raise_for_status()
-                data = response.json()
-                raw = data['choices'][0]['message']['content'].strip()
-                title, content = _parse_json_payload(raw)
-                seed = _hash_text(item.prompt)
-                normalized_title = _normalize_title(title, item, seed)
-                results.append(GeneratedItem(id=item.id, content=content, title=normalized_title))
+    def _payload(self, prompt: str, max_tokens: Optional[int] = None) -> dict:
+        return {'model': self._config.model, **super()._payload(prompt, max_tokens)}
 
-        return results
+    def _path(self) -> str:
+        return '/v1/chat/completions'
 
 
-class AzureOpenAIAdapter:
-    def __init__(self, config: AIProviderConfig) -> None:
-        self._config = config
+class AzureOpenAIAdapter(_ChatCompletionsAdapter):
+    max_tokens = 300
+    timeout = 60.0
 
-    async def generate(self, prompts: List[PromptItem]) -> List[GeneratedItem]:
+    @property
+    def cache_scope(self) -> str:
+        return f"azure|{self._config.deployment}|{self.temperature}|{self.max_tokens}"
+
+    def _base_url(self) -> str:
+        return self._config.base_url.rstrip('/')
+
+    def _headers(self) -> dict:
+        return {'api-key': self._config.api_key or ''}
+
+    def _check_config(self) -> None:
         if not self._config.api_key:
             raise RuntimeError('AZURE_OPENAI_API_KEY nao definido')
         if not self._config.deployment:
@@ -198,69 +663,257 @@ class AzureOpenAIAdapter:
         if not self._config.api_version:
             raise RuntimeError('AZURE_OPENAI_API_VERSION nao definido')
 
-        endpoint = self._config.base_url.rstrip('/')
-        headers = {'api-key': self._config.api_key}
-        path = f'/openai/deployments/{self._config.deployment}/chat/completions'
-
-        async with httpx.AsyncClient(base_url=endpoint, headers=headers, timeout=60) as client:
-            results: List[GeneratedItem] = []
-            for item in prompts:
-                payload = {
-                    'messages': [
-                        {
-                            'role': 'system',
-                            'content': 'Voce e um designer de narrativa para campanhas de RPG.',
-                        },
-                        {
-                            'role': 'user',
-                            'content': item.prompt,
-                        },
-                    ],
-                    'temperature': 0.7,
-                    'max_tokens': 300,
-                }
-
-                response = await client.post(
-                    path,
-                    params={'api-version': self._config.api_version},
-                    json=payload,
-                )
-                response.raise_for_status()
-                data = response.json()
-                raw = data['choices'][0]['message']['content'].strip()
-                title, content = _parse_json_payload(raw)
-                seed = _hash_text(item.prompt)
-                normalized_title = _normalize_title(title, item, seed)
-                results.append(GeneratedItem(id=item.id, content=content, title=normalized_title))
+    def _path(self) -> str:
+        return f'/openai/deployments/{self._config.deployment}/chat/completions'
+
+    def _params(self) -> Optional[dict]:
+        return {'api-version': self._config.api_version}
 
-        return results
 
+Outcome = Tuple[PromptItem, Optional[GeneratedItem], Optional[BaseException]]
 
-def get_adapter() -> AIAdapter:
+
+class RoutingAdapter:
+    def __init__(
+        self,
+        routes: List[_ChatCompletionsAdapter],
+        config: RoutingConfig,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self._routes = routes
+        self._config = config
+        self._rng = rng or random.Random()
+        self._max_concurrency = sum(route._config.max_concurrency for route in routes)
+        self._hedges_in_flight = 0
+        self.stats = [RouteStats(route.name, config) for route in routes]
+
+    @property
+    def cache_scope(self) -> str:
+        return 'routing|' + '|'.join(sorted(route.cache_scope for route in self._routes))
+
+    def snapshot(self) -> dict:
+        return {
+            'hedge': self._config.hedge,
+            'hedges_in_flight': self._hedges_in_flight,
+            'routes': [stats.snapshot() for stats in self.stats],
+        }
+
+    async def aclose(self) -> None:
+        for route in self._routes:
+            await route.aclose()
+
+    def _ranked(self) -> List[int]:
+        ranked = rank_routes(self.stats, self._rng)
+        return sorted(ranked, key=lambda index: self._routes[index].breaker.state == OPEN)
+
+    async def _call(
+        self, index: int, item: PromptItem, sink: Optional[DeltaSink], titles: TitleAssigner
+    ) -> GeneratedItem:
+        delta_sink.set(sink)
+        started = time.perf_counter()
+        try:
+            results = await self._routes[index].generate([item], titles)
+        except Exception:
+            self.stats[index].record(None)
+            raise
+        self.stats[index].record(time.perf_counter() - started)
+        return results[0]
+
+    async def _complete(self, item: PromptItem, titles: TitleAssigner) -> GeneratedItem:
+        ranked = self._ranked()
+        sink = delta_sink.get()
+        owner: List[int] = []
+
+        def gate(index: int) -> Optional[DeltaSink]:
+            if sink is None:
+                return None
+
+            def emit(delta: BlockDelta) -> None:
+                if not owner:
+                    owner.append(index)
+                if owner[0] == index:
+                    sink(delta)
+
+            return emit
+
+        loop = asyncio.get_running_loop()
+        pending: Dict[asyncio.Future, int] = {}
+        launched = 0
+        last_started = 0.0
+        hedged = False
+        cause: Optional[BaseException] = None
+
+        def launch() -> None:
+            nonlocal launched, last_started
+            index = ranked[launched]
+            pending[asyncio.ensure_future(self._call(index, item, gate(index), titles.fork()))] = index
+            launched += 1
+            last_started = loop.time()
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if (
+                    self._config.hedge
+                    and not hedged
+                    and launched < len(ranked)
+                    and self._hedges_in_flight < self._config.max_hedges
+                ):
+                    delay = self.stats[ranked[launched - 1]].hedge_delay()
+                    timeout = max(0.0, last_started + delay - loop.time())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    self._hedges_in_flight += 1
+                    self.stats[ranked[launched]].hedged += 1
+                    launch()
+                    continue
+                for task in done:
+                    index = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if hedged:
+                            winner = index == ranked[launched - 1]
+                            if winner:
+                                self.stats[index].hedge_wins += 1
+                            provider_hedges.inc(self.stats[index].name, 'hedge' if winner else 'primary')
+                        return claim_title(task.result(), item, titles)
+                    cause = cause or error
+                    if owner and owner[0] == index:
+                        if pending:
+                            owner[0] = -1
+                        else:
+                            owner.clear()
+                if not pending and launched < len(ranked):
+                    logger.warning("Rota %s falhou (%r); tentando a proxima.", self.stats[index].name, error)
+                    launch()
+            raise cause
+        finally:
+            for task in pending:
+                task.cancel()
+            if hedged:
+                self._hedges_in_flight -= 1
+
+    def _settle(
+        self, semaphore: asyncio.Semaphore, titles: TitleAssigner
+    ) -> Callable[[PromptItem], Awaitable[Outcome]]:
+        async def run(item: PromptItem) -> Outcome:
+            async with semaphore:
+                try:
+                    return item, await self._complete(item, titles), None
+                except Exception as error:
+                    return item, None, error
+
+        return run
+
+    async def generate(
+        self, prompts: List[PromptItem], titles: Optional[TitleAssigner] = None
+    ) -> List[GeneratedItem]:
+        titles = titles or get_title_catalog().assigner()
+        run = self._settle(asyncio.Semaphore(max(1, self._max_concurrency)), titles)
+        results: List[GeneratedItem] = []
+        failed: List[PromptItem] = []
+        cause: Optional[BaseException] = None
+        for item, generated, error in await asyncio.gather(*(run(item) for item in prompts)):
+            if generated is not None:
+                results.append(generated)
+            else:
+                failed.append(item)
+                cause = cause or error
+        if cause is not None:
+            raise PartialGenerationError(results, failed, cause)
+        return results
+
+    async def stream(
+        self, prompts: List[PromptItem], titles: Optional[TitleAssigner] = None
+    ) -> AsyncIterator[GeneratedItem]:
+        titles = titles or get_title_catalog().assigner()
+        run = self._settle(asyncio.Semaphore(max(1, self._max_concurrency)), titles)
+        failed: List[PromptItem] = []
+        cause: Optional[BaseException] = None
+        tasks = [asyncio.ensure_future(run(item)) for item in prompts]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item, generated, error = await next_done
+                if generated is not None:
+                    yield generated
+                else:
+                    failed.append(item)
+                    cause = cause or error
+        finally:
+            for task in tasks:
+                task.cancel()
+        if cause is not None:
+            raise PartialGenerationError([], failed, cause)
+
+
+def _read_positive_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _read_stream(name: str) -> bool:
+    return os.getenv(name, 'true').lower() in {'1', 'true', 'yes'}
+
+
+def _openai_config() -> AIProviderConfig:
+    return AIProviderConfig(
+        provider='openai',
+        model=os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
+        api_key=os.getenv('OPENAI_API_KEY'),
+        base_url=os.getenv('OPENAI_BASE_URL', 'https://api.openai.com'),
+        max_concurrency=_read_positive_int('OPENAI_MAX_CONCURRENCY', 4),
+        batch_size=_read_positive_int('OPENAI_BATCH_SIZE', 1),
+        stream=_read_stream('OPENAI_STREAM'),
+        rate_limit=read_rate_limit_config('OPENAI'),
+        breaker=read_breaker_config(),
+    )
+
+
+def _azure_config(deployment: Optional[str]) -> AIProviderConfig:
+    return AIProviderConfig(
+        provider='azure',
+        model=os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
+        api_key=os.getenv('AZURE_OPENAI_API_KEY'),
+        base_url=os.getenv('AZURE_OPENAI_ENDPOINT', 'https://api.openai.com'),
+        deployment=deployment,
+        api_version=os.getenv('AZURE_OPENAI_API_VERSION'),
+        max_concurrency=_read_positive_int('AZURE_OPENAI_MAX_CONCURRENCY', 4),
+        batch_size=_read_positive_int('AZURE_OPENAI_BATCH_SIZE', 1),
+        stream=_read_stream('AZURE_OPENAI_STREAM'),
+        rate_limit=read_rate_limit_config('AZURE_OPENAI'),
+        breaker=read_breaker_config(),
+    )
+
+
+def _routing_adapter(pool: Optional[HttpPoolConfig]) -> AIAdapter:
+    routes: List[_ChatCompletionsAdapter] = []
+    if os.getenv('OPENAI_API_KEY'):
+        routes.append(OpenAIAdapter(_openai_config(), pool=pool))
+    deployments = os.getenv('AZURE_OPENAI_DEPLOYMENTS') or os.getenv('AZURE_OPENAI_DEPLOYMENT') or ''
+    if os.getenv('AZURE_OPENAI_API_KEY'):
+        for deployment in [name.strip() for name in deployments.split(',') if name.strip()]:
+            routes.append(AzureOpenAIAdapter(_azure_config(deployment), pool=pool))
+    if not routes:
+        logger.warning("AI_PROVIDER=routing sem provedores configurados; usando mock.")
+        return MockAdapter()
+    logger.info("Roteamento entre provedores: %s", ', '.join(route.name for route in routes))
+    return RoutingAdapter(routes, read_routing_config())
+
+
+def get_adapter(pool: Optional[HttpPoolConfig] = None) -> AIAdapter:
     provider = os.getenv('AI_PROVIDER', 'mock').lower()
-    model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
-    api_key = os.getenv('OPENAI_API_KEY')
-    base_url = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com')
-    azure_endpoint = os.getenv('AZURE_OPENAI_ENDPOINT', 'https://api.openai.com')
-    azure_deployment = os.getenv('AZURE_OPENAI_DEPLOYMENT')
-    azure_api_version = os.getenv('AZURE_OPENAI_API_VERSION')
-    azure_api_key = os.getenv('AZURE_OPENAI_API_KEY')
 
     if provider == 'openai':
-        return OpenAIAdapter(
-            AIProviderConfig(provider=provider, model=model, api_key=api_key, base_url=base_url)
-        )
+        return OpenAIAdapter(_openai_config(), pool=pool)
 
     if provider == 'azure':
-        return AzureOpenAIAdapter(
-            AIProviderConfig(
-                provider=provider,
-                model=model,
-                api_key=azure_api_key,
-                base_url=azure_endpoint,
-                deployment=azure_deployment,
-                api_version=azure_api_version,
-            )
-        )
+        return AzureOpenAIAdapter(_azure_config(os.getenv('AZURE_OPENAI_DEPLOYMENT')), pool=pool)
+
+    if provider == 'routing':
+        return _routing_adapter(pool)
 
     return MockAdapter()
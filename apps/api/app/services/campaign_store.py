@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Type, Union
+from uuid import uuid4
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.db.models import Campaign, CampaignEdge, CampaignNode
+from app.services import json_codec
+
+STORAGE_FORMAT = 'rows'
+
+GraphModel = Union[Type[CampaignNode], Type[CampaignEdge]]
+
+
+@dataclass(frozen=True)
+class RawGraph:
+    nodes: List[str]
+    edges: List[str]
+
+
+def parse_meta(campaign: Campaign) -> dict:
+    try:
+        return json.loads(campaign.data)
+    except json.JSONDecodeError:
+        return {}
+
+
+def is_row_backed(meta: dict) -> bool:
+    return meta.get('format') == STORAGE_FORMAT
+
+
+def dump_meta(party_profile: Optional[dict]) -> str:
+    return json.dumps({'format': STORAGE_FORMAT, 'party_profile': party_profile})
+
+
+def _keyed(raw: dict) -> Tuple[str, dict]:
+    if raw.get('id'):
+        return str(raw['id']), raw
+    key = uuid4().hex
+    return key, {**raw, 'id': key}
+
+
+def _node_row(campaign_id: str, raw: dict, key: str, sort_order: int) -> dict:
+    return {'campaign_id': campaign_id, 'node_id': key, 'sort_order': sort_order, 'data': json_codec.dumps(raw)}
+
+
+def _edge_row(campaign_id: str, raw: dict, key: str, sort_order: int) -> dict:
+    return {
+        'campaign_id': campaign_id,
+        'edge_id': key,
+        'source': raw.get('source'),
+        'target': raw.get('target'),
+        'sort_order': sort_order,
+        'data': json_codec.dumps(raw),
+    }
+
+
+def _key_column(model: GraphModel):
+    return model.node_id if model is CampaignNode else model.edge_id
+
+
+def _upsert(db: Session, model: GraphModel, rows: List[dict]) -> None:
+    if not rows:
+        return
+    statement = insert(model)
+    updated = {
+        name: statement.excluded[name]
+        for name in rows[0]
+        if name not in {'campaign_id', 'node_id', 'edge_id'}
+    }
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=['campaign_id', _key_column(model).key],
+            set_=updated,
+        ),
+        rows,
+    )
+
+
+def _delete_keys(db: Session, model: GraphModel, campaign_id: str, keys: Sequence[str]) -> None:
+    if not keys:
+        return
+    db.execute(
+        delete(model).where(model.campaign_id == campaign_id, _key_column(model).in_(list(keys)))
+    )
+
+
+def _sync(db: Session, model: GraphModel, campaign_id: str, rows: Dict[str, dict]) -> None:
+    key_column = _key_column(model)
+    existing = {
+        key: (sort_order, data)
+        for key, sort_order, data in db.execute(
+            select(key_column, model.sort_order, model.data).where(model.campaign_id == campaign_id)
+        )
+    }
+    changed = [
+        row for key, row in rows.items() if existing.get(key) != (row['sort_order'], row['data'])
+    ]
+    removed = [key for key in existing if key not in rows]
+    _upsert(db, model, changed)
+    _delete_keys(db, model, campaign_id, removed)
+
+
+def replace_graph(db: Session, campaign_id: str, nodes: List[dict], edges: List[dict]) -> RawGraph:
+    node_rows = {}
+    for index, raw in enumerate(nodes):
+        key, raw = _keyed(raw)
+        node_rows[key] = _node_row(campaign_id, raw, key, index)
+    edge_rows = {}
+    for index, raw in enumerate(edges):
+        key, raw = _keyed(raw)
+        edge_rows[key] = _edge_row(campaign_id, raw, key, index)
+
+    _sync(db, CampaignNode, campaign_id, node_rows)
+    _sync(db, CampaignEdge, campaign_id, edge_rows)
+    return RawGraph(
+        nodes=[row['data'] for row in node_rows.values()],
+        edges=[row['data'] for row in edge_rows.values()],
+    )
+
+
+def _next_order(db: Session, model: GraphModel, campaign_id: str) -> int:
+    current = db.execute(
+        select(func.max(model.sort_order)).where(model.campaign_id == campaign_id)
+    ).scalar()
+    return 0 if current is None else current + 1
+
+
+def _existing_orders(db: Session, model: GraphModel, campaign_id: str, keys: List[str]) -> Dict[str, int]:
+    if not keys:
+        return {}
+    key_column = _key_column(model)
+    return dict(
+        db.execute(
+            select(key_column, model.sort_order).where(
+                model.campaign_id == campaign_id, key_column.in_(keys)
+            )
+        ).all()
+    )
+
+
+def _patch_rows(db: Session, model: GraphModel, campaign_id: str, upserts: List[dict]) -> None:
+    if not upserts:
+        return
+    make_row = _node_row if model is CampaignNode else _edge_row
+    keyed = dict(_keyed(raw) for raw in upserts)
+    orders = _existing_orders(db, model, campaign_id, list(keyed))
+    next_order = _next_order(db, model, campaign_id)
+    rows = []
+    for key, raw in keyed.items():
+        if key not in orders:
+            orders[key] = next_order
+            next_order += 1
+        rows.append(make_row(campaign_id, raw, key, orders[key]))
+    _upsert(db, model, rows)
+
+
+def ensure_row_backed(db: Session, campaign: Campaign) -> dict:
+    meta = parse_meta(campaign)
+    if is_row_backed(meta):
+        return meta
+    replace_graph(db, campaign.id, meta.get('nodes', []), meta.get('edges', []))
+    campaign.data = dump_meta(meta.get('party_profile'))
+    return parse_meta(campaign)
+
+
+def apply_patch(
+    db: Session,
+    campaign: Campaign,
+    upsert_nodes: List[dict],
+    delete_node_ids: List[str],
+    upsert_edges: List[dict],
+    delete_edge_ids: List[str],
+) -> None:
+    ensure_row_backed(db, campaign)
+    if delete_node_ids:
+        _delete_keys(db, CampaignNode, campaign.id, delete_node_ids)
+        db.execute(
+            delete(CampaignEdge).where(
+                CampaignEdge.campaign_id == campaign.id,
+                or_(
+                    CampaignEdge.source.in_(delete_node_ids),
+                    CampaignEdge.target.in_(delete_node_ids),
+                ),
+            )
+        )
+    _delete_keys(db, CampaignEdge, campaign.id, delete_edge_ids)
+    _patch_rows(db, CampaignNode, campaign.id, upsert_nodes)
+    _patch_rows(db, CampaignEdge, campaign.id, upsert_edges)
+
+
+def delete_graph(db: Session, campaign_id: str) -> None:
+    db.execute(delete(CampaignNode).where(CampaignNode.campaign_id == campaign_id))
+    db.execute(delete(CampaignEdge).where(CampaignEdge.campaign_id == campaign_id))
+
+
+def _load_texts(db: Session, model: GraphModel, campaign_id: str) -> List[str]:
+    return list(
+        db.execute(
+            select(model.data).where(model.campaign_id == campaign_id).order_by(model.sort_order)
+        ).scalars()
+    )
+
+
+def load_raw_graph(db: Session, campaign: Campaign, meta: dict) -> Optional[RawGraph]:
+    if not is_row_backed(meta):
+        return None
+    return RawGraph(
+        nodes=_load_texts(db, CampaignNode, campaign.id),
+        edges=_load_texts(db, CampaignEdge, campaign.id),
+    )
+
+
+def load_payload(db: Session, campaign: Campaign) -> dict:
+    meta = parse_meta(campaign)
+    if not is_row_backed(meta):
+        return {
+            'nodes': meta.get('nodes', []),
+            'edges': meta.get('edges', []),
+            'party_profile': meta.get('party_profile'),
+        }
+    return {
+        'nodes': [json_codec.loads(text) for text in _load_texts(db, CampaignNode, campaign.id)],
+        'edges': [json_codec.loads(text) for text in _load_texts(db, CampaignEdge, campaign.id)],
+        'party_profile': meta.get('party_profile'),
+    }
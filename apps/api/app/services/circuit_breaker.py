@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    failure_threshold: int = 5
+    reset_seconds: float = 30.0
+    half_open_calls: int = 1
+
+
+def read_breaker_config() -> BreakerConfig:
+    try:
+        failure_threshold = max(1, int(os.getenv('AI_BREAKER_FAILURES', '5')))
+    except ValueError:
+        failure_threshold = 5
+    try:
+        reset_seconds = max(0.0, float(os.getenv('AI_BREAKER_RESET_SECONDS', '30')))
+    except ValueError:
+        reset_seconds = 30.0
+    return BreakerConfig(failure_threshold=failure_threshold, reset_seconds=reset_seconds)
+
+
+class CircuitBreaker:
+    def __init__(
+        self, name: str, config: BreakerConfig, clock: Optional[Callable[[], float]] = None
+    ) -> None:
+        self.name = name
+        self._config = config
+        self._clock = clock or time.monotonic
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = self._clock()
+        self._probes = 0
+        self.opened += 1
+
+    def before_call(self) -> None:
+        if self.state == OPEN and self._clock() - self._opened_at >= self._config.reset_seconds:
+            self.state = HALF_OPEN
+            self._probes = 0
+        if self.state == CLOSED:
+            return
+        if self.state == HALF_OPEN and self._probes < self._config.half_open_calls:
+            self._probes += 1
+            return
+        self.rejected += 1
+        raise CircuitOpenError(f'Circuito aberto para {self.name}')
+
+    def record(self, success: Optional[bool]) -> None:
+        if self.state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+        if success is None:
+            return
+        if success:
+            self.state = CLOSED
+            self._failures = 0
+            return
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self._failures += 1
+        if self.state == CLOSED and self._failures >= self._config.failure_threshold:
+            self._open()
+
+    def snapshot(self) -> dict:
+        return {
+            'name': self.name,
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'opened': self.opened,
+            'rejected': self.rejected,
+        }
@@ -1,11 +1,36 @@
 from __future__ import annotations
 
-from typing import List, Optional, Tuple
+import asyncio
+import os
+import time
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
 import logging
 
-from app.services.ai_adapter import GeneratedItem, MockAdapter, get_adapter
-from app.services.prompt_builder import PromptConfig, PromptItem, build_prompts
+from app.services.ai_adapter import (
+    AIAdapter,
+    BlockDelta,
+    GeneratedItem,
+    MockAdapter,
+    PartialGenerationError,
+    claim_title,
+    delta_sink,
+    get_adapter,
+)
+from app.services.generation_cache import GenerationCache, make_cache_key
+from app.services.metrics import mock_fallback_items, prompt_build_seconds
+from app.services.prompt_builder import (
+    CampaignGraph,
+    PromptConfig,
+    PromptItem,
+    build_prompts,
+    build_prompts_from_graph,
+    compile_graph,
+)
+from app.services.summaries import extract_summary, read_summary_config
+from app.services.title_catalog import TitleAssigner, get_title_catalog
+from app.services.waves import apply_generated, plan_waves
 
 
 logger = logging.getLogger(__name__)
@@ -18,18 +43,318 @@ def build_prompt_items(
     campaign_title: Optional[str],
     party_profile: Optional[dict],
     config: PromptConfig,
+    summaries: Optional[Mapping[str, str]] = None,
 ) -> List[PromptItem]:
-    return build_prompts(target_ids, raw_nodes, raw_edges, campaign_title, party_profile, config)
+    return build_prompts(
+        target_ids, raw_nodes, raw_edges, campaign_title, party_profile, config, summaries
+    )
 
 
-async def generate_story_blocks(
+@dataclass(frozen=True)
+class GenerationEvent:
+    kind: str
+    item: Optional[GeneratedItem] = None
+    mode: Optional[str] = None
+    count: int = 0
+    delta: Optional[BlockDelta] = None
+
+
+class FlightStats:
+    def __init__(self) -> None:
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    def snapshot(self) -> dict:
+        return {'leaders': self.leaders, 'coalesced': self.coalesced, 'abandoned': self.abandoned}
+
+
+class _Driver:
+    def __init__(self) -> None:
+        self.task: Optional[asyncio.Future] = None
+        self.waiters = 0
+
+
+@dataclass
+class _Flight:
+    future: asyncio.Future
+    driver: _Driver
+
+
+Producer = Callable[[List[PromptItem]], AsyncIterator[GeneratedItem]]
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+async def _from_generate(adapter: AIAdapter, prompts: List[PromptItem]) -> AsyncIterator[GeneratedItem]:
+    try:
+        results = await adapter.generate(prompts)
+    except PartialGenerationError as error:
+        for generated in error.results:
+            yield generated
+        raise
+    for generated in results:
+        yield generated
+
+
+async def _with_deltas(source: AsyncIterator[GeneratedItem]) -> AsyncIterator[Tuple[str, object]]:
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump() -> None:
+        delta_sink.set(lambda delta: queue.put_nowait(('delta', delta)))
+        try:
+            async for generated in source:
+                queue.put_nowait(('block', generated))
+        except Exception as error:
+            queue.put_nowait(('error', error))
+        else:
+            queue.put_nowait(('end', None))
+
+    task = asyncio.ensure_future(pump())
+    try:
+        while True:
+            kind, value = await queue.get()
+            if kind == 'error':
+                raise value
+            if kind == 'end':
+                return
+            yield kind, value
+    finally:
+        task.cancel()
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._flights: Dict[str, _Flight] = {}
+        self.stats = FlightStats()
+
+    def snapshot(self) -> dict:
+        return {'in_flight': len(self._flights), **self.stats.snapshot()}
+
+    def _join(
+        self, keyed: Dict[str, PromptItem], produce: Producer
+    ) -> Tuple[Dict[str, _Flight], List[_Driver]]:
+        flights: Dict[str, _Flight] = {}
+        leaders: Dict[str, PromptItem] = {}
+        for key, item in keyed.items():
+            flight = self._flights.get(key)
+            if flight is None:
+                leaders[key] = item
+            else:
+                flights[key] = flight
+                self.stats.coalesced += 1
+
+        if leaders:
+            driver = _Driver()
+            loop = asyncio.get_running_loop()
+            owned: Dict[str, _Flight] = {}
+            for key in leaders:
+                future = loop.create_future()
+                future.add_done_callback(_consume_exception)
+                owned[key] = _Flight(future=future, driver=driver)
+            self._flights.update(owned)
+            flights.update(owned)
+            driver.task = asyncio.ensure_future(self._drive(leaders, owned, produce))
+            self.stats.leaders += len(leaders)
+
+        drivers = list({id(flight.driver): flight.driver for flight in flights.values()}.values())
+        for driver in drivers:
+            driver.waiters += 1
+        return flights, drivers
+
+    async def _drive(
+        self, leaders: Dict[str, PromptItem], owned: Dict[str, _Flight], produce: Producer
+    ) -> None:
+        key_by_id = {item.id: key for key, item in leaders.items()}
+        try:
+            async for generated in produce(list(leaders.values())):
+                flight = owned.get(key_by_id.get(generated.id, ''))
+                if flight is not None and not flight.future.done():
+                    flight.future.set_result(generated)
+        except asyncio.CancelledError:
+            for flight in owned.values():
+                flight.future.cancel()
+            raise
+        except Exception as error:
+            for flight in owned.values():
+                if not flight.future.done():
+                    flight.future.set_exception(error)
+        finally:
+            for key, flight in owned.items():
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if not flight.future.done():
+                    flight.future.set_exception(
+                        RuntimeError(f'Adapter nao retornou o bloco {leaders[key].id}')
+                    )
+
+    def _leave(self, drivers: List[_Driver]) -> None:
+        for driver in drivers:
+            driver.waiters -= 1
+            if driver.waiters <= 0 and driver.task is not None and not driver.task.done():
+                driver.task.cancel()
+                self.stats.abandoned += 1
+
+    async def generate(
+        self, adapter: AIAdapter, prompts: List[PromptItem], keys: List[str]
+    ) -> List[GeneratedItem]:
+        flights, drivers = self._join(
+            dict(zip(keys, prompts)), lambda items: _from_generate(adapter, items)
+        )
+        try:
+            outcomes = await asyncio.gather(
+                *(asyncio.shield(flights[key].future) for key in keys), return_exceptions=True
+            )
+        finally:
+            self._leave(drivers)
+
+        results: List[GeneratedItem] = []
+        failed: List[PromptItem] = []
+        cause: Optional[BaseException] = None
+        for item, outcome in zip(prompts, outcomes):
+            if isinstance(outcome, BaseException):
+                failed.append(item)
+                cause = cause or outcome
+            else:
+                results.append(replace(outcome, id=item.id))
+        if cause is not None:
+            raise PartialGenerationError(results, failed, cause)
+        return results
+
+    async def stream(
+        self, adapter: AIAdapter, prompts: List[PromptItem], keys: List[str]
+    ) -> AsyncIterator[GeneratedItem]:
+        flights, drivers = self._join(dict(zip(keys, prompts)), adapter.stream)
+
+        async def wait(
+            item: PromptItem, key: str
+        ) -> Tuple[PromptItem, Optional[GeneratedItem], Optional[BaseException]]:
+            future = flights[key].future
+            try:
+                return item, replace(await asyncio.shield(future), id=item.id), None
+            except asyncio.CancelledError as error:
+                if not future.cancelled():
+                    raise
+                return item, None, error
+            except Exception as error:
+                return item, None, error
+
+        failed: List[PromptItem] = []
+        cause: Optional[BaseException] = None
+        tasks = [asyncio.ensure_future(wait(item, key)) for item, key in zip(prompts, keys)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item, generated, error = await next_done
+                if generated is not None:
+                    yield generated
+                else:
+                    failed.append(item)
+                    cause = cause or error
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._leave(drivers)
+        if cause is not None:
+            raise PartialGenerationError([], failed, cause)
+
+
+def single_flight_enabled() -> bool:
+    return os.getenv('GENERATION_SINGLE_FLIGHT', 'true').lower() in {'1', 'true', 'yes'}
+
+
+def _prompt_keys(adapter: AIAdapter, prompts: List[PromptItem]) -> List[str]:
+    return [make_cache_key(adapter.cache_scope, item.prompt) for item in prompts]
+
+
+async def _generate_fresh(
+    adapter: AIAdapter, prompts: List[PromptItem], flights: Optional[SingleFlight]
+) -> List[GeneratedItem]:
+    try:
+        if flights is None:
+            return await adapter.generate(prompts)
+        return await flights.generate(adapter, prompts, _prompt_keys(adapter, prompts))
+    except PartialGenerationError as error:
+        logger.warning(
+            "Geracao parcial: %s de %s blocos falharam (%r).",
+            len(error.failed),
+            len(prompts),
+            error.cause,
+        )
+        return error.results
+
+
+def _claim_titles(
+    prompts: List[PromptItem], generated: List[GeneratedItem], titles: TitleAssigner
+) -> List[GeneratedItem]:
+    by_id = {item.id: item for item in prompts}
+    return [claim_title(item, by_id[item.id], titles) for item in generated]
+
+
+async def _fill_with_mock(
+    prompts: List[PromptItem], generated: List[GeneratedItem], mode: str, titles: TitleAssigner
+) -> List[GeneratedItem]:
+    by_id = {item.id: replace(item, mode=item.mode or mode) for item in generated}
+    missing = [item for item in prompts if item.id not in by_id]
+    if missing:
+        logger.info("Fallback mock por bloco: %s de %s.", len(missing), len(prompts))
+        mock_fallback_items.inc(mode, amount=len(missing))
+        for item in await MockAdapter().generate(missing, titles):
+            by_id[item.id] = replace(item, mode='mock')
+    return [by_id[item.id] for item in prompts]
+
+
+def summarize_mode(modes: Iterable[Optional[str]]) -> str:
+    distinct = {mode for mode in modes if mode}
+    if not distinct:
+        return 'none'
+    return distinct.pop() if len(distinct) == 1 else 'partial'
+
+
+def _adapter_mode(adapter: AIAdapter) -> str:
+    return adapter.__class__.__name__.replace('Adapter', '').lower()
+
+
+def _refresh_summaries(
+    summaries: Optional[Mapping[str, str]], generated: List[GeneratedItem]
+) -> Optional[Mapping[str, str]]:
+    if summaries is None:
+        return None
+    max_chars = read_summary_config().max_chars
+    fresh = {
+        item.id: extract_summary(item.content, max_chars) for item in generated if item.content.strip()
+    }
+    regenerated = {item.id for item in generated}
+    kept = {node_id: summary for node_id, summary in summaries.items() if node_id not in regenerated}
+    return {**kept, **fresh}
+
+
+def _prepare_prompts(
     target_ids: List[str],
     raw_nodes: List[dict],
     raw_edges: List[dict],
     campaign_title: Optional[str],
     party_profile: Optional[dict],
     config: PromptConfig,
-) -> Tuple[str, List[GeneratedItem]]:
+    graph: Optional[CampaignGraph] = None,
+    summaries: Optional[Mapping[str, str]] = None,
+) -> List[PromptItem]:
+    if graph is not None:
+        logger.info(
+            "Geracao solicitada (indice): targets=%s nodes=%s edges=%s",
+            target_ids,
+            len(graph.node_map),
+            graph.edge_count,
+        )
+        started = time.perf_counter()
+        prompts = build_prompts_from_graph(
+            target_ids, graph, campaign_title, party_profile, config, summaries
+        )
+        prompt_build_seconds.observe(time.perf_counter() - started, 'index')
+        return prompts
+
     logger.info(
         "Geracao solicitada: targets=%s nodes=%s edges=%s",
         target_ids,
@@ -40,23 +365,209 @@ async def generate_story_blocks(
         "Relacoes: %s",
         [f"{edge.get('source')} -> {edge.get('target')}" for edge in raw_edges],
     )
+    started = time.perf_counter()
     prompts = build_prompt_items(
-        target_ids, raw_nodes, raw_edges, campaign_title, party_profile, config
+        target_ids, raw_nodes, raw_edges, campaign_title, party_profile, config, summaries
+    )
+    prompt_build_seconds.observe(time.perf_counter() - started, 'raw')
+    return prompts
+
+
+async def generate_story_blocks(
+    target_ids: List[str],
+    raw_nodes: List[dict],
+    raw_edges: List[dict],
+    campaign_title: Optional[str],
+    party_profile: Optional[dict],
+    config: PromptConfig,
+    adapter: Optional[AIAdapter] = None,
+    cache: Optional[GenerationCache] = None,
+    use_cache: bool = True,
+    graph: Optional[CampaignGraph] = None,
+    flights: Optional[SingleFlight] = None,
+    waves: bool = False,
+    summaries: Optional[Mapping[str, str]] = None,
+    titles: Optional[TitleAssigner] = None,
+) -> Tuple[str, List[GeneratedItem]]:
+    titles = titles or get_title_catalog().assigner()
+    if waves:
+        graph = graph or compile_graph(raw_nodes, raw_edges)
+        plan = plan_waves(target_ids, graph, config.max_depth)
+        logger.info(
+            "Geracao em ondas: ondas=%s larguras=%s",
+            len(plan.waves),
+            [len(wave) for wave in plan.waves],
+        )
+        generated_by_id: Dict[str, GeneratedItem] = {}
+        for wave in plan.waves:
+            _, generated = await generate_story_blocks(
+                wave, [], [], campaign_title, party_profile, config,
+                adapter=adapter, cache=cache, use_cache=use_cache, graph=graph, flights=flights,
+                summaries=summaries, titles=titles,
+            )
+            generated_by_id.update((item.id, item) for item in generated)
+            graph = apply_generated(graph, generated)
+            summaries = _refresh_summaries(summaries, generated)
+        ordered = [
+            generated_by_id[target_id]
+            for target_id in dict.fromkeys(target_ids)
+            if target_id in generated_by_id
+        ]
+        return (summarize_mode(item.mode for item in ordered), ordered)
+
+    prompts = _prepare_prompts(
+        target_ids, raw_nodes, raw_edges, campaign_title, party_profile, config, graph, summaries
     )
     if not prompts:
         logger.info("Nenhum prompt gerado.")
         return ('none', [])
 
-    adapter = get_adapter()
+    adapter = adapter or get_adapter()
+    logger.info("Adapter ativo: %s", adapter.__class__.__name__)
+    mode = _adapter_mode(adapter)
     try:
-        logger.info("Adapter ativo: %s", adapter.__class__.__name__)
-        generated = await adapter.generate(prompts)
-        mode = adapter.__class__.__name__.replace('Adapter', '').lower()
-        logger.info("Geracao concluida: mode=%s items=%s", mode, len(generated))
-        return (mode, generated)
+        if cache is None or not cache.enabled or not use_cache:
+            generated = await _generate_fresh(adapter, prompts, flights)
+        else:
+            generated = await _generate_with_cache(adapter, cache, prompts, flights)
     except Exception:
         logger.exception("Falha no adapter real, usando mock.")
-        mock = MockAdapter()
-        generated = await mock.generate(prompts)
-        logger.info("Geracao mock concluida: items=%s", len(generated))
-        return ('mock', generated)
+        generated = []
+
+    generated = _claim_titles(prompts, generated, titles)
+    generated = await _fill_with_mock(prompts, generated, mode, titles)
+    overall = summarize_mode(item.mode for item in generated)
+    logger.info("Geracao concluida: mode=%s items=%s", overall, len(generated))
+    return (overall, generated)
+
+
+async def _generate_with_cache(
+    adapter: AIAdapter,
+    cache: GenerationCache,
+    prompts: List[PromptItem],
+    flights: Optional[SingleFlight] = None,
+) -> List[GeneratedItem]:
+    keys = _prompt_keys(adapter, prompts)
+    cached = await cache.get_many(keys)
+    missing = [item for item, key in zip(prompts, keys) if key not in cached]
+    logger.info("Cache: hits=%s misses=%s", len(prompts) - len(missing), len(missing))
+
+    fresh = {item.id: item for item in await _generate_fresh(adapter, missing, flights)} if missing else {}
+    await cache.put_many(
+        {
+            key: (fresh[item.id].title, fresh[item.id].content)
+            for item, key in zip(prompts, keys)
+            if key not in cached and item.id in fresh
+        }
+    )
+
+    results: List[GeneratedItem] = []
+    for item, key in zip(prompts, keys):
+        if key in cached:
+            title, content = cached[key]
+            results.append(GeneratedItem(id=item.id, title=title, content=content))
+        elif item.id in fresh:
+            results.append(fresh[item.id])
+    return results
+
+
+async def stream_story_blocks(
+    target_ids: List[str],
+    raw_nodes: List[dict],
+    raw_edges: List[dict],
+    campaign_title: Optional[str],
+    party_profile: Optional[dict],
+    config: PromptConfig,
+    adapter: Optional[AIAdapter] = None,
+    cache: Optional[GenerationCache] = None,
+    use_cache: bool = True,
+    graph: Optional[CampaignGraph] = None,
+    flights: Optional[SingleFlight] = None,
+    waves: bool = False,
+    summaries: Optional[Mapping[str, str]] = None,
+    titles: Optional[TitleAssigner] = None,
+) -> AsyncIterator[GenerationEvent]:
+    titles = titles or get_title_catalog().assigner()
+    if waves:
+        graph = graph or compile_graph(raw_nodes, raw_edges)
+        plan = plan_waves(target_ids, graph, config.max_depth)
+        modes: List[Optional[str]] = []
+        for wave in plan.waves:
+            generated: List[GeneratedItem] = []
+            async for event in stream_story_blocks(
+                wave, [], [], campaign_title, party_profile, config,
+                adapter=adapter, cache=cache, use_cache=use_cache, graph=graph, flights=flights,
+                summaries=summaries, titles=titles,
+            ):
+                if event.kind == 'block' and event.item:
+                    generated.append(event.item)
+                    modes.append(event.item.mode)
+                    yield event
+                elif event.kind == 'delta':
+                    yield event
+            graph = apply_generated(graph, generated)
+            summaries = _refresh_summaries(summaries, generated)
+        yield GenerationEvent(kind='done', mode=summarize_mode(modes), count=len(modes))
+        return
+
+    prompts = _prepare_prompts(
+        target_ids, raw_nodes, raw_edges, campaign_title, party_profile, config, graph, summaries
+    )
+    if not prompts:
+        logger.info("Nenhum prompt gerado.")
+        yield GenerationEvent(kind='done', mode='none')
+        return
+
+    adapter = adapter or get_adapter()
+    mode = _adapter_mode(adapter)
+    logger.info("Adapter ativo (stream): %s", adapter.__class__.__name__)
+    caching = cache is not None and cache.enabled and use_cache
+    keys = {item.id: make_cache_key(adapter.cache_scope, item.prompt) for item in prompts}
+    by_id = {item.id: item for item in prompts}
+    emitted: set[str] = set()
+    modes: set[str] = set()
+
+    if caching:
+        cached = await cache.get_many(list(keys.values()))
+        for item in prompts:
+            if keys[item.id] in cached:
+                title, content = cached[keys[item.id]]
+                emitted.add(item.id)
+                modes.add(mode)
+                generated = GeneratedItem(id=item.id, title=title, content=content, mode=mode)
+                yield GenerationEvent(kind='block', item=claim_title(generated, item, titles))
+
+    pending = [item for item in prompts if item.id not in emitted]
+    if flights is None:
+        source = adapter.stream(pending)
+    else:
+        source = flights.stream(adapter, pending, [keys[item.id] for item in pending])
+    try:
+        async for kind, value in _with_deltas(source):
+            if kind == 'delta':
+                yield GenerationEvent(kind='delta', delta=value)
+                continue
+            generated = value
+            emitted.add(generated.id)
+            modes.add(mode)
+            if caching:
+                await cache.put_many({keys[generated.id]: (generated.title, generated.content)})
+            generated = claim_title(generated, by_id[generated.id], titles)
+            yield GenerationEvent(kind='block', item=replace(generated, mode=mode))
+    except PartialGenerationError as error:
+        logger.warning(
+            "Stream parcial: %s blocos falharam (%r), usando mock.", len(error.failed), error.cause
+        )
+    except Exception:
+        logger.exception("Falha no adapter real durante stream, usando mock.")
+
+    remaining = [item for item in pending if item.id not in emitted]
+    if remaining:
+        modes.add('mock')
+        async for generated in MockAdapter().stream(remaining, titles):
+            emitted.add(generated.id)
+            yield GenerationEvent(kind='block', item=replace(generated, mode='mock'))
+
+    overall = summarize_mode(modes)
+    logger.info("Stream concluido: mode=%s items=%s", overall, len(emitted))
+    yield GenerationEvent(kind='done', mode=overall, count=len(emitted))
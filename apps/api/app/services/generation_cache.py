@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.db.models import GenerationCacheEntry
+
+CachedValue = Tuple[Optional[str], str]
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    enabled: bool = True
+    max_memory_items: int = 512
+    max_rows: int = 10000
+    ttl_seconds: float = 7 * 24 * 3600
+    trim_every: int = 200
+
+
+def read_cache_config() -> CacheConfig:
+    def read_number(name: str, default: float) -> float:
+        try:
+            return max(0.0, float(os.getenv(name, str(default))))
+        except ValueError:
+            return default
+
+    return CacheConfig(
+        enabled=os.getenv('GENERATION_CACHE', 'true').lower() in {'1', 'true', 'yes'},
+        max_memory_items=int(read_number('GENERATION_CACHE_MAX_ITEMS', 512)),
+        max_rows=int(read_number('GENERATION_CACHE_MAX_ROWS', 10000)),
+        ttl_seconds=read_number('GENERATION_CACHE_TTL_SECONDS', 7 * 24 * 3600),
+        trim_every=max(1, int(read_number('GENERATION_CACHE_TRIM_EVERY', 200))),
+    )
+
+
+def make_cache_key(scope: str, prompt: str) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(scope.encode('utf-8'))
+    digest.update(b'\x00')
+    digest.update(prompt.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class CacheStats:
+    def __init__(self) -> None:
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def snapshot(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        hits = self.memory_hits + self.db_hits
+        return {
+            'memory_hits': self.memory_hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class GenerationCache:
+    def __init__(self, config: CacheConfig, session_factory: Optional[Callable[[], Session]] = None) -> None:
+        self._config = config
+        self._session_factory = session_factory
+        self._memory: OrderedDict[str, Tuple[float, CachedValue]] = OrderedDict()
+        self._writes_since_trim = config.trim_every
+        self.stats = CacheStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    def _is_fresh(self, stored_at: float) -> bool:
+        return not self._config.ttl_seconds or time.time() - stored_at < self._config.ttl_seconds
+
+    def _remember(self, key: str, stored_at: float, value: CachedValue) -> None:
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._config.max_memory_items:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _load_rows(self, keys: List[str]) -> Dict[str, Tuple[float, CachedValue]]:
+        if not self._session_factory or not keys:
+            return {}
+        db = self._session_factory()
+        try:
+            rows = db.execute(
+                select(GenerationCacheEntry).where(GenerationCacheEntry.key.in_(keys))
+            ).scalars()
+            return {
+                row.key: (
+                    row.created_at.replace(tzinfo=timezone.utc).timestamp(),
+                    (row.title, row.content),
+                )
+                for row in rows
+            }
+        finally:
+            db.close()
+
+    def _trim_rows(self, db: Session, now: datetime) -> None:
+        if self._config.ttl_seconds:
+            cutoff = now - timedelta(seconds=self._config.ttl_seconds)
+            db.execute(delete(GenerationCacheEntry).where(GenerationCacheEntry.created_at < cutoff))
+        overflow = db.query(GenerationCacheEntry).count() - self._config.max_rows
+        if overflow > 0:
+            oldest = (
+                select(GenerationCacheEntry.key)
+                .order_by(GenerationCacheEntry.created_at)
+                .limit(overflow)
+            )
+            db.execute(delete(GenerationCacheEntry).where(GenerationCacheEntry.key.in_(oldest)))
+            self.stats.evictions += overflow
+
+    def _store_rows(self, entries: Dict[str, CachedValue], trim: bool = True) -> None:
+        if not self._session_factory or not entries:
+            return
+        now = datetime.utcnow()
+        db = self._session_factory()
+        try:
+            for key, (title, content) in entries.items():
+                db.merge(GenerationCacheEntry(key=key, title=title, content=content, created_at=now))
+            if trim:
+                db.flush()
+                self._trim_rows(db, now)
+            db.commit()
+        finally:
+            db.close()
+
+    async def get_many(self, keys: List[str]) -> Dict[str, CachedValue]:
+        found: Dict[str, CachedValue] = {}
+        pending: List[str] = []
+        for key in keys:
+            entry = self._memory.get(key)
+            if entry and self._is_fresh(entry[0]):
+                self._memory.move_to_end(key)
+                found[key] = entry[1]
+                self.stats.memory_hits += 1
+            else:
+                if entry:
+                    del self._memory[key]
+                pending.append(key)
+
+        if pending:
+            rows = await asyncio.to_thread(self._load_rows, pending)
+            for key in pending:
+                row = rows.get(key)
+                if row and self._is_fresh(row[0]):
+                    self._remember(key, row[0], row[1])
+                    found[key] = row[1]
+                    self.stats.db_hits += 1
+                else:
+                    self.stats.misses += 1
+        return found
+
+    async def put_many(self, entries: Dict[str, CachedValue]) -> None:
+        if not entries:
+            return
+        stored_at = time.time()
+        for key, value in entries.items():
+            self._remember(key, stored_at, value)
+        self.stats.writes += len(entries)
+        self._writes_since_trim += len(entries)
+        trim = self._writes_since_trim >= self._config.trim_every
+        if trim:
+            self._writes_since_trim = 0
+        await asyncio.to_thread(self._store_rows, entries, trim)
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
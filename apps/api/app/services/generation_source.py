@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.schemas.generation import GenerationSettings
+from app.services.graph_index import CompiledCampaign, read_compiled_campaign
+from app.services.prompt_builder import CampaignGraph, PromptConfig, compile_graph
+from app.services.summaries import SummaryStore
+
+
+class CampaignNotFoundError(LookupError):
+    pass
+
+
+def prompt_config(payload: GenerationSettings) -> PromptConfig:
+    return PromptConfig(
+        max_depth=payload.max_depth,
+        max_context_items=payload.max_context_items,
+        max_prompt_chars=payload.max_prompt_chars,
+        max_prompt_tokens=payload.max_prompt_tokens,
+        token_estimator=payload.token_estimator,
+    )
+
+
+def party_profile(payload: GenerationSettings) -> Optional[dict]:
+    return payload.party_profile.model_dump(exclude_none=True) if payload.party_profile else None
+
+
+def _wants_summaries(payload: GenerationSettings, summaries: Optional[SummaryStore]) -> bool:
+    return summaries is not None and summaries.enabled and payload.use_summaries
+
+
+async def load_summaries(
+    payload: GenerationSettings, graph: CampaignGraph, summaries: Optional[SummaryStore]
+) -> Optional[Dict[str, str]]:
+    if not _wants_summaries(payload, summaries):
+        return None
+    return await summaries.summaries_for(graph, payload.campaign_id)
+
+
+async def load_campaign(read_factory: Callable[[], Session], campaign_id: str) -> CompiledCampaign:
+    compiled = await run_in_threadpool(read_compiled_campaign, read_factory, campaign_id)
+    if not compiled:
+        raise CampaignNotFoundError('Campanha nao encontrada')
+    return compiled
+
+
+async def resolve_source(
+    payload: GenerationSettings,
+    read_factory: Callable[[], Session],
+    summaries: Optional[SummaryStore] = None,
+) -> dict:
+    if not payload.campaign_id:
+        source = {
+            'raw_nodes': payload.nodes,
+            'raw_edges': payload.edges,
+            'campaign_title': payload.campaign_title,
+            'party_profile': party_profile(payload),
+        }
+        if not _wants_summaries(payload, summaries):
+            return source
+        graph = compile_graph(payload.nodes, payload.edges)
+        return {
+            **source,
+            'graph': graph,
+            'summaries': await load_summaries(payload, graph, summaries),
+        }
+
+    compiled = await load_campaign(read_factory, payload.campaign_id)
+    return {
+        'raw_nodes': [],
+        'raw_edges': [],
+        'campaign_title': payload.campaign_title or compiled.title,
+        'party_profile': party_profile(payload) or compiled.party_profile,
+        'graph': compiled.graph,
+        'summaries': await load_summaries(payload, compiled.graph, summaries),
+    }
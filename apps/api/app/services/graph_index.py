@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.models import Campaign
+from app.services.campaign_store import load_payload
+from app.services.prompt_builder import CampaignGraph, compile_graph
+
+
+@dataclass(frozen=True)
+class CompiledCampaign:
+    id: str
+    version: datetime
+    title: str
+    party_profile: Optional[dict]
+    graph: CampaignGraph
+
+
+class GraphIndexCache:
+    def __init__(self, max_items: int = 64) -> None:
+        self._max_items = max_items
+        self._items: OrderedDict[str, CompiledCampaign] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, campaign_id: str, version: datetime) -> Optional[CompiledCampaign]:
+        with self._lock:
+            compiled = self._items.get(campaign_id)
+            if compiled is None or compiled.version != version:
+                self.misses += 1
+                return None
+            self._items.move_to_end(campaign_id)
+            self.hits += 1
+            return compiled
+
+    def put(self, compiled: CompiledCampaign) -> None:
+        with self._lock:
+            self._items[compiled.id] = compiled
+            self._items.move_to_end(compiled.id)
+            while len(self._items) > self._max_items:
+                self._items.popitem(last=False)
+
+    def invalidate(self, campaign_id: str) -> None:
+        with self._lock:
+            self._items.pop(campaign_id, None)
+
+    def snapshot(self) -> dict:
+        return {'items': len(self._items), 'max_items': self._max_items, 'hits': self.hits, 'misses': self.misses}
+
+
+def _read_max_items() -> int:
+    try:
+        return max(1, int(os.getenv('GRAPH_INDEX_MAX_ITEMS', '64')))
+    except ValueError:
+        return 64
+
+
+graph_index_cache = GraphIndexCache(_read_max_items())
+
+
+def compile_campaign(db: Session, campaign: Campaign) -> CompiledCampaign:
+    payload = load_payload(db, campaign)
+    return CompiledCampaign(
+        id=campaign.id,
+        version=campaign.updated_at,
+        title=campaign.title,
+        party_profile=payload.get('party_profile'),
+        graph=compile_graph(payload.get('nodes', []), payload.get('edges', [])),
+    )
+
+
+def load_compiled_campaign(
+    db: Session, campaign_id: str, cache: Optional[GraphIndexCache] = None
+) -> Optional[CompiledCampaign]:
+    cache = cache or graph_index_cache
+    version = db.query(Campaign.updated_at).filter(Campaign.id == campaign_id).scalar()
+    if version is None:
+        return None
+
+    compiled = cache.get(campaign_id, version)
+    if compiled is not None:
+        return compiled
+
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if not campaign:
+        return None
+    compiled = compile_campaign(db, campaign)
+    cache.put(compiled)
+    return compiled
+
+
+def read_compiled_campaign(
+    session_factory: Callable[[], Session], campaign_id: str
+) -> Optional[CompiledCampaign]:
+    with session_factory() as db:
+        return load_compiled_campaign(db, campaign_id)
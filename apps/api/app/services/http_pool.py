@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+
+
+def _read_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _read_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def read_pool_config() -> HttpPoolConfig:
+    return HttpPoolConfig(
+        max_connections=_read_int('AI_HTTP_MAX_CONNECTIONS', 20),
+        max_keepalive_connections=_read_int('AI_HTTP_MAX_KEEPALIVE', 10),
+        keepalive_expiry=_read_float('AI_HTTP_KEEPALIVE_EXPIRY', 30.0),
+        http2=os.getenv('AI_HTTP2', 'false').lower() in {'1', 'true', 'yes'},
+    )
+
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.new_connections = 0
+
+    @property
+    def reused_connections(self) -> int:
+        return max(0, self.requests - self.new_connections)
+
+    def snapshot(self) -> dict:
+        reuse_ratio = self.reused_connections / self.requests if self.requests else 0.0
+        return {
+            'requests': self.requests,
+            'new_connections': self.new_connections,
+            'reused_connections': self.reused_connections,
+            'reuse_ratio': round(reuse_ratio, 4),
+        }
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.new_connections = 0
+
+
+pool_metrics = PoolMetrics()
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec('h2') is not None
+
+
+def create_pooled_client(
+    base_url: str,
+    headers: Mapping[str, str],
+    timeout: float,
+    config: HttpPoolConfig,
+    metrics: Optional[PoolMetrics] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    metrics = metrics or pool_metrics
+
+    async def trace(event_name: str, info: Mapping[str, Any]) -> None:
+        if event_name == 'connection.connect_tcp.complete':
+            metrics.new_connections += 1
+
+    async def on_request(request: httpx.Request) -> None:
+        metrics.requests += 1
+        request.extensions['trace'] = trace
+
+    http2 = config.http2
+    if http2 and not _http2_available():
+        logger.warning("AI_HTTP2 ativo mas pacote 'h2' nao instalado; usando HTTP/1.1.")
+        http2 = False
+
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=dict(headers),
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        http2=http2,
+        transport=transport,
+        event_hooks={'request': [on_request]},
+    )
@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set
+from uuid import uuid4
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.db.models import GenerationJob, GenerationJobItem
+from app.services.ai_adapter import GeneratedItem
+from app.services.generation import GenerationEvent, summarize_mode
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+TERMINAL_STATUSES = {SUCCEEDED, FAILED, CANCELLED}
+
+JobRunner = Callable[[dict, Set[str]], AsyncIterator[GenerationEvent]]
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class JobConfig:
+    workers: int = 2
+    max_queue: int = 100
+    watch_interval: float = 1.0
+
+
+def read_job_config() -> JobConfig:
+    def read_int(name: str, default: int) -> int:
+        try:
+            return max(1, int(os.getenv(name, str(default))))
+        except ValueError:
+            return default
+
+    return JobConfig(
+        workers=read_int('GENERATION_JOB_WORKERS', 2),
+        max_queue=read_int('GENERATION_JOB_MAX_QUEUE', 100),
+    )
+
+
+@dataclass(frozen=True)
+class JobSnapshot:
+    id: str
+    status: str
+    total: int
+    completed: int
+    mode: Optional[str]
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+
+def _snapshot(job: GenerationJob) -> JobSnapshot:
+    return JobSnapshot(
+        id=job.id,
+        status=job.status,
+        total=job.total,
+        completed=job.completed,
+        mode=job.mode,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+class JobManager:
+    def __init__(self, config: JobConfig, session_factory: Callable[[], Session], runner: JobRunner) -> None:
+        self._config = config
+        self._session_factory = session_factory
+        self._runner = runner
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._pending: Set[str] = set()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested: Set[str] = set()
+        self._workers: List[asyncio.Task] = []
+        self._changed = asyncio.Condition()
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        return {
+            'workers': self._config.workers,
+            'max_queue': self._config.max_queue,
+            'pending': len(self._pending),
+            'running': len(self._running),
+        }
+
+    def _recover_rows(self) -> List[str]:
+        db = self._session_factory()
+        try:
+            db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.status == RUNNING)
+                .values(status=QUEUED, updated_at=datetime.utcnow())
+            )
+            db.commit()
+            return list(
+                db.execute(
+                    select(GenerationJob.id)
+                    .where(GenerationJob.status == QUEUED)
+                    .order_by(GenerationJob.created_at)
+                ).scalars()
+            )
+        finally:
+            db.close()
+
+    async def start(self) -> None:
+        recovered = await asyncio.to_thread(self._recover_rows)
+        for job_id in recovered:
+            self._pending.add(job_id)
+            self._queue.put_nowait(job_id)
+        if recovered:
+            logger.info("Jobs recuperados apos reinicio: %s", len(recovered))
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self._config.workers)]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _insert_row(self, job_id: str, payload: dict, total: int) -> JobSnapshot:
+        now = datetime.utcnow()
+        job = GenerationJob(
+            id=job_id,
+            status=QUEUED,
+            request=json.dumps(payload),
+            total=total,
+            completed=0,
+            created_at=now,
+            updated_at=now,
+        )
+        db = self._session_factory()
+        try:
+            db.add(job)
+            db.commit()
+            return _snapshot(job)
+        finally:
+            db.close()
+
+    async def submit(self, payload: dict, total: int) -> JobSnapshot:
+        if len(self._pending) >= self._config.max_queue:
+            raise JobQueueFull('Fila de geracao cheia')
+        job_id = uuid4().hex
+        self._pending.add(job_id)
+        try:
+            snapshot = await asyncio.to_thread(self._insert_row, job_id, payload, total)
+        except BaseException:
+            self._pending.discard(job_id)
+            raise
+        self._queue.put_nowait(job_id)
+        return snapshot
+
+    def _load_row(self, job_id: str) -> Optional[JobSnapshot]:
+        db = self._session_factory()
+        try:
+            job = db.get(GenerationJob, job_id)
+            return _snapshot(job) if job else None
+        finally:
+            db.close()
+
+    async def get(self, job_id: str) -> Optional[JobSnapshot]:
+        return await asyncio.to_thread(self._load_row, job_id)
+
+    def _load_items(self, job_id: str) -> List[GeneratedItem]:
+        db = self._session_factory()
+        try:
+            rows = db.execute(
+                select(GenerationJobItem)
+                .where(GenerationJobItem.job_id == job_id)
+                .order_by(GenerationJobItem.position)
+            ).scalars()
+            return [
+                GeneratedItem(id=row.node_id, title=row.title, content=row.content, mode=row.mode)
+                for row in rows
+            ]
+        finally:
+            db.close()
+
+    async def items(self, job_id: str) -> List[GeneratedItem]:
+        return await asyncio.to_thread(self._load_items, job_id)
+
+    def _set_status(self, job_id: str, status: str, expected: Optional[Set[str]] = None, **values) -> bool:
+        db = self._session_factory()
+        try:
+            statement = update(GenerationJob).where(GenerationJob.id == job_id)
+            if expected:
+                statement = statement.where(GenerationJob.status.in_(expected))
+            result = db.execute(statement.values(status=status, updated_at=datetime.utcnow(), **values))
+            db.commit()
+            return result.rowcount > 0
+        finally:
+            db.close()
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def cancel(self, job_id: str) -> Optional[JobSnapshot]:
+        task = self._running.get(job_id)
+        if task is not None:
+            self._cancel_requested.add(job_id)
+            task.cancel()
+            await asyncio.wait([task])
+        else:
+            cancelled = await asyncio.to_thread(
+                self._set_status, job_id, CANCELLED, {QUEUED}, finished_at=datetime.utcnow()
+            )
+            if cancelled:
+                self._pending.discard(job_id)
+                await self._notify()
+        return await self.get(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[JobSnapshot]:
+        last: Optional[tuple] = None
+        while True:
+            snapshot = await self.get(job_id)
+            if snapshot is None:
+                return
+            marker = (snapshot.status, snapshot.completed)
+            if marker != last:
+                last = marker
+                yield snapshot
+            if snapshot.status in TERMINAL_STATUSES:
+                return
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=self._config.watch_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                task = asyncio.ensure_future(self._run(job_id))
+                self._running[job_id] = task
+                await task
+            except asyncio.CancelledError:
+                if job_id not in self._cancel_requested or not task.done():
+                    raise
+                await asyncio.to_thread(
+                    self._set_status, job_id, CANCELLED, {QUEUED, RUNNING}, finished_at=datetime.utcnow()
+                )
+                await self._notify()
+            except Exception:
+                logger.exception("Falha inesperada no worker de jobs (job=%s).", job_id)
+            finally:
+                self._running.pop(job_id, None)
+                self._pending.discard(job_id)
+                self._cancel_requested.discard(job_id)
+                self._queue.task_done()
+
+    def _start_row(self, job_id: str) -> Optional[tuple]:
+        db = self._session_factory()
+        try:
+            job = db.get(GenerationJob, job_id)
+            if job is None or job.status != QUEUED:
+                return None
+            job.status = RUNNING
+            job.started_at = job.started_at or datetime.utcnow()
+            job.updated_at = datetime.utcnow()
+            done_ids = set(
+                db.execute(
+                    select(GenerationJobItem.node_id).where(GenerationJobItem.job_id == job_id)
+                ).scalars()
+            )
+            db.commit()
+            return json.loads(job.request), done_ids
+        finally:
+            db.close()
+
+    def _store_item(self, job_id: str, position: int, item: GeneratedItem) -> None:
+        db = self._session_factory()
+        try:
+            db.merge(
+                GenerationJobItem(
+                    job_id=job_id,
+                    node_id=item.id,
+                    position=position,
+                    title=item.title,
+                    content=item.content,
+                    mode=item.mode,
+                )
+            )
+            db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id)
+                .values(completed=position + 1, updated_at=datetime.utcnow())
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _finish_row(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        db = self._session_factory()
+        try:
+            modes = db.execute(
+                select(GenerationJobItem.mode).where(GenerationJobItem.job_id == job_id)
+            ).scalars()
+            job = db.get(GenerationJob, job_id)
+            if job is None:
+                return
+            job.status = status
+            job.mode = summarize_mode(modes)
+            job.error = error
+            job.finished_at = datetime.utcnow()
+            job.updated_at = job.finished_at
+            if status == SUCCEEDED:
+                job.total = job.completed
+            db.commit()
+        finally:
+            db.close()
+
+    async def _run(self, job_id: str) -> None:
+        start = asyncio.ensure_future(asyncio.to_thread(self._start_row, job_id))
+        try:
+            started = await asyncio.shield(start)
+            if started is None:
+                return
+            payload, done_ids = started
+            await self._notify()
+            position = len(done_ids)
+            async for event in self._runner(payload, done_ids):
+                if event.kind != 'block' or event.item is None or event.item.id in done_ids:
+                    continue
+                done_ids.add(event.item.id)
+                await asyncio.to_thread(self._store_item, job_id, position, event.item)
+                position += 1
+                await self._notify()
+        except asyncio.CancelledError:
+            if job_id not in self._cancel_requested:
+                raise
+            logger.info("Job cancelado: %s", job_id)
+            if await start is None:
+                return
+            await asyncio.to_thread(self._finish_row, job_id, CANCELLED)
+        except Exception as error:
+            logger.exception("Job falhou: %s", job_id)
+            await asyncio.to_thread(self._finish_row, job_id, FAILED, str(error) or error.__class__.__name__)
+        else:
+            await asyncio.to_thread(self._finish_row, job_id, SUCCEEDED)
+        await self._notify()
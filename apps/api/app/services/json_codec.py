@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def dumps(value: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def loads(value: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def metrics_enabled() -> bool:
+    return os.getenv('METRICS', 'true').lower() in {'1', 'true', 'yes'}
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f'{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}'
+            for labels, value in values
+        ]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((labels, list(series)) for labels, series in self._series.items())
+        lines: List[str] = []
+        for labels, series in snapshot:
+            cumulative = 0.0
+            for bound, observed in zip([*self.buckets, float('inf')], series):
+                cumulative += observed
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                bucket_labels = _format_labels([*self.labelnames, 'le'], [*labels, le])
+                lines.append(f'{self.name}_bucket{bucket_labels} {_format_number(cumulative)}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {repr(series[-1])}')
+            lines.append(f'{self.name}_count{label_text} {_format_number(cumulative)}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[object] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+http_request_seconds = registry.histogram(
+    'http_request_duration_seconds', 'Latencia das requisicoes HTTP por rota.', ('method', 'route', 'status')
+)
+prompt_build_seconds = registry.histogram(
+    'prompt_build_duration_seconds', 'Tempo gasto montando prompts.', ('source',), FAST_BUCKETS
+)
+provider_request_seconds = registry.histogram(
+    'provider_request_duration_seconds',
+    'Latencia de cada chamada ao provedor de IA.',
+    ('adapter', 'model', 'status'),
+)
+provider_first_token_seconds = registry.histogram(
+    'provider_first_token_seconds',
+    'Tempo ate o primeiro token em chamadas com stream.',
+    ('adapter', 'model'),
+)
+provider_hedges = registry.counter(
+    'provider_hedges_total', 'Chamadas duplicadas por hedge e quem respondeu primeiro.', ('route', 'outcome')
+)
+provider_tokens = registry.counter(
+    'provider_tokens_total', 'Tokens informados no campo usage das respostas.', ('adapter', 'model', 'kind')
+)
+mock_fallback_items = registry.counter(
+    'generation_mock_fallback_items_total', 'Blocos gerados pelo mock apos falha do provedor.', ('adapter',)
+)
+db_query_seconds = registry.histogram(
+    'db_query_duration_seconds',
+    'Tempo das consultas SQLite por rota.',
+    ('method', 'route', 'operation'),
+    FAST_BUCKETS,
+)
+
+current_db_route: ContextVar[Optional[Tuple[str, str]]] = ContextVar('current_db_route', default=None)
+
+
+def instrument_engine(bind: Engine) -> None:
+    @event.listens_for(bind, 'before_cursor_execute')
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+        context.metrics_started = time.perf_counter()
+
+    @event.listens_for(bind, 'after_cursor_execute')
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany) -> None:
+        route = current_db_route.get()
+        if route is not None:
+            operation = statement.lstrip().split(None, 1)[0].upper() if statement else 'UNKNOWN'
+            db_query_seconds.observe(time.perf_counter() - context.metrics_started, *route, operation)
+
+
+class MetricsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = ['500']
+
+        async def send_with_status(message) -> None:
+            if message['type'] == 'http.response.start':
+                status[0] = str(message['status'])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                scope['method'],
+                getattr(route, 'path', 'unmatched'),
+                status[0],
+            )
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_HEX = re.compile(r'[0-9a-fA-F]{4}')
+
+
+@dataclass
+class _FieldState:
+    pattern: re.Pattern
+    position: Optional[int] = None
+    closed: bool = False
+
+
+def _decode_escape(buffer: str, position: int) -> Tuple[Optional[str], int]:
+    if position + 1 >= len(buffer):
+        return None, position
+    marker = buffer[position + 1]
+    if marker != 'u':
+        return _ESCAPES.get(marker, marker), position + 2
+    digits = buffer[position + 2 : position + 6]
+    if len(digits) < 4:
+        return None, position
+    if not _HEX.fullmatch(digits):
+        return '', position + 6
+    code = int(digits, 16)
+    if 0xD800 <= code < 0xDC00:
+        low = buffer[position + 6 : position + 12]
+        if len(low) < 6:
+            return None, position
+        if low.startswith('\\u') and _HEX.fullmatch(low[2:]):
+            pair = 0x10000 + ((code - 0xD800) << 10) + (int(low[2:], 16) - 0xDC00)
+            return chr(pair), position + 12
+    return chr(code), position + 6
+
+
+class PartialFieldParser:
+    def __init__(self, fields: Sequence[str] = ('title', 'content')) -> None:
+        self._buffer = ''
+        self._fields = {
+            field: _FieldState(re.compile(rf'"{re.escape(field)}"\s*:\s*"')) for field in fields
+        }
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def _advance(self, state: _FieldState) -> str:
+        decoded: List[str] = []
+        position = state.position
+        buffer = self._buffer
+        while position < len(buffer):
+            char = buffer[position]
+            if char == '"':
+                state.closed = True
+                position += 1
+                break
+            if char == '\\':
+                value, next_position = _decode_escape(buffer, position)
+                if value is None:
+                    break
+                decoded.append(value)
+                position = next_position
+                continue
+            decoded.append(char)
+            position += 1
+        state.position = position
+        return ''.join(decoded)
+
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        self._buffer += text
+        deltas: List[Tuple[str, str]] = []
+        for field, state in self._fields.items():
+            if state.closed:
+                continue
+            if state.position is None:
+                match = state.pattern.search(self._buffer)
+                if not match:
+                    continue
+                state.position = match.end()
+            delta = self._advance(state)
+            if delta:
+                deltas.append((field, delta))
+        return deltas
+
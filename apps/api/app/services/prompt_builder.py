@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import re
+from collections import deque
 from dataclasses import dataclass
-from typing import List, Mapping, Optional
+from itertools import accumulate
+from typing import Callable, Deque, Dict, Iterable, List, Mapping, Optional, Tuple
 
 TYPE_ORDER = ['theme', 'location', 'npc', 'event', 'twist']
 
@@ -13,6 +16,55 @@ TYPE_LABELS = {
     'twist': 'Reviravolta',
 }
 
+INSTRUCTION_LINES = [
+    "Instrucoes:",
+    "Escreva 2-3 frases curtas para este bloco.",
+    "Use nomes canonicos de DnD 5e (Forgotten Realms / Costa da Espada).",
+    "Prefira locais conhecidos como Waterdeep, Neverwinter, Baldur's Gate, Silverymoon.",
+    "Responda em JSON valido: {\"title\": \"...\", \"content\": \"...\"}.",
+    "O titulo deve ser adequado ao tipo do bloco (NPC, local, evento, etc).",
+    "Nao repita titulos do contexto ou do tema.",
+    "O titulo deve usar nomes canonicos de DnD 5e quando aplicavel.",
+    "Mantenha consistencia com o contexto e um tom cinematografico.",
+]
+
+BATCH_INSTRUCTION_LINES = [
+    "Instrucoes:",
+    "Escreva 2-3 frases curtas para cada bloco acima.",
+    "Use nomes canonicos de DnD 5e (Forgotten Realms / Costa da Espada).",
+    "Prefira locais conhecidos como Waterdeep, Neverwinter, Baldur's Gate, Silverymoon.",
+    "Responda em JSON valido: uma lista [{\"id\": \"...\", \"title\": \"...\", \"content\": \"...\"}] com um item por bloco.",
+    "Use exatamente o id indicado em cada bloco.",
+    "O titulo deve ser adequado ao tipo do bloco (NPC, local, evento, etc).",
+    "Nao repita titulos do contexto, do tema ou de outros blocos.",
+    "O titulo deve usar nomes canonicos de DnD 5e quando aplicavel.",
+    "Mantenha consistencia com o contexto e um tom cinematografico.",
+]
+
+EMPTY_CONTEXT_LINE = "- Nenhum"
+
+TokenEstimator = Callable[[str], int]
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def approx_token_count(text: str) -> int:
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PATTERN.findall(text))
+
+
+TOKEN_ESTIMATORS: Dict[str, TokenEstimator] = {
+    'chars': len,
+    'approx': approx_token_count,
+}
+
+
+def register_token_estimator(name: str, estimator: TokenEstimator) -> None:
+    TOKEN_ESTIMATORS[name] = estimator
+
+
+def get_token_estimator(name: str) -> TokenEstimator:
+    return TOKEN_ESTIMATORS.get(name, approx_token_count)
+
 
 @dataclass(frozen=True)
 class NodeRecord:
@@ -33,6 +85,8 @@ class PromptConfig:
     max_depth: int = 2
     max_context_items: int = 8
     max_prompt_chars: int = 2000
+    max_prompt_tokens: Optional[int] = None
+    token_estimator: str = 'approx'
 
 
 @dataclass(frozen=True)
@@ -42,6 +96,8 @@ class PromptItem:
     target_title: str
     target_type: str
     context_titles: List[str]
+    header: str = ''
+    section: str = ''
 
 
 def parse_nodes(raw_nodes: List[dict]) -> List[NodeRecord]:
@@ -82,30 +138,183 @@ def build_incoming_map(edges: List[EdgeRecord]) -> Mapping[str, List[str]]:
     return incoming
 
 
-def collect_upstream_ids(target_id: str, incoming: Mapping[str, List[str]], max_depth: int) -> List[str]:
+def _walk(start_ids: Iterable[str], adjacency: Mapping[str, List[str]], max_depth: int) -> set[str]:
     visited: set[str] = set()
-    queue: List[tuple[str, int]] = [(target_id, 0)]
+    queue: Deque[tuple[str, int]] = deque((node_id, 0) for node_id in start_ids)
 
     while queue:
-        current, depth = queue.pop(0)
+        current, depth = queue.popleft()
         if depth >= max_depth:
             continue
 
-        for parent in incoming.get(current, []):
-            if parent in visited:
+        for neighbour in adjacency.get(current, []):
+            if neighbour in visited:
                 continue
-            visited.add(parent)
-            queue.append((parent, depth + 1))
+            visited.add(neighbour)
+            queue.append((neighbour, depth + 1))
+
+    return visited
+
+
+def collect_upstream_ids(target_id: str, incoming: Mapping[str, List[str]], max_depth: int) -> List[str]:
+    return list(_walk([target_id], incoming, max_depth))
+
+
+def collect_downstream_ids(
+    source_ids: Iterable[str], outgoing: Mapping[str, List[str]], max_depth: int
+) -> List[str]:
+    return list(_walk(source_ids, outgoing, max_depth))
+
+
+def build_outgoing_map(edges: List[EdgeRecord]) -> Mapping[str, List[str]]:
+    outgoing: dict[str, List[str]] = {}
+    for edge in edges:
+        outgoing.setdefault(edge.source, []).append(edge.target)
+    return outgoing
 
-    return list(visited)
+
+def _sort_key(node: NodeRecord):
+    order = TYPE_ORDER.index(node.type) if node.type in TYPE_ORDER else len(TYPE_ORDER)
+    return (order, node.title.lower())
 
 
 def sort_nodes(nodes: List[NodeRecord]) -> List[NodeRecord]:
-    def sort_key(node: NodeRecord):
-        order = TYPE_ORDER.index(node.type) if node.type in TYPE_ORDER else len(TYPE_ORDER)
-        return (order, node.title.lower())
+    return sorted(nodes, key=_sort_key)
+
+
+@dataclass(frozen=True)
+class CampaignGraph:
+    node_map: Mapping[str, NodeRecord]
+    incoming: Mapping[str, List[str]]
+    outgoing: Mapping[str, List[str]]
+    rank: Mapping[str, int]
+    edge_count: int
+
+    def upstream_nodes(self, target_id: str, max_depth: int) -> List[NodeRecord]:
+        upstream_ids = collect_upstream_ids(target_id, self.incoming, max_depth)
+        ranked = sorted(
+            (node_id for node_id in upstream_ids if node_id in self.node_map),
+            key=self.rank.__getitem__,
+        )
+        return [self.node_map[node_id] for node_id in ranked]
 
-    return sorted(nodes, key=sort_key)
+
+def compile_graph(raw_nodes: List[dict], raw_edges: List[dict]) -> CampaignGraph:
+    nodes = parse_nodes(raw_nodes)
+    edges = parse_edges(raw_edges)
+    rank: Dict[str, int] = {node.id: index for index, node in enumerate(sort_nodes(nodes))}
+    return CampaignGraph(
+        node_map={node.id: node for node in nodes},
+        incoming=build_incoming_map(edges),
+        outgoing=build_outgoing_map(edges),
+        rank=rank,
+        edge_count=len(edges),
+    )
+
+
+def _party_lines(party_profile: Optional[dict]) -> List[str]:
+    if not party_profile:
+        return []
+    return [
+        "Perfil do grupo:",
+        *[
+            line
+            for line in [
+                f"- Nome do grupo: {party_profile.get('group_name')}" if party_profile.get('group_name') else None,
+                f"- Nivel medio: {party_profile.get('average_level')}" if party_profile.get('average_level') else None,
+                f"- Tamanho do grupo: {party_profile.get('party_size')}" if party_profile.get('party_size') else None,
+                f"- Classes: {party_profile.get('classes')}" if party_profile.get('classes') else None,
+                f"- Objetivo: {party_profile.get('goals')}" if party_profile.get('goals') else None,
+                f"- Resumo: {party_profile.get('summary')}" if party_profile.get('summary') else None,
+            ]
+            if line
+        ],
+    ]
+
+
+class PromptTemplate:
+    def __init__(
+        self,
+        campaign_title: Optional[str],
+        party_profile: Optional[dict],
+        config: PromptConfig,
+    ) -> None:
+        self._config = config
+        self._campaign_line = f"Campanha: {campaign_title or 'Campanha sem titulo'}"
+        self._party_lines = _party_lines(party_profile)
+        self.header = "\n".join([self._campaign_line, *self._party_lines])
+        if config.max_prompt_tokens is not None:
+            self._estimate = get_token_estimator(config.token_estimator)
+            self._budget = config.max_prompt_tokens
+        else:
+            self._estimate = len
+            self._budget = config.max_prompt_chars
+        self._separator_cost = self._estimate("\n")
+        static_lines = [self._campaign_line, *self._party_lines, "Contexto:", *INSTRUCTION_LINES]
+        self._static_cost = sum(self._line_cost(line) for line in static_lines) - self._separator_cost
+
+    def _line_cost(self, line: str) -> int:
+        return self._estimate(line) + self._separator_cost
+
+    def _fit(self, fixed_cost: int, context_lines: List[str]) -> int:
+        remaining = self._budget - fixed_cost
+        kept = 0
+        for total in accumulate(self._line_cost(line) for line in context_lines):
+            if total > remaining:
+                break
+            kept += 1
+        return kept
+
+    def _with_summaries(
+        self, remaining: int, kept: List[str], summary_lines: List[Optional[str]]
+    ) -> List[str]:
+        lines: List[str] = []
+        for line, summary_line in zip(kept, summary_lines):
+            lines.append(line)
+            if summary_line is None:
+                continue
+            cost = self._line_cost(summary_line)
+            if cost <= remaining:
+                lines.append(summary_line)
+                remaining -= cost
+        return lines
+
+    def render(
+        self,
+        target: NodeRecord,
+        context_lines: List[str],
+        summary_lines: Optional[List[Optional[str]]] = None,
+    ) -> Tuple[str, str]:
+        target_label = TYPE_LABELS.get(target.type, target.type)
+        target_lines = [
+            f"Alvo: {target_label} - {target.title}",
+            f"Tipo do bloco: {target_label}",
+        ]
+        fixed_cost = self._static_cost + sum(self._line_cost(line) for line in target_lines)
+        kept = context_lines[: self._fit(fixed_cost, context_lines)]
+        if summary_lines and kept:
+            used = fixed_cost + sum(self._line_cost(line) for line in kept)
+            kept = self._with_summaries(self._budget - used, kept, summary_lines)
+        context_block = ["Contexto:", *(kept if kept else [EMPTY_CONTEXT_LINE])]
+
+        prompt = "\n".join(
+            [
+                self._campaign_line,
+                *target_lines,
+                *self._party_lines,
+                *context_block,
+                *INSTRUCTION_LINES,
+            ]
+        )
+        section = "\n".join([*target_lines, *context_block])
+
+        if self._config.max_prompt_tokens is not None:
+            cost = self._estimate(prompt)
+            if cost > self._budget:
+                prompt = prompt[: max(0, len(prompt) * self._budget // cost)]
+        if len(prompt) > self._config.max_prompt_chars:
+            prompt = prompt[: self._config.max_prompt_chars]
+        return prompt, section
 
 
 def build_prompt(
@@ -114,105 +323,76 @@ def build_prompt(
     campaign_title: Optional[str],
     party_profile: Optional[dict],
     config: PromptConfig,
+    template: Optional[PromptTemplate] = None,
+    summaries: Optional[Mapping[str, str]] = None,
 ) -> PromptItem:
+    template = template or PromptTemplate(campaign_title, party_profile, config)
     context_nodes = sort_nodes(upstream_nodes)[: config.max_context_items]
     context_titles = [node.title for node in context_nodes]
     context_lines = [
         f"- {TYPE_LABELS.get(node.type, node.type)}: {node.title}" for node in context_nodes
     ]
-
-    party_lines = []
-    if party_profile:
-        party_lines = [
-            "Perfil do grupo:",
-            *[
-                line
-                for line in [
-                    f"- Nome do grupo: {party_profile.get('group_name')}" if party_profile.get('group_name') else None,
-                    f"- Nivel medio: {party_profile.get('average_level')}" if party_profile.get('average_level') else None,
-                    f"- Tamanho do grupo: {party_profile.get('party_size')}" if party_profile.get('party_size') else None,
-                    f"- Classes: {party_profile.get('classes')}" if party_profile.get('classes') else None,
-                    f"- Objetivo: {party_profile.get('goals')}" if party_profile.get('goals') else None,
-                    f"- Resumo: {party_profile.get('summary')}" if party_profile.get('summary') else None,
-                ]
-                if line
-            ],
-        ]
-
-    prompt_lines = [
-        f"Campanha: {campaign_title or 'Campanha sem titulo'}",
-        f"Alvo: {TYPE_LABELS.get(target.type, target.type)} - {target.title}",
-        f"Tipo do bloco: {TYPE_LABELS.get(target.type, target.type)}",
-        *party_lines,
-        "Contexto:",
-        *(context_lines if context_lines else ["- Nenhum"]),
-        "Instrucoes:",
-        "Escreva 2-3 frases curtas para este bloco.",
-        "Use nomes canonicos de DnD 5e (Forgotten Realms / Costa da Espada).",
-        "Prefira locais conhecidos como Waterdeep, Neverwinter, Baldur's Gate, Silverymoon.",
-        "Responda em JSON valido: {\"title\": \"...\", \"content\": \"...\"}.",
-        "O titulo deve ser adequado ao tipo do bloco (NPC, local, evento, etc).",
-        "Nao repita titulos do contexto ou do tema.",
-        "O titulo deve usar nomes canonicos de DnD 5e quando aplicavel.",
-        "Mantenha consistencia com o contexto e um tom cinematografico.",
-    ]
-
-    prompt = "\n".join(prompt_lines)
-
-    while len(prompt) > config.max_prompt_chars and context_lines:
-        context_lines.pop()
-        prompt_lines = [
-            f"Campanha: {campaign_title or 'Campanha sem titulo'}",
-            f"Alvo: {TYPE_LABELS.get(target.type, target.type)} - {target.title}",
-            f"Tipo do bloco: {TYPE_LABELS.get(target.type, target.type)}",
-            *party_lines,
-            "Contexto:",
-            *(context_lines if context_lines else ["- Nenhum"]),
-            "Instrucoes:",
-            "Escreva 2-3 frases curtas para este bloco.",
-            "Use nomes canonicos de DnD 5e (Forgotten Realms / Costa da Espada).",
-            "Prefira locais conhecidos como Waterdeep, Neverwinter, Baldur's Gate, Silverymoon.",
-            "Responda em JSON valido: {\"title\": \"...\", \"content\": \"...\"}.",
-            "O titulo deve ser adequado ao tipo do bloco (NPC, local, evento, etc).",
-            "Nao repita titulos do contexto ou do tema.",
-            "O titulo deve usar nomes canonicos de DnD 5e quando aplicavel.",
-            "Mantenha consistencia com o contexto e um tom cinematografico.",
+    summary_lines = None
+    if summaries:
+        summary_lines = [
+            f"  Resumo: {summaries[node.id]}" if summaries.get(node.id) else None
+            for node in context_nodes
         ]
-        prompt = "\n".join(prompt_lines)
-
-    if len(prompt) > config.max_prompt_chars:
-        prompt = prompt[: config.max_prompt_chars]
 
+    prompt, section = template.render(target, context_lines, summary_lines)
     return PromptItem(
         id=target.id,
         prompt=prompt,
         target_title=target.title,
         target_type=target.type,
         context_titles=context_titles,
+        header=template.header,
+        section=section,
     )
 
 
-def build_prompts(
+def build_batch_prompt(items: List[PromptItem]) -> str:
+    lines = [items[0].header]
+    for item in items:
+        lines.extend([f"Bloco {item.id}:", item.section])
+    return "\n".join([*lines, *BATCH_INSTRUCTION_LINES])
+
+
+def build_prompts_from_graph(
     target_ids: List[str],
-    raw_nodes: List[dict],
-    raw_edges: List[dict],
+    graph: CampaignGraph,
     campaign_title: Optional[str],
     party_profile: Optional[dict],
     config: PromptConfig,
+    summaries: Optional[Mapping[str, str]] = None,
 ) -> List[PromptItem]:
-    nodes = parse_nodes(raw_nodes)
-    edges = parse_edges(raw_edges)
-    node_map = {node.id: node for node in nodes}
-    incoming = build_incoming_map(edges)
-
+    template = PromptTemplate(campaign_title, party_profile, config)
     prompts: List[PromptItem] = []
     for target_id in target_ids:
-        target = node_map.get(target_id)
+        target = graph.node_map.get(target_id)
         if not target:
             continue
 
-        upstream_ids = collect_upstream_ids(target_id, incoming, config.max_depth)
-        upstream_nodes = [node_map[node_id] for node_id in upstream_ids if node_id in node_map]
-        prompts.append(build_prompt(target, upstream_nodes, campaign_title, party_profile, config))
+        upstream_nodes = graph.upstream_nodes(target_id, config.max_depth)
+        prompts.append(
+            build_prompt(
+                target, upstream_nodes, campaign_title, party_profile, config, template, summaries
+            )
+        )
 
     return prompts
+
+
+def build_prompts(
+    target_ids: List[str],
+    raw_nodes: List[dict],
+    raw_edges: List[dict],
+    campaign_title: Optional[str],
+    party_profile: Optional[dict],
+    config: PromptConfig,
+    summaries: Optional[Mapping[str, str]] = None,
+) -> List[PromptItem]:
+    graph = compile_graph(raw_nodes, raw_edges)
+    return build_prompts_from_graph(
+        target_ids, graph, campaign_title, party_profile, config, summaries
+    )
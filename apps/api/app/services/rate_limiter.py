@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import httpx
+
+from app.services.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    burst_seconds: float = 10.0
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 20.0
+    max_retry_after: float = 60.0
+    decrease_factor: float = 0.5
+    decrease_cooldown: float = 1.0
+
+
+def _read_optional(name: str) -> Optional[float]:
+    try:
+        value = float(os.getenv(name, '0'))
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def read_rate_limit_config(prefix: str) -> RateLimitConfig:
+    try:
+        max_retries = max(0, int(os.getenv(f'{prefix}_MAX_RETRIES', '3')))
+    except ValueError:
+        max_retries = 3
+    return RateLimitConfig(
+        requests_per_minute=_read_optional(f'{prefix}_RPM'),
+        tokens_per_minute=_read_optional(f'{prefix}_TPM'),
+        max_retries=max_retries,
+    )
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, burst_seconds: float) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+class AdaptiveConcurrency:
+    def __init__(
+        self, maximum: int, minimum: int = 1, decrease_factor: float = 0.5, cooldown: float = 1.0
+    ) -> None:
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = float(self.maximum)
+        self._decrease_factor = decrease_factor
+        self._cooldown = cooldown
+        self._last_decrease = float('-inf')
+        self._in_use = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_use < int(self.limit))
+            self._in_use += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._in_use -= 1
+                self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self._cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit * self._decrease_factor)
+
+
+class LimiterStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.transport_errors = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.queued_seconds = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            'requests': self.requests,
+            'throttled': self.throttled,
+            'server_errors': self.server_errors,
+            'transport_errors': self.transport_errors,
+            'retries': self.retries,
+            'gave_up': self.gave_up,
+            'queued_seconds': round(self.queued_seconds, 3),
+        }
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value) / 1000.0)
+        except ValueError:
+            pass
+    value = response.headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+_RETRYABLE_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _breaker_outcome(response: httpx.Response) -> Optional[bool]:
+    if response.status_code == 429:
+        return None
+    if response.status_code >= 500:
+        return None if parse_retry_after(response) is not None else False
+    return True
+
+
+class ProviderLimiter:
+    def __init__(
+        self,
+        config: RateLimitConfig,
+        max_concurrency: int,
+        rng: Optional[random.Random] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self._config = config
+        self._rng = rng or random.Random()
+        self._breaker = breaker
+        self._requests = (
+            TokenBucket(config.requests_per_minute, config.burst_seconds)
+            if config.requests_per_minute
+            else None
+        )
+        self._tokens = (
+            TokenBucket(config.tokens_per_minute, config.burst_seconds) if config.tokens_per_minute else None
+        )
+        self.concurrency = AdaptiveConcurrency(
+            max_concurrency,
+            decrease_factor=config.decrease_factor,
+            cooldown=config.decrease_cooldown,
+        )
+        self._resume_at = 0.0
+        self.stats = LimiterStats()
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats.snapshot(),
+            'concurrency_limit': round(self.concurrency.limit, 2),
+            'max_concurrency': self.concurrency.maximum,
+        }
+
+    def _backoff(self, attempt: int) -> float:
+        return self._rng.uniform(0, min(self._config.backoff_max, self._config.backoff_base * 2**attempt))
+
+    async def _wait_turn(self, estimated_tokens: int) -> None:
+        started = time.monotonic()
+        pause = self._resume_at - started
+        if pause > 0:
+            await asyncio.sleep(pause)
+        if self._requests is not None:
+            await self._requests.acquire(1)
+        if self._tokens is not None:
+            await self._tokens.acquire(estimated_tokens)
+        self.stats.queued_seconds += time.monotonic() - started
+
+    async def _attempt(
+        self, estimated_tokens: int, call: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        if self._breaker is not None:
+            self._breaker.before_call()
+        success: Optional[bool] = None
+        try:
+            await self._wait_turn(estimated_tokens)
+            async with self.concurrency.slot():
+                self.stats.requests += 1
+                response = await call()
+            success = _breaker_outcome(response)
+            return response
+        except httpx.TransportError:
+            success = False
+            raise
+        finally:
+            if self._breaker is not None:
+                self._breaker.record(success)
+
+    async def send(
+        self, estimated_tokens: int, call: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = await self._attempt(estimated_tokens, call)
+            except httpx.TransportError as error:
+                self.stats.transport_errors += 1
+                if attempt >= self._config.max_retries or not isinstance(error, _RETRYABLE_TRANSPORT_ERRORS):
+                    self.stats.gave_up += 1
+                    raise
+                delay = self._backoff(attempt)
+                status = 'erro de transporte'
+            else:
+                if not _is_retryable(response.status_code):
+                    self.concurrency.on_success()
+                    return response
+                if response.status_code == 429:
+                    self.stats.throttled += 1
+                else:
+                    self.stats.server_errors += 1
+                self.concurrency.on_throttle()
+                retry_after = parse_retry_after(response)
+                if attempt >= self._config.max_retries or (
+                    retry_after is not None and retry_after > self._config.max_retry_after
+                ):
+                    self.stats.gave_up += 1
+                    return response
+                if retry_after is None:
+                    delay = self._backoff(attempt)
+                else:
+                    delay = retry_after + self._rng.uniform(0, self._config.backoff_base)
+                    self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+                status = str(response.status_code)
+
+            attempt += 1
+            self.stats.retries += 1
+            logger.warning(
+                "Provedor respondeu %s; tentativa %s/%s em %.2fs (concorrencia=%s)",
+                status,
+                attempt,
+                self._config.max_retries,
+                delay,
+                int(self.concurrency.limit),
+            )
+            await asyncio.sleep(delay)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class RoutingConfig:
+    hedge: bool = True
+    hedge_quantile: float = 0.95
+    hedge_min_seconds: float = 0.05
+    hedge_default_seconds: float = 2.0
+    min_samples: int = 20
+    window: int = 200
+    max_hedges: int = 4
+    smoothing: float = 0.2
+    error_penalty: float = 4.0
+
+
+def _read_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def read_routing_config() -> RoutingConfig:
+    try:
+        max_hedges = max(0, int(os.getenv('AI_ROUTING_MAX_HEDGES', '4')))
+    except ValueError:
+        max_hedges = 4
+    return RoutingConfig(
+        hedge=os.getenv('AI_ROUTING_HEDGE', 'true').lower() in {'1', 'true', 'yes'},
+        hedge_quantile=min(0.999, max(0.5, _read_float('AI_ROUTING_HEDGE_QUANTILE', 0.95))),
+        hedge_min_seconds=max(0.0, _read_float('AI_ROUTING_HEDGE_MIN_MS', 50.0) / 1000),
+        hedge_default_seconds=max(0.0, _read_float('AI_ROUTING_HEDGE_DEFAULT_MS', 2000.0) / 1000),
+        max_hedges=max_hedges,
+    )
+
+
+class RouteStats:
+    def __init__(self, name: str, config: RoutingConfig) -> None:
+        self.name = name
+        self._config = config
+        self._latencies: Deque[float] = deque(maxlen=config.window)
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record(self, seconds: Optional[float]) -> None:
+        self.requests += 1
+        alpha = self._config.smoothing
+        if seconds is None:
+            self.errors += 1
+            self.error_rate += alpha * (1.0 - self.error_rate)
+            return
+        self.error_rate -= alpha * self.error_rate
+        self._latencies.append(seconds)
+        self.latency = seconds if self.latency is None else self.latency + alpha * (seconds - self.latency)
+
+    def hedge_delay(self) -> float:
+        if len(self._latencies) < self._config.min_samples:
+            return self._config.hedge_default_seconds
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self._config.hedge_quantile * len(ordered)))
+        return max(self._config.hedge_min_seconds, ordered[index])
+
+    def weight(self, fallback_latency: float) -> float:
+        latency = self.latency if self.latency is not None else fallback_latency
+        return 1.0 / (max(latency, 1e-3) * (1.0 + self._config.error_penalty * self.error_rate))
+
+    def snapshot(self) -> dict:
+        return {
+            'name': self.name,
+            'requests': self.requests,
+            'errors': self.errors,
+            'error_rate': round(self.error_rate, 4),
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'hedge_delay_ms': round(self.hedge_delay() * 1000, 1),
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+        }
+
+
+def rank_routes(stats: Sequence[RouteStats], rng: random.Random) -> List[int]:
+    known = [route.latency for route in stats if route.latency is not None]
+    fallback = min(known) if known else 1.0
+    remaining = list(range(len(stats)))
+    weights = [route.weight(fallback) for route in stats]
+    ranked: List[int] = []
+    while remaining:
+        pick = rng.choices(remaining, weights=[weights[index] for index in remaining])[0]
+        ranked.append(pick)
+        remaining.remove(pick)
+    return ranked
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List
+
+from app.services.prompt_builder import CampaignGraph, collect_downstream_ids
+
+
+@dataclass(frozen=True)
+class GraphDiff:
+    edited_ids: List[str]
+    rewired_ids: List[str]
+    removed_ids: List[str]
+
+
+@dataclass(frozen=True)
+class AffectedSubgraph:
+    changed_ids: List[str]
+    target_ids: List[str]
+
+
+def diff_graphs(previous: CampaignGraph, current: CampaignGraph) -> GraphDiff:
+    edited: List[str] = []
+    rewired: List[str] = []
+    for node_id, node in current.node_map.items():
+        before = previous.node_map.get(node_id)
+        if before is None:
+            rewired.append(node_id)
+            continue
+        if before != node:
+            edited.append(node_id)
+        if set(previous.incoming.get(node_id, [])) != set(current.incoming.get(node_id, [])):
+            rewired.append(node_id)
+
+    removed = [node_id for node_id in previous.node_map if node_id not in current.node_map]
+    return GraphDiff(edited_ids=edited, rewired_ids=rewired, removed_ids=removed)
+
+
+def find_affected(
+    previous: CampaignGraph,
+    current: CampaignGraph,
+    max_depth: int,
+    include_changed: bool = False,
+) -> AffectedSubgraph:
+    diff = diff_graphs(previous, current)
+    affected = set(diff.rewired_ids)
+    affected.update(collect_downstream_ids(diff.edited_ids, current.outgoing, max_depth))
+    affected.update(collect_downstream_ids(diff.rewired_ids, current.outgoing, max_depth - 1))
+
+    if include_changed:
+        affected.update(diff.edited_ids)
+    else:
+        affected.difference_update(diff.edited_ids)
+    changed = set(diff.edited_ids) | set(diff.rewired_ids)
+
+    def ordered(node_ids: set[str]) -> List[str]:
+        return sorted(
+            (node_id for node_id in node_ids if node_id in current.node_map),
+            key=current.rank.__getitem__,
+        )
+
+    return AffectedSubgraph(changed_ids=ordered(changed), target_ids=ordered(affected))
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.db.models import Campaign, NodeSummary
+from app.services.graph_index import compile_campaign
+from app.services.prompt_builder import CampaignGraph
+
+logger = logging.getLogger(__name__)
+
+Summarizer = Callable[[str, int], str]
+StoredSummary = Tuple[str, str]
+Remembered = Tuple[Optional[CampaignGraph], Dict[str, StoredSummary], Dict[str, str]]
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+@dataclass(frozen=True)
+class SummaryConfig:
+    enabled: bool = True
+    max_chars: int = 160
+    max_campaigns: int = 64
+
+
+def read_summary_config() -> SummaryConfig:
+    def read_int(name: str, default: int) -> int:
+        try:
+            return max(1, int(os.getenv(name, str(default))))
+        except ValueError:
+            return default
+
+    return SummaryConfig(
+        enabled=os.getenv('CONTEXT_SUMMARIES', 'true').lower() in {'1', 'true', 'yes'},
+        max_chars=read_int('CONTEXT_SUMMARY_CHARS', 160),
+        max_campaigns=read_int('CONTEXT_SUMMARY_MAX_CAMPAIGNS', 64),
+    )
+
+
+def extract_summary(content: str, max_chars: int) -> str:
+    text = ' '.join(content.split())
+    if len(text) <= max_chars:
+        return text
+    summary = ''
+    for sentence in _SENTENCE_END.split(text):
+        candidate = f'{summary} {sentence}'.strip()
+        if len(candidate) > max_chars:
+            break
+        summary = candidate
+    if summary:
+        return summary
+    cut = text[: max_chars - 3].rsplit(' ', 1)[0]
+    return f'{cut}...'
+
+
+def content_hash(content: str, max_chars: int) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(max_chars).encode('utf-8'))
+    digest.update(b'\x00')
+    digest.update(content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SummaryStats:
+    def __init__(self) -> None:
+        self.reused = 0
+        self.computed = 0
+        self.loads = 0
+        self.writes = 0
+
+    def snapshot(self) -> dict:
+        total = self.reused + self.computed
+        return {
+            'reused': self.reused,
+            'computed': self.computed,
+            'loads': self.loads,
+            'writes': self.writes,
+            'reuse_ratio': round(self.reused / total, 4) if total else 0.0,
+        }
+
+
+class SummaryStore:
+    def __init__(
+        self,
+        config: SummaryConfig,
+        session_factory: Optional[Callable[[], Session]] = None,
+        summarizer: Summarizer = extract_summary,
+    ) -> None:
+        self._config = config
+        self._session_factory = session_factory
+        self._summarizer = summarizer
+        self._memory: OrderedDict[str, Remembered] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = SummaryStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    def _load_rows(self, campaign_id: str) -> Dict[str, StoredSummary]:
+        if not self._session_factory:
+            return {}
+        db = self._session_factory()
+        try:
+            rows = db.execute(
+                select(NodeSummary.node_id, NodeSummary.content_hash, NodeSummary.summary).where(
+                    NodeSummary.campaign_id == campaign_id
+                )
+            )
+            return {node_id: (digest, summary) for node_id, digest, summary in rows}
+        finally:
+            db.close()
+
+    def _store_rows(
+        self, campaign_id: str, changed: Dict[str, StoredSummary], removed: List[str]
+    ) -> None:
+        if not self._session_factory:
+            return
+        db = self._session_factory()
+        try:
+            if changed:
+                now = datetime.utcnow()
+                statement = insert(NodeSummary)
+                db.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=['campaign_id', 'node_id'],
+                        set_={
+                            'content_hash': statement.excluded.content_hash,
+                            'summary': statement.excluded.summary,
+                            'updated_at': statement.excluded.updated_at,
+                        },
+                    ),
+                    [
+                        {
+                            'campaign_id': campaign_id,
+                            'node_id': node_id,
+                            'content_hash': digest,
+                            'summary': summary,
+                            'updated_at': now,
+                        }
+                        for node_id, (digest, summary) in changed.items()
+                    ],
+                )
+            if removed:
+                db.execute(
+                    delete(NodeSummary).where(
+                        NodeSummary.campaign_id == campaign_id, NodeSummary.node_id.in_(removed)
+                    )
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    def _remember(self, key: str, remembered: Remembered) -> None:
+        with self._lock:
+            self._memory[key] = remembered
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._config.max_campaigns:
+                self._memory.popitem(last=False)
+
+    def _refresh(
+        self, graph: CampaignGraph, known: Dict[str, StoredSummary]
+    ) -> Tuple[Dict[str, StoredSummary], Dict[str, StoredSummary]]:
+        entries: Dict[str, StoredSummary] = {}
+        changed: Dict[str, StoredSummary] = {}
+        for node_id, node in graph.node_map.items():
+            content = (node.content or '').strip()
+            if not content:
+                continue
+            digest = content_hash(content, self._config.max_chars)
+            stored = known.get(node_id)
+            if stored and stored[0] == digest:
+                entries[node_id] = stored
+                self.stats.reused += 1
+                continue
+            entries[node_id] = (digest, self._summarizer(content, self._config.max_chars))
+            changed[node_id] = entries[node_id]
+            self.stats.computed += 1
+        return entries, changed
+
+    async def summaries_for(
+        self, graph: CampaignGraph, campaign_id: Optional[str] = None
+    ) -> Dict[str, str]:
+        if not self._config.enabled:
+            return {}
+        key = campaign_id or ''
+        with self._lock:
+            remembered = self._memory.get(key)
+            if remembered is not None:
+                self._memory.move_to_end(key)
+        if remembered is not None and remembered[0] is graph:
+            self.stats.reused += len(remembered[2])
+            return remembered[2]
+        if remembered is not None:
+            known = remembered[1]
+        else:
+            known = {}
+            if campaign_id:
+                known = await asyncio.to_thread(self._load_rows, campaign_id)
+                self.stats.loads += 1
+
+        entries, changed = await asyncio.to_thread(self._refresh, graph, known)
+        removed = [node_id for node_id in known if node_id not in entries]
+        summaries = {node_id: summary for node_id, (_, summary) in entries.items()}
+        self._remember(key, (graph, entries, summaries))
+        if campaign_id and (changed or removed):
+            await asyncio.to_thread(self._store_rows, campaign_id, changed, removed)
+            self.stats.writes += len(changed)
+            logger.info(
+                "Sumarios atualizados: campanha=%s novos=%s removidos=%s",
+                campaign_id,
+                len(changed),
+                len(removed),
+            )
+        return summaries
+
+    def invalidate(self, campaign_id: str) -> None:
+        with self._lock:
+            self._memory.pop(campaign_id, None)
+
+
+def delete_summaries(db: Session, campaign_id: str) -> None:
+    db.execute(delete(NodeSummary).where(NodeSummary.campaign_id == campaign_id))
+
+
+async def precompute(store: SummaryStore, db: Session) -> dict:
+    stats = {'campaigns': 0, 'summaries': 0}
+    for campaign in db.query(Campaign).all():
+        compiled = compile_campaign(db, campaign)
+        summaries = await store.summaries_for(compiled.graph, campaign.id)
+        stats['campaigns'] += 1
+        stats['summaries'] += len(summaries)
+    return stats
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Pre-calcula os sumarios de contexto das campanhas salvas')
+    parser.parse_args()
+
+    from app.db.session import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    store = SummaryStore(read_summary_config(), SessionLocal)
+    db = SessionLocal()
+    try:
+        stats = asyncio.run(precompute(store, db))
+    finally:
+        db.close()
+    computed = store.stats.computed
+    print(
+        f"{stats['campaigns']} campanhas | {stats['summaries']} sumarios | "
+        f"{computed} recalculados | {stats['summaries'] - computed} reaproveitados"
+    )
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
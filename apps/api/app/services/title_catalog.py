@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AbstractSet, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from app.services.prompt_builder import PromptItem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_DIR = Path(__file__).resolve().parent.parent / 'catalog' / 'titles'
+
+
+@dataclass(frozen=True)
+class TitleCatalogConfig:
+    directory: Path = DEFAULT_CATALOG_DIR
+
+
+def read_title_catalog_config() -> TitleCatalogConfig:
+    directory = os.getenv('TITLE_CATALOG_DIR')
+    return TitleCatalogConfig(directory=Path(directory) if directory else DEFAULT_CATALOG_DIR)
+
+
+def read_title_file(path: Path) -> List[str]:
+    names: List[str] = []
+    with path.open(encoding='utf-8') as handle:
+        for line in handle:
+            name = line.strip()
+            if name and not name.startswith('#'):
+                names.append(name)
+    return names
+
+
+class TitleCatalog:
+    def __init__(self, titles: Mapping[str, Iterable[str]]) -> None:
+        self._options: Dict[str, Tuple[str, ...]] = {}
+        self._lowered: Dict[str, Tuple[str, ...]] = {}
+        owners: Dict[str, Set[str]] = {}
+        for block_type, names in titles.items():
+            options: List[str] = []
+            lowered: List[str] = []
+            seen: Set[str] = set()
+            for name in names:
+                key = name.lower()
+                owners.setdefault(key, set()).add(block_type)
+                if key not in seen:
+                    seen.add(key)
+                    options.append(name)
+                    lowered.append(key)
+            self._options[block_type] = tuple(options)
+            self._lowered[block_type] = tuple(lowered)
+        self._all: FrozenSet[str] = frozenset(owners)
+        self._excluded: Dict[str, FrozenSet[str]] = {
+            block_type: frozenset(key for key, types in owners.items() if types - {block_type})
+            for block_type in self._options
+        }
+
+    def __len__(self) -> int:
+        return sum(len(options) for options in self._options.values())
+
+    @property
+    def types(self) -> List[str]:
+        return list(self._options)
+
+    def options(self, block_type: str) -> Sequence[str]:
+        return self._options.get(block_type, ())
+
+    def excluded(self, block_type: str) -> FrozenSet[str]:
+        return self._excluded.get(block_type, self._all)
+
+    def pick(self, block_type: str, seed: int, *blocked: AbstractSet[str]) -> Optional[str]:
+        options = self._options.get(block_type)
+        if not options:
+            return None
+        lowered = self._lowered[block_type]
+        size = len(options)
+        for offset in range(min(size, sum(len(keys) for keys in blocked) + 1)):
+            index = (seed + offset) % size
+            if not any(lowered[index] in keys for keys in blocked):
+                return options[index]
+        return options[seed % size]
+
+    def normalize(
+        self, candidate: Optional[str], item: PromptItem, seed: int, used: AbstractSet[str] = frozenset()
+    ) -> str:
+        blocked = {title.lower() for title in item.context_titles}
+        if item.target_title:
+            blocked.add(item.target_title.lower())
+
+        if candidate and candidate.strip():
+            normalized = candidate.strip()
+            key = normalized.lower()
+            if key not in blocked and key not in used and key not in self.excluded(item.target_type):
+                return normalized
+
+        fallback = self.pick(item.target_type, seed, blocked, used)
+        return fallback or (candidate.strip() if candidate else item.target_title)
+
+    def assigner(self, reserved: Iterable[Optional[str]] = ()) -> TitleAssigner:
+        return TitleAssigner(self, reserved)
+
+
+class TitleAssigner:
+    def __init__(self, catalog: TitleCatalog, reserved: Iterable[Optional[str]] = ()) -> None:
+        self._catalog = catalog
+        self.used: Set[str] = {title.lower() for title in reserved if title}
+
+    def assign(self, candidate: Optional[str], item: PromptItem, seed: int) -> str:
+        title = self._catalog.normalize(candidate, item, seed, self.used)
+        if title:
+            self.used.add(title.lower())
+        return title
+
+    def fork(self) -> TitleAssigner:
+        return TitleAssigner(self._catalog, self.used)
+
+
+def load_title_catalog(config: TitleCatalogConfig) -> TitleCatalog:
+    titles: Dict[str, List[str]] = {}
+    if config.directory.is_dir():
+        for path in sorted(config.directory.glob('*.txt')):
+            titles[path.stem] = read_title_file(path)
+    if not titles:
+        logger.warning("Catalogo de titulos vazio em %s.", config.directory)
+    catalog = TitleCatalog(titles)
+    logger.info("Catalogo de titulos: %s nomes em %s tipos.", len(catalog), len(titles))
+    return catalog
+
+
+_catalog: Optional[TitleCatalog] = None
+
+
+def get_title_catalog() -> TitleCatalog:
+    global _catalog
+    if _catalog is None:
+        _catalog = load_title_catalog(read_title_catalog_config())
+    return _catalog
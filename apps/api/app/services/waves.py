@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.services.ai_adapter import GeneratedItem
+from app.services.prompt_builder import CampaignGraph, collect_upstream_ids, sort_nodes
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WavePlan:
+    waves: List[List[str]]
+    broken_edges: List[Tuple[str, str]]
+
+
+def _target_dependencies(targets: List[str], graph: CampaignGraph, max_depth: int) -> Dict[str, Set[str]]:
+    target_set = set(targets)
+    return {
+        target_id: {
+            node_id
+            for node_id in collect_upstream_ids(target_id, graph.incoming, max_depth)
+            if node_id in target_set and node_id != target_id
+        }
+        for target_id in targets
+    }
+
+
+def plan_waves(target_ids: Iterable[str], graph: CampaignGraph, max_depth: int) -> WavePlan:
+    targets = [target_id for target_id in dict.fromkeys(target_ids) if target_id in graph.node_map]
+    dependencies = _target_dependencies(targets, graph, max_depth)
+    dependents: Dict[str, List[str]] = {}
+    for target_id, upstream in dependencies.items():
+        for node_id in upstream:
+            dependents.setdefault(node_id, []).append(target_id)
+
+    def order(node_id: str) -> Tuple[int, str]:
+        return (graph.rank.get(node_id, len(graph.rank)), node_id)
+
+    remaining = {target_id: len(upstream) for target_id, upstream in dependencies.items()}
+    waves: List[List[str]] = []
+    broken_edges: List[Tuple[str, str]] = []
+    while remaining:
+        ready = sorted((node_id for node_id, count in remaining.items() if count == 0), key=order)
+        if not ready:
+            chosen = min(remaining, key=lambda node_id: (remaining[node_id], order(node_id)))
+            broken_edges.extend(
+                (node_id, chosen)
+                for node_id in sorted(dependencies[chosen], key=order)
+                if node_id in remaining
+            )
+            ready = [chosen]
+        for node_id in ready:
+            del remaining[node_id]
+        for node_id in ready:
+            for dependent in dependents.get(node_id, []):
+                if dependent in remaining:
+                    remaining[dependent] -= 1
+        waves.append(ready)
+
+    if broken_edges:
+        logger.info("Ciclos quebrados no plano de ondas: %s", broken_edges)
+    return WavePlan(waves=waves, broken_edges=broken_edges)
+
+
+def apply_generated(graph: CampaignGraph, items: Iterable[GeneratedItem]) -> CampaignGraph:
+    node_map = dict(graph.node_map)
+    for item in items:
+        node = node_map.get(item.id)
+        if node is not None:
+            node_map[item.id] = replace(node, title=item.title or node.title, content=item.content)
+    rank = {node.id: index for index, node in enumerate(sort_nodes(list(node_map.values())))}
+    return replace(graph, node_map=node_map, rank=rank)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+
+import httpx
+
+from app.services.ai_adapter import AIProviderConfig, AzureOpenAIAdapter, OpenAIAdapter
+from app.services.prompt_builder import PromptItem
+
+
+def _build_prompts(count: int) -> List[PromptItem]:
+    return [
+        PromptItem(
+            id=f'node-{index}',
+            prompt=f'Campanha: Bench\nAlvo: NPC - Bloco {index}',
+            target_title=f'Bloco {index}',
+            target_type='npc',
+            context_titles=[],
+        )
+        for index in range(count)
+    ]
+
+
+def _fake_transport(delays: List[float]) -> httpx.MockTransport:
+    counter = {'value': 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        index = counter['value']
+        counter['value'] += 1
+        await asyncio.sleep(delays[index % len(delays)])
+        content = json.dumps({'title': f'Bloco {index}', 'content': 'Texto gerado.'})
+        return httpx.Response(200, json={'choices': [{'message': {'content': content}}]})
+
+    return httpx.MockTransport(handler)
+
+
+def _build_adapter(provider: str, concurrency: int, delays: List[float]):
+    transport = _fake_transport(delays)
+    if provider == 'azure':
+        return AzureOpenAIAdapter(
+            AIProviderConfig(
+                provider='azure',
+                model='bench',
+                api_key='bench',
+                base_url='http://fake.local',
+                deployment='bench',
+                api_version='bench',
+                max_concurrency=concurrency,
+            ),
+            transport=transport,
+        )
+    return OpenAIAdapter(
+        AIProviderConfig(
+            provider='openai',
+            model='bench',
+            api_key='bench',
+            base_url='http://fake.local',
+            max_concurrency=concurrency,
+        ),
+        transport=transport,
+    )
+
+
+async def _run(provider: str, concurrency: int, delays: List[float], items: int) -> float:
+    adapter = _build_adapter(provider, concurrency, delays)
+    prompts = _build_prompts(items)
+    started = time.perf_counter()
+    results = await adapter.generate(prompts)
+    elapsed = time.perf_counter() - started
+    if [item.id for item in results] != [item.id for item in prompts]:
+        raise RuntimeError('Ordem dos resultados diferente da entrada')
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark de concorrencia dos adapters')
+    parser.add_argument('--provider', choices=['openai', 'azure'], default='openai')
+    parser.add_argument('--items', type=int, default=20)
+    parser.add_argument('--min-delay', type=float, default=0.05)
+    parser.add_argument('--max-delay', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    delays = [rng.uniform(args.min_delay, args.max_delay) for _ in range(args.items)]
+    print(f'soma das latencias: {sum(delays):.3f}s | mais lenta: {max(delays):.3f}s')
+
+    for concurrency in [1, 4, args.items]:
+        elapsed = asyncio.run(_run(args.provider, concurrency, delays, args.items))
+        print(f'concurrency={concurrency:<3} wall={elapsed:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import time
+
+from app.services.prompt_builder import compile_graph
+from app.services.subgraph import find_affected
+from benchmarks.synthetic import synthetic_graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark de deteccao de subgrafo afetado')
+    parser.add_argument('--nodes', type=int, default=10000)
+    parser.add_argument('--edges-per-node', type=int, default=2)
+    parser.add_argument('--changes', type=int, default=5)
+    parser.add_argument('--max-depth', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    nodes, edges = synthetic_graph(args.nodes, args.edges_per_node, seed=7)
+    changed_nodes = copy.deepcopy(nodes)
+    for index in rng.sample(range(args.nodes), args.changes):
+        changed_nodes[index]['data']['title'] += ' (editado)'
+
+    started = time.perf_counter()
+    previous = compile_graph(nodes, edges)
+    current = compile_graph(changed_nodes, edges)
+    compile_ms = (time.perf_counter() - started) * 1000 / 2
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        affected = find_affected(previous, current, args.max_depth)
+    diff_ms = (time.perf_counter() - started) * 1000 / args.repeat
+
+    print(f'nodes={args.nodes} edges={len(edges)} alterados={len(affected.changed_ids)}')
+    print(f'compile_graph: {compile_ms:.2f} ms por grafo')
+    print(f'find_affected: {diff_ms:.2f} ms -> {len(affected.target_ids)} blocos para regenerar')
+
+
+if __name__ == '__main__':
+    main()
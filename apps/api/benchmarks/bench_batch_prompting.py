@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import time
+
+import httpx
+
+from app.services.ai_adapter import AIProviderConfig, OpenAIAdapter
+from app.services.prompt_builder import PromptConfig, approx_token_count, build_prompts
+from benchmarks.synthetic import synthetic_graph
+
+_BLOCK_ID = re.compile(r'^Bloco (\S+):$', re.MULTILINE)
+
+
+class FakeProvider:
+    def __init__(self, latency: float, drop_every: int) -> None:
+        self.latency = latency
+        self.drop_every = drop_every
+        self.requests = 0
+        self.input_tokens = 0
+        self._answered = 0
+
+    def _answer(self, block_id: str) -> dict:
+        return {'id': block_id, 'title': f'Titulo {block_id}', 'content': f'Conteudo gerado para {block_id}.'}
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        prompt = json.loads(request.content)['messages'][-1]['content']
+        self.input_tokens += approx_token_count(prompt)
+        await asyncio.sleep(self.latency)
+        block_ids = _BLOCK_ID.findall(prompt)
+        if not block_ids:
+            content = json.dumps({'title': 'Titulo', 'content': 'Conteudo gerado.'})
+        else:
+            answers = []
+            for block_id in block_ids:
+                self._answered += 1
+                if self.drop_every and self._answered % self.drop_every == 0:
+                    continue
+                answers.append(self._answer(block_id))
+            content = '```json\n' + json.dumps(answers) + '\n```'
+        return httpx.Response(200, json={'choices': [{'message': {'content': content}}]})
+
+
+async def _run(prompts, batch_size: int, latency: float, drop_every: int, concurrency: int) -> tuple:
+    provider = FakeProvider(latency, drop_every)
+    adapter = OpenAIAdapter(
+        AIProviderConfig(
+            provider='openai',
+            model='bench',
+            api_key='bench',
+            base_url='http://fake.local',
+            max_concurrency=concurrency,
+            batch_size=batch_size,
+        ),
+        transport=httpx.MockTransport(provider.handler),
+    )
+    started = time.perf_counter()
+    results = await adapter.generate(prompts)
+    elapsed = time.perf_counter() - started
+    if [item.id for item in results] != [item.id for item in prompts]:
+        raise RuntimeError('Resultados fora de ordem ou incompletos')
+    return provider.requests, provider.input_tokens, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Geracao em lote: varios blocos por chamada')
+    parser.add_argument('--nodes', type=int, default=400)
+    parser.add_argument('--targets', type=int, default=48)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--drop-every', type=int, default=0, help='omite 1 a cada N blocos na resposta em lote')
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(args.nodes, 2, seed=3)
+    party = {'group_name': 'Os Errantes', 'average_level': 5, 'party_size': 4, 'classes': 'Guerreiro, Mago'}
+    target_ids = [node['id'] for node in nodes[-args.targets :]]
+    prompts = build_prompts(target_ids, nodes, edges, 'Bench', party, PromptConfig())
+
+    for batch_size in [1, 4, 8, 16]:
+        requests, tokens, elapsed = asyncio.run(
+            _run(prompts, batch_size, args.latency, args.drop_every, args.concurrency)
+        )
+        print(
+            f'batch={batch_size:<3} requisicoes={requests:<4} tokens de entrada~{tokens:<6} '
+            f'wall={elapsed:.3f}s'
+        )
+
+
+if __name__ == '__main__':
+    main()
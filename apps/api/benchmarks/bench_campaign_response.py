@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+
+from app.api.campaigns import _to_raw_response, _to_response
+from app.db.models import Campaign
+from app.services.campaign_store import load_raw_graph, parse_meta
+from app.services.json_codec import JSON_BACKEND
+from benchmarks.support import temporary_client
+from benchmarks.synthetic import synthetic_graph
+
+
+def _measure(fn: Callable[[], object], repeat: int) -> tuple:
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    cpu_ms = (time.process_time() - started) * 1000 / repeat
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_ms, peak / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Resposta de campanha: revalidacao vs JSON armazenado')
+    parser.add_argument('--nodes', type=int, default=5000)
+    parser.add_argument('--content-chars', type=int, default=600)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(args.nodes, 2, seed=5)
+    for node in nodes:
+        node['data']['content'] = 'Lorem ipsum ' * (args.content_chars // 12)
+
+    with temporary_client() as (client, session_factory):
+        campaign_id = client.post(
+            '/campaigns/', json={'title': 'Bench', 'nodes': nodes, 'edges': edges}
+        ).json()['id']
+        db = session_factory()
+        campaign = db.get(Campaign, campaign_id)
+
+        def legacy() -> bytes:
+            model = _to_response(db, campaign)
+            return json.dumps(jsonable_encoder(model)).encode('utf-8')
+
+        def spliced() -> bytes:
+            meta = parse_meta(campaign)
+            return _to_raw_response(campaign, load_raw_graph(db, campaign, meta), None).body
+
+        size_mb = len(spliced()) / (1024 * 1024)
+        legacy_cpu, legacy_peak = _measure(legacy, args.repeat)
+        spliced_cpu, spliced_peak = _measure(spliced, args.repeat)
+        db.close()
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            client.get(f'/campaigns/{campaign_id}')
+        http_ms = (time.perf_counter() - started) * 1000 / args.repeat
+
+    print(f'campanha: {args.nodes} nodes, {size_mb:.1f} MB de JSON | backend={JSON_BACKEND}')
+    print(f'pydantic + json.dumps : cpu={legacy_cpu:8.1f} ms | pico alocado={legacy_peak:7.1f} MB')
+    print(f'JSON armazenado       : cpu={spliced_cpu:8.1f} ms | pico alocado={spliced_peak:7.1f} MB')
+    print(f'GET /campaigns/{{id}} via TestClient: {http_ms:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
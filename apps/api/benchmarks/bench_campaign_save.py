@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from app.db.models import Campaign
+from app.db.session import get_session
+from app.schemas.campaigns import CampaignResponse, CampaignUpdate
+from benchmarks.support import temporary_client
+from benchmarks.synthetic import synthetic_graph
+
+
+def _legacy_update(campaign_id: str, payload: CampaignUpdate, db: Session = Depends(get_session)):
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign.title = payload.title
+    campaign.data = json.dumps(
+        {
+            'nodes': payload.nodes,
+            'edges': payload.edges,
+            'party_profile': payload.party_profile.model_dump() if payload.party_profile else None,
+        }
+    )
+    campaign.updated_at = datetime.utcnow()
+    db.commit()
+    db.refresh(campaign)
+    stored = json.loads(campaign.data)
+    return CampaignResponse(
+        id=campaign.id,
+        title=campaign.title,
+        nodes=stored['nodes'],
+        edges=stored['edges'],
+        party_profile=stored['party_profile'],
+        created_at=campaign.created_at,
+        updated_at=campaign.updated_at,
+    )
+
+
+def _median_ms(samples: list) -> float:
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Latencia de autosave por tamanho de campanha')
+    parser.add_argument('--sizes', default='100,1000,5000')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with temporary_client() as (client, session_factory):
+        client.app.put('/legacy/{campaign_id}')(_legacy_update)
+        for size in [int(value) for value in args.sizes.split(',')]:
+            nodes, edges = synthetic_graph(size, 2, seed=size)
+            body = {'title': 'Bench', 'nodes': nodes, 'edges': edges}
+            campaign_id = client.post('/campaigns/', json=body).json()['id']
+
+            db = session_factory()
+            db.add(
+                Campaign(
+                    id=f'legacy-{size}',
+                    title='Bench',
+                    data=json.dumps({'nodes': nodes, 'edges': edges, 'party_profile': None}),
+                    created_at=datetime.utcnow(),
+                    updated_at=datetime.utcnow(),
+                )
+            )
+            db.commit()
+            db.close()
+
+            legacy, put, patch = [], [], []
+            for step in range(args.repeat):
+                nodes[0]['position'] = {'x': step, 'y': step}
+
+                started = time.perf_counter()
+                client.put(f'/legacy/legacy-{size}', json=body)
+                legacy.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                client.put(f'/campaigns/{campaign_id}', json=body)
+                put.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                client.patch(f'/campaigns/{campaign_id}', json={'upsert_nodes': [nodes[0]]})
+                patch.append(time.perf_counter() - started)
+
+            print(
+                f'nodes={size:<6} blob legado={_median_ms(legacy):8.2f} ms | '
+                f'PUT em linhas={_median_ms(put):8.2f} ms | PATCH 1 no={_median_ms(patch):6.2f} ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
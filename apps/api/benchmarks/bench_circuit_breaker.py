@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+import httpx
+
+from app.services.ai_adapter import AIProviderConfig, OpenAIAdapter
+from app.services.circuit_breaker import BreakerConfig
+from app.services.generation import generate_story_blocks
+from app.services.prompt_builder import PromptConfig
+from app.services.rate_limiter import RateLimitConfig
+from benchmarks.synthetic import synthetic_graph
+
+_TARGET_TITLE = re.compile(r'^Alvo: .+ - (.+)$', re.MULTILINE)
+
+
+class FlakyProvider:
+    def __init__(self, latency: float, timeout: float) -> None:
+        self.latency = latency
+        self.timeout = timeout
+        self.down = False
+        self.failing_titles: set[str] = set()
+        self.calls = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.down:
+            await asyncio.sleep(self.timeout)
+            raise httpx.ConnectTimeout('provedor fora do ar', request=request)
+        await asyncio.sleep(self.latency)
+        prompt = json.loads(request.content)['messages'][-1]['content']
+        match = _TARGET_TITLE.search(prompt)
+        if match and match.group(1) in self.failing_titles:
+            return httpx.Response(500, json={'error': {'message': 'erro interno'}})
+        content = json.dumps({'title': 'Titulo real', 'content': 'Conteudo real.'})
+        return httpx.Response(200, json={'choices': [{'message': {'content': content}}]})
+
+
+def _adapter(provider: FlakyProvider, breaker: BreakerConfig) -> OpenAIAdapter:
+    return OpenAIAdapter(
+        AIProviderConfig(
+            provider='openai',
+            model='bench',
+            api_key='bench',
+            base_url='http://fake.local',
+            rate_limit=RateLimitConfig(max_retries=1, backoff_base=0.01),
+            breaker=breaker,
+        ),
+        transport=httpx.MockTransport(provider.handler),
+    )
+
+
+async def _partial(nodes, edges, args) -> None:
+    provider = FlakyProvider(args.latency, args.timeout)
+    target_ids = [node['id'] for node in nodes[-args.targets :]]
+    provider.failing_titles = {node['data']['title'] for node in nodes[-args.targets :][:: args.fail_every]}
+    adapter = _adapter(provider, BreakerConfig(failure_threshold=100))
+    mode, items = await generate_story_blocks(target_ids, nodes, edges, 'Bench', None, PromptConfig(), adapter=adapter)
+    print(f'falhas por item: mode={mode} | por bloco={dict(Counter(item.mode for item in items))}')
+
+
+async def _outage(nodes, edges, args, breaker: BreakerConfig, label: str) -> None:
+    provider = FlakyProvider(args.latency, args.timeout)
+    adapter = _adapter(provider, breaker)
+    target_ids = [node['id'] for node in nodes[-3:]]
+    provider.down = True
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        await generate_story_blocks(target_ids, nodes, edges, 'Bench', None, PromptConfig(), adapter=adapter)
+    outage = time.perf_counter() - started
+    calls_down = provider.calls
+
+    provider.down = False
+    await asyncio.sleep(breaker.reset_seconds)
+    mode, _ = await generate_story_blocks(target_ids, nodes, edges, 'Bench', None, PromptConfig(), adapter=adapter)
+    print(
+        f'{label:<14} queda: {args.requests} requisicoes em {outage:5.2f}s, {calls_down} chamadas de rede | '
+        f'apos recuperar: mode={mode} estado={adapter.breaker.state}'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Circuit breaker e fallback por bloco')
+    parser.add_argument('--targets', type=int, default=12)
+    parser.add_argument('--fail-every', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--timeout', type=float, default=0.3, help='espera simulada ate o timeout do httpx')
+    args = parser.parse_args()
+    logging.getLogger('app').setLevel(logging.CRITICAL)
+
+    nodes, edges = synthetic_graph(60, 1, seed=6)
+    asyncio.run(_partial(nodes, edges, args))
+    asyncio.run(_outage(nodes, edges, args, BreakerConfig(failure_threshold=10**6, reset_seconds=0.2), 'sem breaker'))
+    asyncio.run(_outage(nodes, edges, args, BreakerConfig(failure_threshold=3, reset_seconds=0.2), 'com breaker'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import time
+
+from sqlalchemy import text
+
+from app.db.compression import CompressionConfig, configure_compression
+from app.db.migrate_compression import migrate
+from benchmarks.support import temporary_client
+from benchmarks.synthetic import synthetic_graph
+
+WORDS = (
+    'o grupo atravessa a floresta sombria enquanto o dragao vigia a torre antiga '
+    'e o mago revela a profecia esquecida sobre a coroa perdida do reino'
+).split()
+
+
+def _corpus(campaigns: int, nodes: int, content_words: int) -> list:
+    rng = random.Random(12)
+    corpus = []
+    for index in range(campaigns):
+        graph_nodes, graph_edges = synthetic_graph(nodes, 2, seed=index)
+        for node in graph_nodes:
+            node['data']['content'] = ' '.join(rng.choice(WORDS) for _ in range(content_words))
+        corpus.append({'title': f'Campanha {index}', 'nodes': graph_nodes, 'edges': graph_edges})
+    return corpus
+
+
+def _stored_bytes(session_factory) -> int:
+    db = session_factory()
+    try:
+        return sum(
+            db.execute(text(f'SELECT coalesce(sum(length(data)), 0) FROM {table}')).scalar()
+            for table in ('campaigns', 'campaign_nodes')
+        )
+    finally:
+        db.close()
+
+
+def _run(config: CompressionConfig, corpus: list) -> dict:
+    configure_compression(config)
+    with temporary_client() as (client, session_factory):
+        started = time.perf_counter()
+        ids = [client.post('/campaigns/', json=payload).json()['id'] for payload in corpus]
+        write_ms = (time.perf_counter() - started) * 1000 / len(ids)
+
+        started = time.perf_counter()
+        for campaign_id in ids:
+            client.get(f'/campaigns/{campaign_id}')
+        read_ms = (time.perf_counter() - started) * 1000 / len(ids)
+        stored = _stored_bytes(session_factory)
+    return {'write_ms': write_ms, 'read_ms': read_ms, 'stored': stored}
+
+
+def _run_migration(config: CompressionConfig, corpus: list) -> tuple:
+    configure_compression(CompressionConfig(codec='none'))
+    with temporary_client() as (client, session_factory):
+        for payload in corpus:
+            client.post('/campaigns/', json=payload)
+        configure_compression(config)
+        engine = session_factory.kw['bind']
+        started = time.perf_counter()
+        stats = migrate(engine)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        packed = sum(item['packed'] for item in stats.values())
+        return packed, elapsed_ms, _stored_bytes(session_factory)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compressao do payload armazenado de campanhas')
+    parser.add_argument('--campaigns', type=int, default=20)
+    parser.add_argument('--nodes', type=int, default=300)
+    parser.add_argument('--content-words', type=int, default=120)
+    parser.add_argument('--min-bytes', type=int, default=512)
+    args = parser.parse_args()
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    corpus = _corpus(args.campaigns, args.nodes, args.content_words)
+    configs = [
+        CompressionConfig(codec='none'),
+        CompressionConfig(codec='zlib', level=6, min_bytes=args.min_bytes),
+        CompressionConfig(codec='zlib', level=1, min_bytes=args.min_bytes),
+        CompressionConfig(codec='lzma', level=1, min_bytes=args.min_bytes),
+    ]
+    try:
+        baseline = None
+        print(f'corpus: {args.campaigns} campanhas x {args.nodes} nodes, ~{args.content_words} palavras por node')
+        for config in configs:
+            result = _run(config, corpus)
+            baseline = baseline or result
+            ratio = baseline['stored'] / result['stored']
+            print(
+                f"{config.codec:>4} nivel {config.level}: {result['stored'] / (1024 * 1024):6.2f} MB "
+                f"(razao {ratio:4.2f}x) | POST {result['write_ms']:7.1f} ms "
+                f"({result['write_ms'] - baseline['write_ms']:+6.1f}) | GET {result['read_ms']:6.1f} ms "
+                f"({result['read_ms'] - baseline['read_ms']:+6.1f})"
+            )
+
+        packed, elapsed_ms, stored = _run_migration(configs[1], corpus)
+        print(
+            f'migracao zlib de linhas antigas: {packed} linhas em {elapsed_ms:.0f} ms | '
+            f"{baseline['stored'] / (1024 * 1024):.2f} MB -> {stored / (1024 * 1024):.2f} MB"
+        )
+    finally:
+        configure_compression(None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from statistics import mean
+
+from app.services.prompt_builder import (
+    PromptConfig,
+    approx_token_count,
+    build_prompts_from_graph,
+    compile_graph,
+)
+from app.services.summaries import SummaryConfig, SummaryStore
+from benchmarks.synthetic import WORDS, synthetic_graph
+
+
+def _with_content(nodes: list, sentences: int, seed: int) -> list:
+    rng = random.Random(seed)
+    for node in nodes:
+        node['data']['content'] = ' '.join(
+            ' '.join(rng.choice(WORDS) for _ in range(12)).capitalize() + '.' for _ in range(sentences)
+        )
+    return nodes
+
+
+async def _refresh(store: SummaryStore, graph) -> float:
+    started = time.perf_counter()
+    await store.summaries_for(graph, 'bench')
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Sumarios de contexto cacheados no prompt')
+    parser.add_argument('--nodes', type=int, default=2000)
+    parser.add_argument('--targets', type=int, default=50)
+    parser.add_argument('--sentences', type=int, default=6)
+    parser.add_argument('--edits', type=int, default=20, help='nodes editados entre as rodadas')
+    parser.add_argument('--budget-tokens', type=int, default=400)
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(args.nodes, 2, seed=5)
+    nodes = _with_content(nodes, args.sentences, seed=6)
+    graph = compile_graph(nodes, edges)
+    targets = [f'n{args.nodes - 1 - index}' for index in range(args.targets)]
+    store = SummaryStore(SummaryConfig())
+
+    first = asyncio.run(_refresh(store, graph))
+    unchanged = asyncio.run(_refresh(store, graph))
+    summaries = asyncio.run(store.summaries_for(graph, 'bench'))
+    full = {node_id: node.content for node_id, node in graph.node_map.items()}
+    config = PromptConfig(max_prompt_tokens=args.budget_tokens)
+
+    for label, mapping in [('so titulos', None), ('conteudo completo', full), ('sumarios', summaries)]:
+        prompts = build_prompts_from_graph(targets, graph, 'Bench', None, config, mapping)
+        tokens = [approx_token_count(item.prompt) for item in prompts]
+        context = [item.section.count('\n- ') for item in prompts]
+        detailed = [item.section.count('Resumo:') for item in prompts]
+        print(
+            f'{label:>18}: tokens medios={mean(tokens):6.1f} | contexto medio={mean(context):4.1f} | '
+            f'com detalhe={mean(detailed):4.1f}'
+        )
+
+    rng = random.Random(8)
+    for node in rng.sample(nodes, args.edits):
+        node['data']['content'] += ' Fato novo.'
+    before = store.stats.computed
+    incremental = asyncio.run(_refresh(store, compile_graph(nodes, edges)))
+    print(
+        f'recalculo: inicial={first * 1000:.1f} ms ({args.nodes} nodes) | '
+        f'mesma versao={unchanged * 1000:.3f} ms | '
+        f'incremental={incremental * 1000:.1f} ms ({store.stats.computed - before} recalculados)'
+    )
+
+
+if __name__ == '__main__':
+    main()
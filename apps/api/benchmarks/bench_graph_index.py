@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from app.services.prompt_builder import PromptConfig, build_prompts, build_prompts_from_graph, compile_graph
+from benchmarks.synthetic import synthetic_graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark do indice compilado de grafo')
+    parser.add_argument('--nodes', type=int, default=5000)
+    parser.add_argument('--edges-per-node', type=int, default=2)
+    parser.add_argument('--targets', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(args.nodes, args.edges_per_node, seed=7)
+    targets = [f'n{args.nodes - 1 - index}' for index in range(args.targets)]
+    config = PromptConfig()
+
+    raw_body = len(json.dumps({'nodes': nodes, 'edges': edges, 'target_ids': targets}))
+    id_body = len(json.dumps({'campaign_id': 'c' * 32, 'target_ids': targets}))
+    print(f'request body: completo={raw_body} bytes | campaign_id={id_body} bytes')
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        build_prompts(targets, nodes, edges, 'Bench', None, config)
+    raw_ms = (time.perf_counter() - started) * 1000 / args.repeat
+
+    graph = compile_graph(nodes, edges)
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        build_prompts_from_graph(targets, graph, 'Bench', None, config)
+    indexed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+
+    print(f'build_prompts (parse a cada chamada): {raw_ms:.3f} ms')
+    print(f'build_prompts_from_graph (indice em cache): {indexed_ms:.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.metrics import MetricsMiddleware, MetricsRegistry
+
+
+def _per_call(label: str, calls: int, action) -> None:
+    started = time.perf_counter()
+    for index in range(calls):
+        action(index)
+    elapsed = time.perf_counter() - started
+    print(f'{label:>26}: {elapsed / calls * 1e9:8.0f} ns/chamada')
+
+
+def _build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/items/{item_id}')
+    def read_item(item_id: str):
+        return {'id': item_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Custo de coleta das metricas')
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    histogram = registry.histogram('bench_seconds', 'bench', ('route', 'status'))
+    counter = registry.counter('bench_total', 'bench', ('adapter',))
+    _per_call('histogram.observe', args.calls, lambda index: histogram.observe(index % 97 / 100, '/x', '200'))
+    _per_call('counter.inc', args.calls, lambda index: counter.inc('openai'))
+    started = time.perf_counter()
+    text = registry.render()
+    print(f'{"render":>26}: {(time.perf_counter() - started) * 1000:8.2f} ms ({len(text)} bytes)')
+
+    for label, with_metrics in [('requisicao sem metricas', False), ('requisicao com metricas', True)]:
+        client = TestClient(_build_app(with_metrics))
+        client.get('/items/warmup')
+        _per_call(label, args.requests, lambda index: client.get(f'/items/{index}'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List
+
+from app.services.prompt_builder import (
+    INSTRUCTION_LINES,
+    TYPE_LABELS,
+    TYPE_ORDER,
+    NodeRecord,
+    PromptConfig,
+    build_prompt,
+)
+
+
+def _legacy_build_prompt(target: NodeRecord, upstream: List[NodeRecord], config: PromptConfig) -> str:
+    context_lines = [
+        f"- {TYPE_LABELS.get(node.type, node.type)}: {node.title}"
+        for node in upstream[: config.max_context_items]
+    ]
+
+    def render() -> str:
+        return "\n".join(
+            [
+                "Campanha: Bench",
+                f"Alvo: {TYPE_LABELS[target.type]} - {target.title}",
+                f"Tipo do bloco: {TYPE_LABELS[target.type]}",
+                "Contexto:",
+                *(context_lines if context_lines else ["- Nenhum"]),
+                *INSTRUCTION_LINES,
+            ]
+        )
+
+    prompt = render()
+    while len(prompt) > config.max_prompt_chars and context_lines:
+        context_lines.pop()
+        prompt = render()
+    return prompt[: config.max_prompt_chars]
+
+
+def _upstream(count: int) -> List[NodeRecord]:
+    return [
+        NodeRecord(
+            id=f'n{index}',
+            type=TYPE_ORDER[index % len(TYPE_ORDER)],
+            title=f'Bloco de contexto numero {index}',
+        )
+        for index in range(count)
+    ]
+
+
+def _time(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Microbenchmark do corte de contexto do prompt')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    target = NodeRecord(id='alvo', type='npc', title='Alvo')
+    for count in [100, 300, 1000]:
+        upstream = _upstream(count)
+        config = PromptConfig(max_context_items=count, max_prompt_chars=2000)
+        token_config = PromptConfig(max_context_items=count, max_prompt_tokens=500)
+        legacy = _time(lambda: _legacy_build_prompt(target, upstream, config), args.repeat)
+        chars = _time(lambda: build_prompt(target, upstream, 'Bench', None, config), args.repeat)
+        tokens = _time(lambda: build_prompt(target, upstream, 'Bench', None, token_config), args.repeat)
+        print(
+            f'upstream={count:<5} legado={legacy:8.3f} ms | '
+            f'template/chars={chars:7.3f} ms | template/tokens={tokens:7.3f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
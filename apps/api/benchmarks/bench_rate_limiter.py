@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import deque
+from typing import Deque
+
+import httpx
+
+from app.services.ai_adapter import AIProviderConfig, OpenAIAdapter
+from app.services.generation import generate_story_blocks
+from app.services.prompt_builder import PromptConfig
+from app.services.rate_limiter import RateLimitConfig
+from benchmarks.synthetic import synthetic_graph
+
+
+class ThrottlingProvider:
+    def __init__(self, per_second: int, max_inflight: int, error_rate: float, latency: float, seed: int) -> None:
+        self.per_second = per_second
+        self.max_inflight = max_inflight
+        self.error_rate = error_rate
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.accepted: Deque[float] = deque()
+        self.inflight = 0
+        self.ok = 0
+        self.throttled = 0
+        self.errors = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        now = time.monotonic()
+        while self.accepted and now - self.accepted[0] >= 1.0:
+            self.accepted.popleft()
+        if len(self.accepted) >= self.per_second or self.inflight >= self.max_inflight:
+            self.throttled += 1
+            retry_after = 1.0 - (now - self.accepted[0]) if self.accepted else 0.2
+            return httpx.Response(
+                429,
+                headers={'retry-after-ms': str(int(max(50, retry_after * 1000)))},
+                json={'error': {'message': 'Rate limit reached'}},
+            )
+        self.accepted.append(now)
+        self.inflight += 1
+        try:
+            await asyncio.sleep(self.latency)
+            if self.rng.random() < self.error_rate:
+                self.errors += 1
+                return httpx.Response(503, json={'error': {'message': 'Service unavailable'}})
+            self.ok += 1
+            prompt = json.loads(request.content)['messages'][-1]['content']
+            content = json.dumps({'title': 'Titulo', 'content': f'Gerado ({len(prompt)} chars).'})
+            return httpx.Response(200, json={'choices': [{'message': {'content': content}}]})
+        finally:
+            self.inflight -= 1
+
+
+async def _run(label: str, rate_limit: RateLimitConfig, args, nodes, edges) -> None:
+    provider = ThrottlingProvider(args.server_rps, args.server_inflight, args.error_rate, args.latency, args.seed)
+    adapter = OpenAIAdapter(
+        AIProviderConfig(
+            provider='openai',
+            model='bench',
+            api_key='bench',
+            base_url='http://fake.local',
+            max_concurrency=args.concurrency,
+            rate_limit=rate_limit,
+        ),
+        transport=httpx.MockTransport(provider.handler),
+    )
+    target_ids = [node['id'] for node in nodes[-args.targets :]]
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            generate_story_blocks(target_ids, nodes, edges, 'Bench', None, PromptConfig(), adapter=adapter)
+            for _ in range(args.requests)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    mock = sum(1 for mode, _ in results if mode == 'mock')
+    print(
+        f'{label:<26} real={len(results) - mock:<3} mock={mock:<3} wall={elapsed:6.2f}s | '
+        f'servidor ok={provider.ok} 429={provider.throttled} 503={provider.errors} | '
+        f'{adapter.limiter.snapshot()}'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Limitador do provedor contra transporte falso com 429/503')
+    parser.add_argument('--requests', type=int, default=12, help='requisicoes /generate simultaneas')
+    parser.add_argument('--targets', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--server-rps', type=int, default=20)
+    parser.add_argument('--server-inflight', type=int, default=6)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=21)
+    args = parser.parse_args()
+    logging.getLogger('app').setLevel(logging.CRITICAL)
+
+    nodes, edges = synthetic_graph(100, 2, seed=2)
+    scenarios = [
+        ('sem retry (antigo)', RateLimitConfig(max_retries=0)),
+        ('retry + AIMD', RateLimitConfig(max_retries=6)),
+        ('retry + AIMD + RPM local', RateLimitConfig(max_retries=6, requests_per_minute=args.server_rps * 60 * 0.9, burst_seconds=1.0)),
+    ]
+    for label, rate_limit in scenarios:
+        asyncio.run(_run(label, rate_limit, args, nodes, edges))
+
+
+if __name__ == '__main__':
+    main()
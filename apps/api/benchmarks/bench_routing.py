@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from contextlib import ExitStack
+from typing import List
+
+from app.services.ai_adapter import (
+    AIProviderConfig,
+    AzureOpenAIAdapter,
+    OpenAIAdapter,
+    RoutingAdapter,
+)
+from app.services.http_pool import HttpPoolConfig
+from app.services.prompt_builder import PromptConfig, PromptItem, build_prompts
+from app.services.routing import RoutingConfig
+from benchmarks.fake_provider import FakeProviderConfig, create_fake_provider
+from benchmarks.load_driver import _percentile
+from benchmarks.support import running_server
+from benchmarks.synthetic import synthetic_graph
+
+
+def _routes(urls: List[str], concurrency: int) -> list:
+    openai = OpenAIAdapter(
+        AIProviderConfig(
+            provider='openai', model='fake', api_key='fake', base_url=urls[0], max_concurrency=concurrency
+        ),
+        pool=HttpPoolConfig(),
+    )
+    azure = AzureOpenAIAdapter(
+        AIProviderConfig(
+            provider='azure',
+            model='fake',
+            api_key='fake',
+            base_url=urls[1],
+            deployment='fake-deployment',
+            api_version='2024-06-01',
+            max_concurrency=concurrency,
+        ),
+        pool=HttpPoolConfig(),
+    )
+    return [openai, azure]
+
+
+async def _run(adapter, prompts: List[PromptItem], concurrency: int) -> List[float]:
+    latencies: List[float] = []
+    queue = list(prompts)
+
+    async def worker() -> None:
+        while queue:
+            item = queue.pop()
+            started = time.perf_counter()
+            await adapter.generate([item])
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await adapter.aclose()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Roteamento entre provedores com e sem hedge de cauda')
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=120.0)
+    parser.add_argument('--jitter-ms', type=float, default=200.0, help='desvio da lognormal (cauda)')
+    parser.add_argument('--quantile', type=float, default=0.95)
+    parser.add_argument('--min-samples', type=int, default=10, help='amostras por rota antes do hedge adaptativo')
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(args.requests + 10, 2, seed=3)
+    prompts = build_prompts(
+        [node['id'] for node in nodes[: args.requests]], nodes, edges, 'Bench', None, PromptConfig()
+    )
+    print(
+        f'requisicoes={len(prompts)} concorrencia={args.concurrency} '
+        f'latencia lognormal media={args.latency_ms:.0f}ms desvio={args.jitter_ms:.0f}ms'
+    )
+    with ExitStack() as stack:
+        urls = [
+            stack.enter_context(
+                running_server(
+                    create_fake_provider(
+                        FakeProviderConfig(
+                            latency_ms=args.latency_ms,
+                            jitter_ms=args.jitter_ms,
+                            distribution='lognormal',
+                            seed=seed,
+                        )
+                    )
+                )
+            )
+            for seed in (1, 2)
+        ]
+        strategies = [
+            ('um provedor', lambda: _routes(urls, args.concurrency)[0]),
+            (
+                'roteado',
+                lambda: RoutingAdapter(
+                    _routes(urls, args.concurrency), RoutingConfig(hedge=False, min_samples=args.min_samples)
+                ),
+            ),
+            (
+                'roteado + hedge',
+                lambda: RoutingAdapter(
+                    _routes(urls, args.concurrency),
+                    RoutingConfig(
+                        hedge_quantile=args.quantile, max_hedges=args.concurrency, min_samples=args.min_samples
+                    ),
+                ),
+            ),
+        ]
+        for label, build in strategies:
+            adapter = build()
+            started = time.perf_counter()
+            latencies = asyncio.run(_run(adapter, prompts, args.concurrency))
+            elapsed = time.perf_counter() - started
+            extra = ''
+            if isinstance(adapter, RoutingAdapter):
+                routes = adapter.snapshot()['routes']
+                hedged = sum(route['hedged'] for route in routes)
+                wins = sum(route['hedge_wins'] for route in routes)
+                split = ' '.join(f"{route['name']}={route['requests']}" for route in routes)
+                extra = f' | hedges={hedged} ({hedged / len(prompts):.1%}) vencidos={wins} | {split}'
+            print(
+                f'{label:>16}: p50={_percentile(latencies, 50) * 1000:6.0f} '
+                f'p95={_percentile(latencies, 95) * 1000:6.0f} '
+                f'p99={_percentile(latencies, 99) * 1000:6.0f} ms | total={elapsed:5.1f}s{extra}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from typing import List, Optional
+
+from app.services.ai_adapter import GeneratedItem, MockAdapter
+from app.services.generation import SingleFlight, generate_story_blocks
+from app.services.prompt_builder import PromptConfig, PromptItem
+from benchmarks.synthetic import synthetic_graph
+
+
+class CountingAdapter(MockAdapter):
+    cache_scope = 'bench'
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls = 0
+        self.items = 0
+
+    async def generate(self, prompts: List[PromptItem]) -> List[GeneratedItem]:
+        self.calls += 1
+        self.items += len(prompts)
+        await asyncio.sleep(self.latency)
+        return await super().generate(prompts)
+
+
+async def _run(flights: Optional[SingleFlight], args, nodes, edges) -> tuple:
+    adapter = CountingAdapter(args.latency)
+    rng = random.Random(args.seed)
+    node_ids = [node['id'] for node in nodes]
+    targets = [rng.sample(node_ids[-args.pool :], args.targets) for _ in range(args.distinct)]
+
+    async def client(index: int):
+        await asyncio.sleep(rng.uniform(0, args.jitter))
+        return await generate_story_blocks(
+            targets[index % args.distinct], nodes, edges, 'Bench', None, PromptConfig(),
+            adapter=adapter, flights=flights,
+        )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(args.requests)))
+    return adapter.calls, adapter.items, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Single-flight: requisicoes de geracao simultaneas')
+    parser.add_argument('--requests', type=int, default=30)
+    parser.add_argument('--distinct', type=int, default=5, help='conjuntos distintos de targets')
+    parser.add_argument('--targets', type=int, default=4)
+    parser.add_argument('--pool', type=int, default=12, help='nodes candidatos a target')
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--jitter', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=9)
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(200, 2, seed=4)
+    for label, flights in [('sem single-flight', None), ('com single-flight', SingleFlight())]:
+        calls, items, elapsed = asyncio.run(_run(flights, args, nodes, edges))
+        stats = f' | {flights.snapshot()}' if flights else ''
+        print(f'{label}: chamadas={calls} blocos enviados={items} wall={elapsed:.3f}s{stats}')
+
+
+if __name__ == '__main__':
+    main()
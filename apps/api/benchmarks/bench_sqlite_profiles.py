@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import httpx
+
+from app.db.session import STORAGE_PROFILES
+from benchmarks.support import running_server, temporary_app
+from benchmarks.synthetic import synthetic_graph
+
+
+def _percentile(samples: List[float], percentile: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _run_profile(name: str, readers: int, writers: int, duration: float, nodes: int) -> Dict[str, dict]:
+    graph_nodes, graph_edges = synthetic_graph(nodes, 2, seed=3)
+    with temporary_app(STORAGE_PROFILES[name]) as (app, _), running_server(app) as base_url:
+        with httpx.Client(base_url=base_url) as client:
+            campaign_ids = [
+                client.post(
+                    '/campaigns/',
+                    json={'title': f'Bench {index}', 'nodes': graph_nodes, 'edges': graph_edges},
+                ).json()['id']
+                for index in range(8)
+            ]
+
+        latencies: Dict[str, List[float]] = {'read': [], 'write': []}
+        errors = {'read': 0, 'write': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def worker(kind: str, seed: int) -> None:
+            rng = random.Random(seed)
+            with httpx.Client(base_url=base_url, timeout=60) as client:
+                while time.perf_counter() < deadline:
+                    campaign_id = rng.choice(campaign_ids)
+                    started = time.perf_counter()
+                    if kind == 'read':
+                        response = client.get(f'/campaigns/{campaign_id}')
+                    else:
+                        node = dict(rng.choice(graph_nodes))
+                        node['position'] = {'x': rng.random(), 'y': rng.random()}
+                        response = client.patch(
+                            f'/campaigns/{campaign_id}', json={'upsert_nodes': [node]}
+                        )
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        if response.status_code >= 400:
+                            errors[kind] += 1
+                        else:
+                            latencies[kind].append(elapsed)
+
+        with ThreadPoolExecutor(max_workers=readers + writers) as executor:
+            for index in range(readers):
+                executor.submit(worker, 'read', index)
+            for index in range(writers):
+                executor.submit(worker, 'write', 1000 + index)
+
+    return {
+        kind: {
+            'throughput': len(samples) / duration,
+            'p50_ms': _percentile(samples, 50) * 1000,
+            'p99_ms': _percentile(samples, 99) * 1000,
+            'errors': errors[kind],
+        }
+        for kind, samples in latencies.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Leitores e escritores concorrentes por perfil SQLite')
+    parser.add_argument('--profiles', default=','.join(STORAGE_PROFILES))
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--nodes', type=int, default=200)
+    args = parser.parse_args()
+
+    for name in args.profiles.split(','):
+        results = _run_profile(name, args.readers, args.writers, args.duration, args.nodes)
+        for kind, stats in results.items():
+            print(
+                f"profile={name:<7} {kind:<5} {stats['throughput']:8.1f} req/s | "
+                f"p50={stats['p50_ms']:7.2f} ms | p99={stats['p99_ms']:8.2f} ms | "
+                f"erros={stats['errors']}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.services.prompt_builder import PromptConfig, PromptItem, build_prompts
+from app.services.title_catalog import TitleCatalogConfig, load_title_catalog
+from benchmarks.synthetic import TYPES, WORDS, synthetic_graph
+
+Case = Tuple[Optional[str], PromptItem, int]
+
+
+def _write_catalog(directory: Path, per_type: int, seed: int) -> Dict[str, List[str]]:
+    rng = random.Random(seed)
+    titles: Dict[str, List[str]] = {}
+    for block_type in TYPES:
+        names = [
+            f'{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {block_type} {index}'
+            for index in range(per_type)
+        ]
+        (directory / f'{block_type}.txt').write_text('\n'.join(names) + '\n', encoding='utf-8')
+        titles[block_type] = names
+    return titles
+
+
+def _legacy_pick(options: List[str], seed: int, blocked: set) -> Optional[str]:
+    if not options:
+        return None
+    for offset in range(len(options)):
+        candidate = options[(seed + offset) % len(options)]
+        if candidate.lower() not in blocked:
+            return candidate
+    return options[seed % len(options)]
+
+
+def _legacy_normalize(
+    titles: Dict[str, List[str]], candidate: Optional[str], item: PromptItem, seed: int
+) -> str:
+    blocked = {title.lower() for title in item.context_titles}
+    if item.target_title:
+        blocked.add(item.target_title.lower())
+    other_titles = {
+        title.lower()
+        for block_type, names in titles.items()
+        if block_type != item.target_type
+        for title in names
+    }
+    if candidate and candidate.strip():
+        normalized = candidate.strip()
+        if normalized.lower() not in blocked and normalized.lower() not in other_titles:
+            return normalized
+    fallback = _legacy_pick(titles.get(item.target_type, []), seed, blocked)
+    return fallback or (candidate.strip() if candidate else item.target_title)
+
+
+def _cases(titles: Dict[str, List[str]], prompts: List[PromptItem], seed: int) -> List[Case]:
+    rng = random.Random(seed)
+    cases: List[Case] = []
+    for index, item in enumerate(prompts):
+        roll = rng.random()
+        if roll < 0.4:
+            candidate = None
+        elif roll < 0.6:
+            candidate = rng.choice(titles[rng.choice(TYPES)])
+        elif roll < 0.8:
+            candidate = 'Ecos da Cripta'
+        else:
+            candidate = f'Titulo novo {index}'
+        cases.append((candidate, item, rng.randrange(1 << 30)))
+    return cases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Indice do catalogo de titulos vs. normalizacao por item')
+    parser.add_argument('--per-type', type=int, default=20000, help='nomes por tipo no catalogo')
+    parser.add_argument('--batch', type=int, default=500)
+    parser.add_argument('--legacy-items', type=int, default=50, help='itens medidos no caminho antigo')
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(args.batch + 10, 2, seed=9)
+    prompts = build_prompts(
+        [node['id'] for node in nodes[: args.batch]], nodes, edges, 'Bench', None, PromptConfig()
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        titles = _write_catalog(Path(directory), args.per_type, seed=9)
+        started = time.perf_counter()
+        catalog = load_title_catalog(TitleCatalogConfig(directory=Path(directory)))
+        load_seconds = time.perf_counter() - started
+    cases = _cases(titles, prompts, seed=9)
+    print(f'catalogo={len(catalog)} nomes ({args.per_type}/tipo) | carga+indice={load_seconds * 1000:.0f} ms')
+
+    legacy = cases[: args.legacy_items]
+    started = time.perf_counter()
+    legacy_titles = [_legacy_normalize(titles, *case) for case in legacy]
+    legacy_ms = (time.perf_counter() - started) * 1000 / len(legacy)
+
+    started = time.perf_counter()
+    indexed_titles = [catalog.normalize(*case) for case in cases]
+    indexed_ms = (time.perf_counter() - started) * 1000 / len(cases)
+
+    assigner = catalog.assigner()
+    started = time.perf_counter()
+    assigned_titles = [assigner.assign(*case) for case in cases]
+    assigned_ms = (time.perf_counter() - started) * 1000 / len(cases)
+
+    def duplicates(values: List[str]) -> int:
+        return len(values) - len({value.lower() for value in values})
+
+    rows = [
+        ('por item (antigo)', legacy_ms, legacy_titles),
+        ('indice', indexed_ms, indexed_titles),
+        ('indice + lote', assigned_ms, assigned_titles),
+    ]
+    for label, per_item, values in rows:
+        print(f'{label:>20}: {per_item:9.4f} ms/item | repetidos={duplicates(values)}/{len(values)}')
+    print(f'ganho por item: {legacy_ms / assigned_ms:.0f}x')
+
+
+if __name__ == '__main__':
+    main()
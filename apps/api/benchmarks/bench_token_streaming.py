@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.fake_provider import FakeProviderConfig, create_fake_provider
+from benchmarks.load_driver import _configure_provider
+from benchmarks.support import running_server, temporary_app
+from benchmarks.synthetic import synthetic_graph
+
+
+def _measure(api_url: str, campaign: dict, targets: List[str], repeat: int) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = {'delta': [], 'block': [], 'total': [], 'deltas': []}
+    with httpx.Client(base_url=api_url, timeout=60.0) as client:
+        campaign_id = client.post('/campaigns/', json=campaign).json()['id']
+        payload = {'campaign_id': campaign_id, 'target_ids': targets, 'use_cache': False}
+        for _ in range(repeat):
+            first_delta = first_block = None
+            deltas = 0
+            started = time.perf_counter()
+            with client.stream('POST', '/generate/stream', json=payload) as response:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    kind = json.loads(line)['type']
+                    elapsed = time.perf_counter() - started
+                    if kind == 'delta':
+                        deltas += 1
+                        first_delta = first_delta if first_delta is not None else elapsed
+                    elif kind == 'block':
+                        first_block = first_block if first_block is not None else elapsed
+            total = time.perf_counter() - started
+            samples['delta'].append(first_delta if first_delta is not None else first_block or total)
+            samples['block'].append(first_block or total)
+            samples['total'].append(total)
+            samples['deltas'].append(deltas)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Tempo ate o primeiro texto: stream de tokens vs. resposta completa')
+    parser.add_argument('--targets', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=150.0, help='atraso ate o primeiro chunk')
+    parser.add_argument('--token-ms', type=float, default=20.0)
+    parser.add_argument('--token-chars', type=int, default=4)
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(50, 2, seed=5)
+    campaign = {'title': 'Stream', 'nodes': nodes, 'edges': edges}
+    targets = [node['id'] for node in nodes[-args.targets :]]
+    config = FakeProviderConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=0.0,
+        distribution='fixed',
+        token_ms=args.token_ms,
+        token_chars=args.token_chars,
+    )
+    print(
+        f'alvos={len(targets)} latencia={args.latency_ms:.0f}ms '
+        f'chunk={args.token_chars} chars a cada {args.token_ms:.0f}ms'
+    )
+    with running_server(create_fake_provider(config)) as provider_url:
+        _configure_provider('openai', provider_url)
+        for label, stream in [('resposta completa', 'false'), ('stream de tokens', 'true')]:
+            os.environ['OPENAI_STREAM'] = stream
+            with temporary_app() as (app, _), running_server(app) as api_url:
+                samples = _measure(api_url, campaign, targets, args.repeat)
+            print(
+                f"{label:>18}: primeiro texto={statistics.median(samples['delta']) * 1000:7.1f} ms | "
+                f"primeiro bloco={statistics.median(samples['block']) * 1000:7.1f} ms | "
+                f"total={statistics.median(samples['total']) * 1000:7.1f} ms | "
+                f"deltas={statistics.median(samples['deltas']):.0f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import deque
+from typing import List, Set
+
+from app.services.ai_adapter import GeneratedItem, MockAdapter
+from app.services.generation import generate_story_blocks
+from app.services.prompt_builder import CampaignGraph, PromptConfig, PromptItem, compile_graph
+from app.services.waves import apply_generated, plan_waves
+from benchmarks.synthetic import synthetic_graph
+
+
+class StaleCountingAdapter(MockAdapter):
+    cache_scope = 'bench'
+
+    def __init__(self, latency: float, stale_titles: Set[str]) -> None:
+        self.latency = latency
+        self.stale_titles = stale_titles
+        self.calls = 0
+        self.stale = 0
+
+    async def generate(self, prompts: List[PromptItem]) -> List[GeneratedItem]:
+        self.calls += 1
+        self.stale += sum(
+            1 for item in prompts for title in item.context_titles if title in self.stale_titles
+        )
+        await asyncio.sleep(self.latency)
+        return [
+            GeneratedItem(id=item.id, title=f'Gerado {item.id}', content=f'Conteudo novo de {item.id}.')
+            for item in prompts
+        ]
+
+
+def _cascade(graph: CampaignGraph, root: str, size: int) -> List[str]:
+    seen = {root}
+    queue = deque([root])
+    targets: List[str] = []
+    while queue and len(targets) < size:
+        node_id = queue.popleft()
+        targets.append(node_id)
+        for child in graph.outgoing.get(node_id, []):
+            if child not in seen:
+                seen.add(child)
+                queue.append(child)
+    return targets
+
+
+async def _run(strategy: str, graph: CampaignGraph, targets: List[str], args) -> tuple:
+    adapter = StaleCountingAdapter(args.latency, {graph.node_map[target_id].title for target_id in targets})
+    config = PromptConfig(max_depth=args.depth)
+    started = time.perf_counter()
+    if strategy == 'tudo de uma vez':
+        await generate_story_blocks(targets, [], [], 'Bench', None, config, adapter=adapter, graph=graph)
+        rounds = 1
+    elif strategy == 'ondas':
+        await generate_story_blocks(
+            targets, [], [], 'Bench', None, config, adapter=adapter, graph=graph, waves=True
+        )
+        rounds = len(plan_waves(targets, graph, args.depth).waves)
+    else:
+        ordered = [target_id for wave in plan_waves(targets, graph, args.depth).waves for target_id in wave]
+        current = graph
+        for target_id in ordered:
+            _, generated = await generate_story_blocks(
+                [target_id], [], [], 'Bench', None, config, adapter=adapter, graph=current
+            )
+            current = apply_generated(current, generated)
+        rounds = len(ordered)
+    return time.perf_counter() - started, rounds, adapter.calls, adapter.stale
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Geracao em ondas topologicas vs. tudo de uma vez')
+    parser.add_argument('--nodes', type=int, default=400)
+    parser.add_argument('--edges-per-node', type=int, default=1)
+    parser.add_argument('--targets', type=int, default=40)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(args.nodes, args.edges_per_node, seed=11)
+    graph = compile_graph(nodes, edges)
+    targets = _cascade(graph, 'n0', args.targets)
+    print(f'targets={len(targets)} profundidade={args.depth} latencia={args.latency * 1000:.0f}ms')
+    for strategy in ['tudo de uma vez', 'ondas', 'sequencial']:
+        elapsed, rounds, calls, stale = asyncio.run(_run(strategy, graph, targets, args))
+        print(
+            f'{strategy:>16}: {elapsed * 1000:8.1f} ms | rodadas={rounds:3d} | '
+            f'chamadas={calls:3d} | contexto desatualizado={stale}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+_BLOCK_PATTERN = re.compile(r'^Bloco (.+):$', re.MULTILINE)
+_TARGET_PATTERN = re.compile(r'^Alvo: .+ - (.+)$', re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class FakeProviderConfig:
+    latency_ms: float = 300.0
+    jitter_ms: float = 100.0
+    distribution: str = 'normal'
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after_ms: int = 500
+    malformed_rate: float = 0.0
+    token_ms: float = 0.0
+    token_chars: int = 8
+    seed: int = 1
+
+
+class FakeProviderStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.ok = 0
+        self.errors = 0
+        self.throttled = 0
+        self.malformed = 0
+        self.streamed = 0
+
+    def snapshot(self) -> dict:
+        return dict(vars(self))
+
+
+def _latency(rng: random.Random, config: FakeProviderConfig) -> float:
+    mean = config.latency_ms / 1000
+    spread = config.jitter_ms / 1000
+    if config.distribution == 'fixed' or spread <= 0:
+        return mean
+    if config.distribution == 'uniform':
+        return max(0.0, rng.uniform(mean - spread, mean + spread))
+    if config.distribution == 'lognormal' and mean > 0:
+        sigma = math.sqrt(math.log(1 + (spread / mean) ** 2))
+        return rng.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
+    return max(0.0, rng.gauss(mean, spread))
+
+
+def _completion(prompt: str) -> str:
+    block_ids = _BLOCK_PATTERN.findall(prompt)
+    if block_ids:
+        return json.dumps(
+            [
+                {'id': block_id, 'title': f'Titulo {block_id}', 'content': f'Conteudo gerado para {block_id}.'}
+                for block_id in block_ids
+            ]
+        )
+    target = _TARGET_PATTERN.search(prompt)
+    title = target.group(1) if target else 'Bloco'
+    return json.dumps({'title': f'{title} Renovado', 'content': f'Conteudo gerado para {title}.'})
+
+
+def _malformed(content: str, rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return content[: max(1, len(content) // 2)]
+    return f'Claro! Aqui esta: {content} Espero que ajude.'
+
+
+def _usage(prompt: str, content: str) -> dict:
+    return {
+        'prompt_tokens': len(prompt) // 4,
+        'completion_tokens': len(content) // 4,
+        'total_tokens': (len(prompt) + len(content)) // 4,
+    }
+
+
+async def _sse_chunks(
+    content: str, usage: dict, model: str, config: FakeProviderConfig
+) -> AsyncIterator[str]:
+    step = max(1, config.token_chars)
+    for start in range(0, len(content), step):
+        if config.token_ms > 0:
+            await asyncio.sleep(config.token_ms / 1000)
+        chunk = {
+            'object': 'chat.completion.chunk',
+            'model': model,
+            'choices': [{'index': 0, 'delta': {'content': content[start : start + step]}}],
+        }
+        yield f'data: {json.dumps(chunk)}\n\n'
+    final = {'object': 'chat.completion.chunk', 'model': model, 'choices': [], 'usage': usage}
+    yield f'data: {json.dumps(final)}\n\n'
+    yield 'data: [DONE]\n\n'
+
+
+def create_fake_provider(config: FakeProviderConfig, stats: Optional[FakeProviderStats] = None) -> FastAPI:
+    app = FastAPI(title='Fake chat completions')
+    rng = random.Random(config.seed)
+    stats = stats or FakeProviderStats()
+    app.state.stats = stats
+
+    def read_stats() -> dict:
+        return stats.snapshot()
+
+    async def complete(request: Request) -> Response:
+        stats.requests += 1
+        roll = rng.random()
+        if roll < config.throttle_rate:
+            stats.throttled += 1
+            return JSONResponse(
+                {'error': {'message': 'Rate limit reached'}},
+                status_code=429,
+                headers={'retry-after-ms': str(config.retry_after_ms)},
+            )
+        payload = await request.json()
+        await asyncio.sleep(_latency(rng, config))
+        if roll < config.throttle_rate + config.error_rate:
+            stats.errors += 1
+            return JSONResponse({'error': {'message': 'Service unavailable'}}, status_code=503)
+
+        prompt = payload['messages'][-1]['content']
+        content = _completion(prompt)
+        if rng.random() < config.malformed_rate:
+            stats.malformed += 1
+            content = _malformed(content, rng)
+        stats.ok += 1
+        model = payload.get('model', 'fake')
+        if payload.get('stream'):
+            stats.streamed += 1
+            return StreamingResponse(
+                _sse_chunks(content, _usage(prompt, content), model, config), media_type='text/event-stream'
+            )
+        if config.token_ms > 0:
+            await asyncio.sleep(math.ceil(len(content) / max(1, config.token_chars)) * config.token_ms / 1000)
+        return JSONResponse(
+            {
+                'object': 'chat.completion',
+                'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}}],
+                'usage': _usage(prompt, content),
+            }
+        )
+
+    app.add_api_route('/v1/chat/completions', complete, methods=['POST'])
+    app.add_api_route('/openai/deployments/{deployment}/chat/completions', complete, methods=['POST'])
+    app.add_api_route('/stats', read_stats, methods=['GET'])
+    return app
+
+
+def add_provider_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--latency-ms', type=float, default=300.0)
+    parser.add_argument('--jitter-ms', type=float, default=100.0)
+    parser.add_argument('--distribution', choices=['fixed', 'uniform', 'normal', 'lognormal'], default='normal')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fracao de respostas 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fracao de respostas 429')
+    parser.add_argument('--retry-after-ms', type=int, default=500)
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='fracao de JSON malformado')
+    parser.add_argument('--token-ms', type=float, default=0.0, help='tempo de geracao por chunk')
+    parser.add_argument('--token-chars', type=int, default=8, help='caracteres por chunk em stream')
+    parser.add_argument('--seed', type=int, default=1)
+
+
+def provider_config(args: argparse.Namespace) -> FakeProviderConfig:
+    return FakeProviderConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        distribution=args.distribution,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after_ms=args.retry_after_ms,
+        malformed_rate=args.malformed_rate,
+        token_ms=args.token_ms,
+        token_chars=args.token_chars,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Servidor local compativel com chat completions (OpenAI/Azure)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8901)
+    add_provider_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_fake_provider(provider_config(args)), host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
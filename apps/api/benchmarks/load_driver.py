@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from contextlib import ExitStack
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.fake_provider import add_provider_arguments, create_fake_provider, provider_config
+from benchmarks.support import running_server, temporary_app
+from benchmarks.synthetic import synthetic_graph
+
+
+def _percentile(samples: List[float], percentile: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _configure_provider(provider: str, provider_url: str) -> None:
+    os.environ['AI_PROVIDER'] = provider
+    os.environ['GENERATION_CACHE'] = 'false'
+    if provider == 'azure':
+        os.environ['AZURE_OPENAI_ENDPOINT'] = provider_url
+        os.environ['AZURE_OPENAI_API_KEY'] = 'fake'
+        os.environ['AZURE_OPENAI_DEPLOYMENT'] = 'fake-deployment'
+        os.environ['AZURE_OPENAI_API_VERSION'] = '2024-06-01'
+    else:
+        os.environ['OPENAI_BASE_URL'] = provider_url
+        os.environ['OPENAI_API_KEY'] = 'fake'
+
+
+async def _drive(api_url: str, args, nodes: List[dict], edges: List[dict]) -> Dict[str, object]:
+    rng = random.Random(args.seed)
+    node_ids = [node['id'] for node in nodes]
+    latencies: List[float] = []
+    modes: Dict[str, int] = {}
+    failures: Dict[str, int] = {}
+    issued = 0
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=args.timeout) as client:
+        created = await client.post('/campaigns/', json={'title': 'Carga', 'nodes': nodes, 'edges': edges})
+        campaign_id = created.json()['id']
+
+        async def worker() -> None:
+            nonlocal issued
+            while issued < args.requests:
+                issued += 1
+                payload = {
+                    'campaign_id': campaign_id,
+                    'target_ids': rng.sample(node_ids, args.targets),
+                    'use_cache': False,
+                }
+                started = time.perf_counter()
+                try:
+                    response = await client.post('/generate/', json=payload)
+                except httpx.HTTPError as error:
+                    failures[type(error).__name__] = failures.get(type(error).__name__, 0) + 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    failures[str(response.status_code)] = failures.get(str(response.status_code), 0) + 1
+                    continue
+                for item in response.json()['items']:
+                    mode = item.get('mode') or 'none'
+                    modes[mode] = modes.get(mode, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {'elapsed': elapsed, 'latencies': latencies, 'modes': modes, 'failures': failures}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Carga ponta a ponta em /generate contra um provedor fake local')
+    parser.add_argument('--provider', choices=['openai', 'azure'], default='openai')
+    parser.add_argument('--provider-url', help='provedor ja em execucao (padrao: sobe o fake local)')
+    parser.add_argument('--api-url', help='API ja em execucao (padrao: sobe a API com banco temporario)')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--targets', type=int, default=3, help='blocos por requisicao')
+    parser.add_argument('--nodes', type=int, default=300)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    add_provider_arguments(parser)
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(args.nodes, 2, seed=args.seed)
+    with ExitStack() as stack:
+        fake = None
+        provider_url = args.provider_url
+        if not provider_url:
+            fake = create_fake_provider(provider_config(args))
+            provider_url = stack.enter_context(running_server(fake))
+        api_url = args.api_url
+        if not api_url:
+            _configure_provider(args.provider, provider_url)
+            app, _ = stack.enter_context(temporary_app())
+            api_url = stack.enter_context(running_server(app))
+
+        result = asyncio.run(_drive(api_url, args, nodes, edges))
+        provider_stats = fake.state.stats.snapshot() if fake is not None else None
+
+    latencies = result['latencies']
+    modes = result['modes']
+    items = sum(modes.values())
+    fallback = modes.get('mock', 0)
+    print(
+        f"{args.provider}: {len(latencies)} respostas em {result['elapsed']:.1f}s | "
+        f"{len(latencies) / result['elapsed']:.1f} req/s | {items / result['elapsed']:.1f} blocos/s"
+    )
+    print(
+        f'latencia ms: p50={_percentile(latencies, 50) * 1000:.0f} '
+        f'p90={_percentile(latencies, 90) * 1000:.0f} '
+        f'p99={_percentile(latencies, 99) * 1000:.0f} '
+        f'max={max(latencies, default=0) * 1000:.0f}'
+    )
+    print(f"fallback mock: {fallback}/{items} blocos ({fallback / items if items else 0:.1%}) | modos={modes}")
+    if result['failures']:
+        print(f"falhas HTTP: {result['failures']}")
+    if provider_stats is not None:
+        print(f'provedor fake: {provider_stats}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from app.services.ai_adapter import MockAdapter, _normalize_title
+from app.services.prompt_builder import (
+    PromptConfig,
+    build_incoming_map,
+    build_prompts,
+    collect_upstream_ids,
+    parse_edges,
+    parse_nodes,
+)
+from benchmarks.support import temporary_client
+from benchmarks.synthetic import GraphSpec, generate_graph
+
+Case = Callable[[], object]
+
+RUN_SPEC_KEYS = ('spec', 'targets', 'repeat', 'warmup')
+
+
+@dataclass(frozen=True)
+class CaseResult:
+    name: str
+    runs: int
+    min_ms: float
+    median_ms: float
+    mean_ms: float
+
+
+def _time_case(name: str, case: Case, repeat: int, warmup: int) -> CaseResult:
+    for _ in range(warmup):
+        case()
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        case()
+        samples.append((time.perf_counter() - started) * 1000)
+    return CaseResult(
+        name=name,
+        runs=repeat,
+        min_ms=round(min(samples), 4),
+        median_ms=round(statistics.median(samples), 4),
+        mean_ms=round(statistics.fmean(samples), 4),
+    )
+
+
+def _graph_cases(
+    nodes: List[dict], edges: List[dict], targets: List[str], config: PromptConfig
+) -> Dict[str, Case]:
+    incoming = build_incoming_map(parse_edges(edges))
+    prompts = build_prompts(targets, nodes, edges, 'Bench', None, config)
+    adapter = MockAdapter()
+    loop = asyncio.new_event_loop()
+
+    return {
+        'parse_nodes': lambda: parse_nodes(nodes),
+        'parse_edges': lambda: parse_edges(edges),
+        'collect_upstream_ids': lambda: [
+            collect_upstream_ids(target_id, incoming, config.max_depth) for target_id in targets
+        ],
+        'build_prompts': lambda: build_prompts(targets, nodes, edges, 'Bench', None, config),
+        'normalize_title': lambda: [
+            _normalize_title(None, item, index) for index, item in enumerate(prompts)
+        ],
+        'mock_generate': lambda: loop.run_until_complete(adapter.generate(prompts)),
+    }
+
+
+def _roundtrip_case(client, nodes: List[dict], edges: List[dict]) -> Case:
+    def roundtrip() -> None:
+        created = client.post('/campaigns/', json={'title': 'Bench', 'nodes': nodes, 'edges': edges})
+        campaign_id = created.json()['id']
+        client.get(f'/campaigns/{campaign_id}')
+        client.put(
+            f'/campaigns/{campaign_id}', json={'title': 'Bench 2', 'nodes': nodes, 'edges': edges}
+        )
+        client.get('/campaigns/')
+        client.delete(f'/campaigns/{campaign_id}')
+
+    return roundtrip
+
+
+def run_suite(spec: GraphSpec, targets: int, repeat: int, warmup: int, only: Optional[List[str]]) -> dict:
+    nodes, edges = generate_graph(spec)
+    target_ids = [f'n{spec.nodes - 1 - index}' for index in range(min(targets, spec.nodes))]
+    config = PromptConfig()
+    cases = _graph_cases(nodes, edges, target_ids, config)
+
+    results: List[CaseResult] = []
+    for name, case in cases.items():
+        if only is None or name in only:
+            results.append(_time_case(name, case, repeat, warmup))
+    if only is None or 'campaigns_roundtrip' in only:
+        with temporary_client() as (client, _):
+            results.append(
+                _time_case('campaigns_roundtrip', _roundtrip_case(client, nodes, edges), repeat, warmup)
+            )
+
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'spec': asdict(spec),
+            'targets': len(target_ids),
+            'repeat': repeat,
+            'warmup': warmup,
+            'edges': len(edges),
+        },
+        'results': {result.name: asdict(result) for result in results},
+    }
+
+
+def spec_mismatch(report: dict, baseline: dict) -> List[str]:
+    current = report.get('meta', {})
+    previous = baseline.get('meta', {})
+    return [key for key in RUN_SPEC_KEYS if current.get(key) != previous.get(key)]
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> List[str]:
+    regressions: List[str] = []
+    for name, result in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous.get('median_ms'):
+            print(f'{name:>22}: sem baseline')
+            continue
+        ratio = result['median_ms'] / previous['median_ms']
+        flag = 'REGRESSAO' if ratio > 1 + threshold else 'ok'
+        print(
+            f"{name:>22}: {previous['median_ms']:10.3f} -> {result['median_ms']:10.3f} ms "
+            f'({ratio:5.2f}x) {flag}'
+        )
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Suite dos caminhos quentes sobre grafos sinteticos')
+    parser.add_argument('--nodes', type=int, default=1000)
+    parser.add_argument('--edges-per-node', type=int, default=2)
+    parser.add_argument('--depth', type=int, default=None, help='camadas do grafo (padrao: sem camadas)')
+    parser.add_argument('--content-chars', type=int, default=240)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--targets', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--cases', help='lista separada por virgula (padrao: todos)')
+    parser.add_argument('--output', help='arquivo JSON de saida (padrao: stdout)')
+    parser.add_argument('--baseline', help='JSON de uma execucao anterior para checar regressao')
+    parser.add_argument('--threshold', type=float, default=0.25, help='lentidao tolerada sobre a mediana')
+    args = parser.parse_args()
+
+    spec = GraphSpec(
+        nodes=args.nodes,
+        edges_per_node=args.edges_per_node,
+        depth=args.depth,
+        content_chars=args.content_chars,
+        words=True,
+        seed=args.seed,
+    )
+    only = [name.strip() for name in args.cases.split(',')] if args.cases else None
+    report = run_suite(spec, args.targets, max(1, args.repeat), max(0, args.warmup), only)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(text + '\n')
+    elif not args.baseline:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        mismatch = spec_mismatch(report, baseline)
+        if mismatch:
+            previous = baseline.get('meta', {})
+            for key in mismatch:
+                print(f'{key}: baseline={previous.get(key)!r} execucao={report["meta"].get(key)!r}')
+            print('Baseline gerado com outra especificacao; rode novamente com os mesmos parametros.')
+            sys.exit(2)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"Regressao acima de {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import StorageProfile, create_db_engine, read_storage_profile
+from app.main import create_app
+
+
+@contextmanager
+def temporary_app(profile: Optional[StorageProfile] = None) -> Iterator[Tuple[FastAPI, sessionmaker]]:
+    profile = profile or read_storage_profile()
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'bench.db'
+        engine = create_db_engine(path, profile)
+        read_engine = create_db_engine(path, profile, read_only=True)
+        app = create_app(engine, read_engine)
+        try:
+            yield app, app.state.session_factory
+        finally:
+            engine.dispose()
+            read_engine.dispose()
+
+
+@contextmanager
+def temporary_client(
+    profile: Optional[StorageProfile] = None,
+) -> Iterator[Tuple[TestClient, sessionmaker]]:
+    with temporary_app(profile) as (app, session_factory):
+        with TestClient(app) as client:
+            yield client, session_factory
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def running_server(app: FastAPI) -> Iterator[str]:
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning', lifespan='on')
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        server.should_exit = True
+        thread.join()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+TYPES = ['theme', 'location', 'npc', 'event', 'twist']
+WORDS = ['juramento', 'ruina', 'rumor', 'portal', 'lich', 'guilda', 'porto', 'cripta', 'dragao', 'vigia']
+
+
+@dataclass(frozen=True)
+class GraphSpec:
+    nodes: int = 1000
+    edges_per_node: int = 2
+    depth: Optional[int] = None
+    content_chars: int = 120
+    words: bool = False
+    seed: int = 7
+
+
+def _content(rng: random.Random, spec: GraphSpec) -> str:
+    if not spec.words:
+        return 'x' * spec.content_chars
+    text = ''
+    while len(text) < spec.content_chars:
+        text += ' '.join(rng.choice(WORDS) for _ in range(10)).capitalize() + '. '
+    return text[: spec.content_chars].strip()
+
+
+def _layer_starts(spec: GraphSpec) -> List[int]:
+    depth = max(1, min(spec.depth or 1, spec.nodes))
+    return [layer * spec.nodes // depth for layer in range(depth + 1)]
+
+
+def _source(rng: random.Random, index: int, starts: List[int], spec: GraphSpec) -> Optional[int]:
+    if not spec.depth:
+        return rng.randrange(index)
+    for layer in range(1, len(starts) - 1):
+        if starts[layer] <= index < starts[layer + 1]:
+            return rng.randrange(starts[layer - 1], starts[layer])
+    return None
+
+
+def generate_graph(spec: GraphSpec) -> Tuple[List[dict], List[dict]]:
+    rng = random.Random(spec.seed)
+    nodes = [
+        {
+            'id': f'n{index}',
+            'type': 'storyBlock',
+            'position': {'x': index, 'y': index},
+            'data': {'type': rng.choice(TYPES), 'title': f'Bloco {index}', 'content': _content(rng, spec)},
+        }
+        for index in range(spec.nodes)
+    ]
+    starts = _layer_starts(spec)
+    edges = []
+    for index in range(1, spec.nodes):
+        for offset in range(spec.edges_per_node):
+            source = _source(rng, index, starts, spec)
+            if source is not None:
+                edges.append({'id': f'e{index}-{offset}', 'source': f'n{source}', 'target': f'n{index}'})
+    return nodes, edges
+
+
+def synthetic_graph(node_count: int, edges_per_node: int, seed: int) -> Tuple[List[dict], List[dict]]:
+    return generate_graph(GraphSpec(nodes=node_count, edges_per_node=edges_per_node, seed=seed))
@@ -0,0 +1,43 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.session import STORAGE_PROFILES, create_db_engine
+from app.main import create_app
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / 'campaigns.db'
+    engine = create_db_engine(path, STORAGE_PROFILES['wal'])
+    read_engine = create_db_engine(path, STORAGE_PROFILES['wal'], read_only=True)
+    with TestClient(create_app(engine, read_engine)) as test_client:
+        yield test_client
+    engine.dispose()
+    read_engine.dispose()
+
+
+def _node(title, node_id=None):
+    node = {'type': 'storyBlock', 'data': {'type': 'npc', 'title': title, 'content': ''}}
+    return {**node, 'id': node_id} if node_id else node
+
+
+def test_edges_without_id_between_the_same_nodes_are_kept(client):
+    edges = [
+        {'source': 'a', 'target': 'b', 'label': 'primeira'},
+        {'source': 'a', 'target': 'b', 'label': 'segunda'},
+    ]
+    created = client.post(
+        '/campaigns/', json={'title': 'C', 'nodes': [_node('A', 'a'), _node('B', 'b')], 'edges': edges}
+    ).json()
+    stored = client.get(f"/campaigns/{created['id']}").json()['edges']
+    assert [edge['label'] for edge in stored] == ['primeira', 'segunda']
+    assert len({edge['id'] for edge in stored}) == 2
+    assert [edge['id'] for edge in created['edges']] == [edge['id'] for edge in stored]
+
+
+def test_patching_a_node_without_id_does_not_overwrite_another(client):
+    created = client.post('/campaigns/', json={'title': 'C', 'nodes': [_node('Primeiro')], 'edges': []}).json()
+    client.patch(f"/campaigns/{created['id']}", json={'upsert_nodes': [_node('Segundo')]})
+    stored = client.get(f"/campaigns/{created['id']}").json()['nodes']
+    assert [node['data']['title'] for node in stored] == ['Primeiro', 'Segundo']
+    assert stored[0]['id'] == created['nodes'][0]['id']
@@ -0,0 +1,49 @@
+import asyncio
+from typing import List
+
+import httpx
+
+from app.services.circuit_breaker import CLOSED, OPEN, BreakerConfig, CircuitBreaker
+from app.services.rate_limiter import ProviderLimiter, RateLimitConfig
+
+
+def _send(statuses: List[int], headers: dict, max_retries: int):
+    breaker = CircuitBreaker('teste', BreakerConfig(failure_threshold=5))
+    limiter = ProviderLimiter(
+        RateLimitConfig(max_retries=max_retries, backoff_base=0.0, decrease_cooldown=0.0),
+        max_concurrency=4,
+        breaker=breaker,
+    )
+    replies = iter(statuses)
+
+    async def call() -> httpx.Response:
+        status = next(replies)
+        return httpx.Response(status, headers=headers if status != 200 else {})
+
+    response = asyncio.run(limiter.send(10, call))
+    return response, breaker
+
+
+def test_throttle_burst_does_not_open_breaker():
+    response, breaker = _send([429] * 5 + [200], {'Retry-After': '0'}, max_retries=5)
+    assert response.status_code == 200
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()['consecutive_failures'] == 0
+
+
+def test_exhausted_throttle_keeps_breaker_closed():
+    response, breaker = _send([429] * 6, {'Retry-After': '0'}, max_retries=5)
+    assert response.status_code == 429
+    assert breaker.state == CLOSED
+
+
+def test_server_errors_with_retry_after_do_not_count():
+    response, breaker = _send([503] * 5 + [200], {'Retry-After': '0'}, max_retries=5)
+    assert response.status_code == 200
+    assert breaker.state == CLOSED
+
+
+def test_server_errors_open_breaker():
+    response, breaker = _send([500] * 5, {}, max_retries=4)
+    assert response.status_code == 500
+    assert breaker.state == OPEN
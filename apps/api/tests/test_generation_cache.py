@@ -0,0 +1,33 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.db.models import GenerationCacheEntry
+from app.db.session import STORAGE_PROFILES, Base, create_db_engine, create_session_factory
+from app.services.generation_cache import CacheConfig, GenerationCache
+
+
+def _rows(session_factory) -> int:
+    with session_factory() as db:
+        return db.execute(select(func.count()).select_from(GenerationCacheEntry)).scalar()
+
+
+def test_row_limit_is_enforced_every_few_writes(tmp_path):
+    engine = create_db_engine(tmp_path / 'cache.db', STORAGE_PROFILES['wal'])
+    Base.metadata.create_all(bind=engine)
+    session_factory = create_session_factory(engine)
+    cache = GenerationCache(CacheConfig(max_rows=5, trim_every=4), session_factory)
+
+    async def put(index: int) -> None:
+        await cache.put_many({f'chave-{index}': ('Titulo', f'Conteudo {index}')})
+
+    counts = []
+    for index in range(13):
+        asyncio.run(put(index))
+        counts.append(_rows(session_factory))
+    engine.dispose()
+
+    assert max(counts) <= 5 + 4 - 1
+    assert counts[4] == 5
+    assert counts[8] == 5
+    assert counts[12] == 5
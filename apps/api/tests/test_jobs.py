@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+from app.db.session import STORAGE_PROFILES, Base, create_db_engine, create_session_factory
+from app.services.ai_adapter import GeneratedItem
+from app.services.generation import GenerationEvent
+from app.services.jobs import CANCELLED, SUCCEEDED, TERMINAL_STATUSES, JobConfig, JobManager
+
+
+class SlowStartManager(JobManager):
+    def _start_row(self, job_id):
+        time.sleep(0.2)
+        return super()._start_row(job_id)
+
+
+def _session_factory(tmp_path):
+    engine = create_db_engine(tmp_path / 'jobs.db', STORAGE_PROFILES['wal'])
+    Base.metadata.create_all(bind=engine)
+    return create_session_factory(engine)
+
+
+def _runner(hold: asyncio.Event):
+    async def run(payload, done_ids):
+        if payload.get('hold'):
+            await hold.wait()
+        yield GenerationEvent(kind='block', item=GeneratedItem(id='n1', title='Titulo', content='Texto'))
+
+    return run
+
+
+async def _wait_terminal(manager: JobManager, job_id: str):
+    for _ in range(200):
+        snapshot = await manager.get(job_id)
+        if snapshot.status in TERMINAL_STATUSES:
+            return snapshot
+        await asyncio.sleep(0.02)
+    return snapshot
+
+
+def _scenario(manager_class, tmp_path, hold: bool):
+    async def scenario():
+        event = asyncio.Event()
+        manager = manager_class(JobConfig(workers=1), _session_factory(tmp_path), _runner(event))
+        await manager.start()
+        try:
+            first = await manager.submit({'hold': hold}, 1)
+            await asyncio.sleep(0.05)
+            cancelled = await manager.cancel(first.id)
+            second = await manager.submit({}, 1)
+            return cancelled, await _wait_terminal(manager, second.id)
+        finally:
+            await manager.stop()
+
+    return asyncio.run(scenario())
+
+
+def test_cancel_while_starting_keeps_worker_alive(tmp_path):
+    cancelled, second = _scenario(SlowStartManager, tmp_path, hold=False)
+    assert cancelled.status == CANCELLED
+    assert second.status == SUCCEEDED
+
+
+def test_cancel_while_running_keeps_worker_alive(tmp_path):
+    cancelled, second = _scenario(JobManager, tmp_path, hold=True)
+    assert cancelled.status == CANCELLED
+    assert second.status == SUCCEEDED
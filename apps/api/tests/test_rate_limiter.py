@@ -0,0 +1,100 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.services.ai_adapter import AIProviderConfig, OpenAIAdapter, PartialGenerationError
+from app.services.generation import generate_story_blocks
+from app.services.prompt_builder import PromptConfig, build_prompts
+from app.services.rate_limiter import RateLimitConfig
+
+NODES = [
+    {'id': node_id, 'type': 'storyBlock', 'data': {'type': 'npc', 'title': node_id, 'content': 'Texto.'}}
+    for node_id in ('a', 'b')
+]
+EDGES = [{'id': 'e1', 'source': 'a', 'target': 'b'}]
+COMPLETION = {'choices': [{'message': {'content': json.dumps({'title': 'Novo', 'content': 'Gerado.'})}}]}
+
+
+class ThrottlingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, replies) -> None:
+        self._replies = list(replies)
+        self.calls = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        reply = self._replies[min(self.calls, len(self._replies) - 1)]
+        self.calls += 1
+        if isinstance(reply, Exception):
+            raise reply
+        status, headers = reply
+        body = COMPLETION if status == 200 else {'error': {'message': 'limite'}}
+        return httpx.Response(status, headers=headers, json=body, request=request)
+
+
+def _adapter(transport: ThrottlingTransport, max_retries: int = 3) -> OpenAIAdapter:
+    return OpenAIAdapter(
+        AIProviderConfig(
+            provider='openai',
+            model='fake',
+            api_key='fake',
+            base_url='http://provedor.local',
+            stream=False,
+            rate_limit=RateLimitConfig(max_retries=max_retries, backoff_base=0.0, decrease_cooldown=0.0),
+        ),
+        transport=transport,
+    )
+
+
+def _prompts():
+    return build_prompts(['b'], NODES, EDGES, 'Teste', None, PromptConfig())
+
+
+def test_retries_throttled_requests_until_success():
+    transport = ThrottlingTransport([(429, {}), (429, {}), (200, {})])
+    adapter = _adapter(transport)
+    items = asyncio.run(adapter.generate(_prompts()))
+    assert [item.content for item in items] == ['Gerado.']
+    assert transport.calls == 3
+    assert adapter.limiter.stats.throttled == 2
+
+
+def test_waits_for_retry_after_before_retrying():
+    transport = ThrottlingTransport([(429, {'Retry-After': '0.3'}), (200, {})])
+    adapter = _adapter(transport)
+    started = time.perf_counter()
+    asyncio.run(adapter.generate(_prompts()))
+    assert time.perf_counter() - started >= 0.3
+    assert transport.calls == 2
+
+
+def test_gives_up_when_retry_after_exceeds_limit():
+    transport = ThrottlingTransport([(429, {'Retry-After': '120'}), (200, {})])
+    adapter = _adapter(transport)
+    with pytest.raises(PartialGenerationError):
+        asyncio.run(adapter.generate(_prompts()))
+    assert transport.calls == 1
+    assert adapter.limiter.stats.gave_up == 1
+
+
+def test_exhausted_retries_fall_back_to_mock():
+    transport = ThrottlingTransport([(429, {'Retry-After': '0'})])
+    adapter = _adapter(transport, max_retries=2)
+    mode, items = asyncio.run(
+        generate_story_blocks(['b'], NODES, EDGES, 'Teste', None, PromptConfig(), adapter=adapter)
+    )
+    assert transport.calls == 3
+    assert mode == 'mock'
+    assert [item.mode for item in items] == ['mock']
+
+
+def test_retries_connection_errors_but_not_read_timeouts():
+    connect = ThrottlingTransport([httpx.ConnectError('recusado'), (200, {})])
+    assert asyncio.run(_adapter(connect).generate(_prompts()))
+    assert connect.calls == 2
+
+    read = ThrottlingTransport([httpx.ReadTimeout('lento'), (200, {})])
+    with pytest.raises(PartialGenerationError):
+        asyncio.run(_adapter(read).generate(_prompts()))
+    assert read.calls == 1
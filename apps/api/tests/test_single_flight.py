@@ -0,0 +1,101 @@
+import asyncio
+from typing import List
+
+from app.services.ai_adapter import GeneratedItem, MockAdapter
+from app.services.generation import SingleFlight
+from app.services.prompt_builder import PromptConfig, PromptItem, build_prompts
+
+NODES = [
+    {'id': node_id, 'type': 'storyBlock', 'data': {'type': 'npc', 'title': node_id, 'content': 'Texto.'}}
+    for node_id in ('a', 'b')
+]
+
+
+class GatedAdapter(MockAdapter):
+    cache_scope = 'test'
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate(self, prompts: List[PromptItem]) -> List[GeneratedItem]:
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return [GeneratedItem(id=item.id, title='Titulo', content=f'Conteudo {item.id}') for item in prompts]
+
+    async def stream(self, prompts: List[PromptItem]):
+        for generated in await self.generate(prompts):
+            yield generated
+
+
+def _prompts():
+    return build_prompts(['a'], NODES, [], 'Teste', None, PromptConfig())
+
+
+def test_cancelling_one_waiter_keeps_the_shared_flight():
+    async def scenario():
+        adapter = GatedAdapter()
+        flights = SingleFlight()
+        prompts = _prompts()
+        first = asyncio.ensure_future(flights.generate(adapter, prompts, ['chave']))
+        second = asyncio.ensure_future(flights.generate(adapter, prompts, ['chave']))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        adapter.release.set()
+        results = await second
+        return adapter, flights, first, results
+
+    adapter, flights, first, results = asyncio.run(scenario())
+    assert first.cancelled()
+    assert [item.content for item in results] == ['Conteudo a']
+    assert adapter.calls == 1
+    assert adapter.cancelled == 0
+    assert flights.snapshot() == {'in_flight': 0, 'leaders': 1, 'coalesced': 1, 'abandoned': 0}
+
+
+def test_cancelling_every_waiter_abandons_the_flight():
+    async def scenario():
+        adapter = GatedAdapter()
+        flights = SingleFlight()
+        prompts = _prompts()
+        waiters = [asyncio.ensure_future(flights.generate(adapter, prompts, ['chave'])) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        return adapter, flights
+
+    adapter, flights = asyncio.run(scenario())
+    assert adapter.cancelled == 1
+    assert flights.snapshot()['abandoned'] == 1
+    assert flights.snapshot()['in_flight'] == 0
+
+
+def test_cancelling_a_stream_waiter_keeps_the_shared_flight():
+    async def scenario():
+        adapter = GatedAdapter()
+        flights = SingleFlight()
+        prompts = _prompts()
+
+        async def consume():
+            return [item async for item in flights.stream(adapter, prompts, ['chave'])]
+
+        first = asyncio.ensure_future(consume())
+        second = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        adapter.release.set()
+        return adapter, await second
+
+    adapter, results = asyncio.run(scenario())
+    assert [item.content for item in results] == ['Conteudo a']
+    assert adapter.calls == 1
+    assert adapter.cancelled == 0
@@ -0,0 +1,69 @@
+import asyncio
+from typing import List
+
+from app.services.ai_adapter import GeneratedItem, MockAdapter
+from app.services.generation import generate_story_blocks
+from app.services.prompt_builder import PromptConfig, PromptItem, compile_graph
+from app.services.summaries import SummaryConfig, SummaryStore
+
+
+def _graph(contents):
+    nodes = [
+        {'id': node_id, 'type': 'storyBlock', 'data': {'type': 'npc', 'title': node_id, 'content': content}}
+        for node_id, content in contents.items()
+    ]
+    return compile_graph(nodes, [])
+
+
+def test_same_graph_version_skips_hashing(monkeypatch):
+    store = SummaryStore(SummaryConfig())
+    graph = _graph({'a': 'Primeiro texto.', 'b': 'Segundo texto.'})
+    first = asyncio.run(store.summaries_for(graph, 'campanha'))
+
+    def fail(*args):
+        raise AssertionError('hash recalculado para a mesma versao')
+
+    monkeypatch.setattr('app.services.summaries.content_hash', fail)
+    assert asyncio.run(store.summaries_for(graph, 'campanha')) == first
+
+
+def test_new_graph_version_recomputes_only_changed_nodes():
+    store = SummaryStore(SummaryConfig())
+    asyncio.run(store.summaries_for(_graph({'a': 'Primeiro texto.', 'b': 'Segundo texto.'}), 'campanha'))
+    computed = store.stats.computed
+
+    summaries = asyncio.run(
+        store.summaries_for(_graph({'a': 'Primeiro texto.', 'b': 'Texto editado.'}), 'campanha')
+    )
+    assert store.stats.computed == computed + 1
+    assert summaries == {'a': 'Primeiro texto.', 'b': 'Texto editado.'}
+
+
+def test_waves_feed_summaries_of_regenerated_upstream_content():
+    class RecordingAdapter(MockAdapter):
+        cache_scope = 'test'
+
+        def __init__(self) -> None:
+            self.prompts: List[PromptItem] = []
+
+        async def generate(self, prompts: List[PromptItem]) -> List[GeneratedItem]:
+            self.prompts.extend(prompts)
+            return [
+                GeneratedItem(id=item.id, title=f'Novo {item.id}', content=f'Conteudo novo de {item.id}.')
+                for item in prompts
+            ]
+
+    nodes = [
+        {'id': node_id, 'type': 'storyBlock', 'data': {'type': 'npc', 'title': node_id, 'content': 'Antigo.'}}
+        for node_id in ('a', 'b')
+    ]
+    edges = [{'id': 'e1', 'source': 'a', 'target': 'b'}]
+    adapter = RecordingAdapter()
+    asyncio.run(
+        generate_story_blocks(
+            ['a', 'b'], nodes, edges, 'Teste', None, PromptConfig(),
+            adapter=adapter, waves=True, summaries={'a': 'Antigo.', 'b': 'Antigo.'},
+        )
+    )
+    downstream = next(item for item in adapter.prompts if item.id == 'b')
+    assert 'Resumo: Conteudo novo de a.' in downstream.prompt
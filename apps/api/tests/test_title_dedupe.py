@@ -0,0 +1,101 @@
+import asyncio
+from typing import List
+
+from app.services.ai_adapter import GeneratedItem, MockAdapter
+from app.services.generation import generate_story_blocks, stream_story_blocks
+from app.services.generation_cache import CacheConfig, GenerationCache
+from app.services.prompt_builder import PromptConfig, PromptItem
+
+REPEATED_TITLE = 'Eco Repetido'
+
+
+class RepeatingAdapter(MockAdapter):
+    cache_scope = 'test'
+
+    def __init__(self) -> None:
+        self.generated = 0
+
+    async def generate(self, prompts: List[PromptItem]) -> List[GeneratedItem]:
+        self.generated += len(prompts)
+        return [
+            GeneratedItem(id=item.id, title=REPEATED_TITLE, content=f'Conteudo de {item.id}.')
+            for item in prompts
+        ]
+
+    async def stream(self, prompts: List[PromptItem]):
+        for generated in await self.generate(prompts):
+            yield generated
+
+
+def _chain(size: int):
+    nodes = [
+        {
+            'id': f'n{index}',
+            'type': 'storyBlock',
+            'data': {'type': 'npc', 'title': f'Bloco {index}', 'content': f'Texto {index}'},
+        }
+        for index in range(size)
+    ]
+    edges = [
+        {'id': f'e{index}', 'source': f'n{index - 1}', 'target': f'n{index}'} for index in range(1, size)
+    ]
+    return nodes, edges
+
+
+def _generate(adapter, cache, nodes, edges):
+    targets = [node['id'] for node in nodes]
+    _, items = asyncio.run(
+        generate_story_blocks(
+            targets, nodes, edges, 'Teste', None, PromptConfig(), adapter=adapter, cache=cache, waves=True
+        )
+    )
+    return [item.title for item in items]
+
+
+def _stream(adapter, cache, nodes, edges):
+    targets = [node['id'] for node in nodes]
+
+    async def collect():
+        return [
+            event.item.title
+            async for event in stream_story_blocks(
+                targets, nodes, edges, 'Teste', None, PromptConfig(), adapter=adapter, cache=cache, waves=True
+            )
+            if event.kind == 'block'
+        ]
+
+    return asyncio.run(collect())
+
+
+def _assert_unique(titles: List[str], size: int) -> None:
+    assert len(titles) == size
+    assert len({title.lower() for title in titles}) == size
+
+
+def test_generate_dedupes_titles_across_waves_and_cache_hits():
+    nodes, edges = _chain(4)
+    adapter = RepeatingAdapter()
+    cache = GenerationCache(CacheConfig())
+
+    first = _generate(adapter, cache, nodes, edges)
+    assert adapter.generated == 4
+    _assert_unique(first, 4)
+
+    second = _generate(adapter, cache, nodes, edges)
+    assert adapter.generated == 4
+    _assert_unique(second, 4)
+    assert second == first
+
+
+def test_stream_dedupes_titles_across_waves_and_cache_hits():
+    nodes, edges = _chain(4)
+    adapter = RepeatingAdapter()
+    cache = GenerationCache(CacheConfig())
+
+    first = _stream(adapter, cache, nodes, edges)
+    assert adapter.generated == 4
+    _assert_unique(first, 4)
+
+    second = _stream(adapter, cache, nodes, edges)
+    assert adapter.generated == 4
+    _assert_unique(second, 4)
@@ -0,0 +1,119 @@
+import asyncio
+import json
+from typing import List
+
+import httpx
+import pytest
+
+from app.services.ai_adapter import (
+    AIProviderConfig,
+    BlockDelta,
+    OpenAIAdapter,
+    PartialGenerationError,
+    delta_sink,
+)
+from app.services.prompt_builder import PromptConfig, build_prompts
+from app.services.rate_limiter import RateLimitConfig
+
+NODES = [
+    {'id': node_id, 'type': 'storyBlock', 'data': {'type': 'npc', 'title': node_id, 'content': 'Texto.'}}
+    for node_id in ('a', 'b', 'c')
+]
+BODY = json.dumps({'title': 'Titulo Novo', 'content': 'Conteudo gerado aos poucos.'})
+
+
+def _sse(text: str, step: int = 5, done: bool = True) -> bytes:
+    events = [
+        'data: ' + json.dumps({'choices': [{'delta': {'content': text[start : start + step]}}]})
+        for start in range(0, len(text), step)
+    ]
+    return ('\n\n'.join(events + (['data: [DONE]'] if done else [])) + '\n\n').encode('utf-8')
+
+
+class _BrokenStream(httpx.AsyncByteStream):
+    async def __aiter__(self):
+        yield _sse(BODY[: len(BODY) // 2], done=False)
+        raise httpx.ReadError('conexao perdida')
+
+
+class SSEStandIn(httpx.AsyncBaseTransport):
+    def __init__(self, stream_error: dict = None, broken: bool = False) -> None:
+        self.stream_error = stream_error
+        self.broken = broken
+        self.requests: List[bool] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        streaming = bool(json.loads(request.content).get('stream'))
+        self.requests.append(streaming)
+        if streaming and self.stream_error is not None:
+            return httpx.Response(400, json=self.stream_error, request=request)
+        if streaming and self.broken:
+            return httpx.Response(
+                200, headers={'content-type': 'text/event-stream'}, stream=_BrokenStream(), request=request
+            )
+        if streaming:
+            return httpx.Response(
+                200, headers={'content-type': 'text/event-stream'}, content=_sse(BODY), request=request
+            )
+        return httpx.Response(200, json={'choices': [{'message': {'content': BODY}}]}, request=request)
+
+
+def _adapter(transport: SSEStandIn) -> OpenAIAdapter:
+    return OpenAIAdapter(
+        AIProviderConfig(
+            provider='openai',
+            model='fake',
+            api_key='fake',
+            base_url='http://provedor.local',
+            max_concurrency=1,
+            rate_limit=RateLimitConfig(max_retries=0),
+        ),
+        transport=transport,
+    )
+
+
+def _generate(adapter: OpenAIAdapter, targets: List[str], deltas: List[BlockDelta] = None):
+    prompts = build_prompts(targets, NODES, [], 'Teste', None, PromptConfig())
+    deltas = [] if deltas is None else deltas
+
+    async def run():
+        delta_sink.set(deltas.append)
+        return await adapter.generate(prompts)
+
+    return asyncio.run(run()), deltas
+
+
+def test_streams_deltas_and_assembles_the_block():
+    transport = SSEStandIn()
+    items, deltas = _generate(_adapter(transport), ['a'])
+    assert transport.requests == [True]
+    assert items[0].content == 'Conteudo gerado aos poucos.'
+    assert len(deltas) > 1
+    assert ''.join(delta.text for delta in deltas if delta.field == 'content') == items[0].content
+
+
+def test_stream_rejection_falls_back_and_disables_streaming():
+    transport = SSEStandIn({'error': {'message': 'stream is not supported', 'param': 'stream'}})
+    adapter = _adapter(transport)
+    items, deltas = _generate(adapter, ['a', 'b'])
+    assert [item.content for item in items] == ['Conteudo gerado aos poucos.'] * 2
+    assert transport.requests == [True, False, False]
+    assert deltas == []
+
+
+def test_other_bad_requests_are_not_repeated():
+    transport = SSEStandIn({'error': {'message': 'context length exceeded', 'param': 'messages'}})
+    adapter = _adapter(transport)
+    with pytest.raises(PartialGenerationError):
+        _generate(adapter, ['a'])
+    assert transport.requests == [True]
+    assert adapter._streaming
+
+
+def test_broken_stream_resets_emitted_deltas():
+    transport = SSEStandIn(broken=True)
+    deltas: List[BlockDelta] = []
+    with pytest.raises(PartialGenerationError):
+        _generate(_adapter(transport), ['a'], deltas)
+    assert any(not delta.reset for delta in deltas)
+    assert deltas[-1].reset
@@ -97,6 +97,7 @@ export type GeneratedBlock = {
   id: string
   title?: string
   content: string
+  mode?: string
 }
 
 export type GenerationResponse = {